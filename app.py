@@ -1,14 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import yfinance as yf
-from data_loader import DataLoader
-from optimizer import PortfolioOptimizer
-from plots import PortfolioVisualizer
 from typing import List
-import numpy as np
-import requests
-from io import StringIO
+import queue
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from universe import load_universe
+
+# Les modules lourds (pandas, yfinance, cvxopt, matplotlib) sont importés à la
+# première optimisation, pour que la fenêtre s'ouvre immédiatement.
 
 # Liste de tickers populaires (S&P500 + tech US)
 POPULAR_TICKERS = [
@@ -21,113 +21,74 @@ POPULAR_TICKERS = [
     'AIR.PA', 'MC.PA', 'OR.PA', 'BNP.PA', 'SAN.PA', 'SU.PA', 'DG.PA', 'VIE.PA',
 ]
 
-# --- Fonctions utilitaires pour récupérer les tickers dynamiquement ---
-def get_sp500_tickers_with_names():
-    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-    table = pd.read_html(StringIO(requests.get(url).text))[0]
-    tickers = table['Symbol'].tolist()
-    names = table['Security'].tolist()
-    return [(t, n) for t, n in zip(tickers, names)]
-
-def get_cac40_tickers_with_names():
-    url = 'https://en.wikipedia.org/wiki/CAC_40'
-    table = pd.read_html(StringIO(requests.get(url).text))[3]
-    tickers = table['Ticker'].tolist()
-    names = table['Company'].tolist()
-    tickers = [t + '.PA' if not t.endswith('.PA') else t for t in tickers]
-    return [(t, n) for t, n in zip(tickers, names)]
-
-def get_nasdaq100_tickers_with_names():
-    url = 'https://en.wikipedia.org/wiki/NASDAQ-100'
-    table = pd.read_html(StringIO(requests.get(url).text))[4]
-    tickers = table['Ticker'].tolist()
-    names = table['Company'].tolist()
-    return [(t, n) for t, n in zip(tickers, names)]
-
-def get_dax40_tickers_with_names():
-    url = 'https://en.wikipedia.org/wiki/DAX'
-    table = pd.read_html(StringIO(requests.get(url).text))[3]
-    tickers = table['Ticker symbol'].tolist()
-    names = table['Company'].tolist()
-    tickers = [t + '.DE' if not t.endswith('.DE') else t for t in tickers]
-    return [(t, n) for t, n in zip(tickers, names)]
-
-def get_ftse100_tickers_with_names():
-    url = 'https://en.wikipedia.org/wiki/FTSE_100_Index'
-    table = pd.read_html(StringIO(requests.get(url).text))[3]
-    tickers = table['EPIC'].tolist()
-    names = table['Company'].tolist()
-    tickers = [t + '.L' if not t.endswith('.L') else t for t in tickers]
-    return [(t, n) for t, n in zip(tickers, names)]
+# Cache disque des prix: seules les barres manquantes sont téléchargées à chaque optimisation
+PRICE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.risk_return_wallet', 'prices')
+RESULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.risk_return_wallet', 'results')
 
 class PortfolioOptimizerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Optimiseur de Portefeuille")
-        self.root.geometry("900x700")
+        self.root.geometry("900x950")
+        
+        # Initialisation des composants (chargés à la demande)
+        self._data_loader = None
+        self._visualizer = None
+        self._result_cache = None
         
-        # Initialisation des composants
-        self.data_loader = DataLoader()
-        self.visualizer = PortfolioVisualizer()
+        # Pipeline d'optimisation en arrière-plan: messages (id d'exécution, type, ...)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="optimize")
+        self._pipeline_queue = queue.Queue()
+        self._run_id = 0
+        self._cancel_event = None
+        self._frontier_canvas = None
         self.selected_tickers = []
         self.ticker_name_map = {}  # Pour afficher le nom complet
         
-        # Chargement dynamique des tickers
+        # Univers de tickers: instantané local ou liste statique, rafraîchi en arrière-plan
+        self._universe_updates = queue.Queue()
         self.all_tickers = self.load_all_tickers()
         
         self.create_widgets()
+        self.root.after(500, self._poll_universe)
+        
+    @property
+    def data_loader(self):
+        if self._data_loader is None:
+            from data_loader import DataLoader
+            self._data_loader = DataLoader(cache_dir=PRICE_CACHE_DIR)
+        return self._data_loader
+        
+    @property
+    def result_cache(self):
+        if self._result_cache is None:
+            from result_cache import ResultCache
+            self._result_cache = ResultCache(max_entries=32, cache_dir=RESULT_CACHE_DIR)
+        return self._result_cache
+        
+    @property
+    def visualizer(self):
+        if self._visualizer is None:
+            from plots import PortfolioVisualizer
+            self._visualizer = PortfolioVisualizer(block=False)
+        return self._visualizer
         
     def load_all_tickers(self):
-        tickers = []
-        try:
-            sp500 = get_sp500_tickers_with_names()
-            cac40 = get_cac40_tickers_with_names()
-            nasdaq100 = get_nasdaq100_tickers_with_names()
-            dax40 = get_dax40_tickers_with_names()
-            ftse100 = get_ftse100_tickers_with_names()
-            tickers = sp500 + cac40 + nasdaq100 + dax40 + ftse100
-        except Exception as e:
-            # Fallback sur une liste statique très enrichie
-            tickers = [
-                ('AAPL', 'Apple'), ('MSFT', 'Microsoft'), ('GOOGL', 'Alphabet'),
-                ('AMZN', 'Amazon'), ('TSLA', 'Tesla'), ('META', 'Meta Platforms'),
-                ('NVDA', 'Nvidia'), ('JPM', 'JPMorgan Chase'), ('V', 'Visa'),
-                ('UNH', 'UnitedHealth'), ('HD', 'Home Depot'), ('PG', 'Procter & Gamble'),
-                ('MA', 'Mastercard'), ('DIS', 'Disney'), ('BAC', 'Bank of America'),
-                ('XOM', 'Exxon Mobil'), ('PFE', 'Pfizer'), ('KO', 'Coca-Cola'),
-                ('PEP', 'PepsiCo'), ('CSCO', 'Cisco'), ('ORCL', 'Oracle'),
-                ('T', 'AT&T'), ('INTC', 'Intel'), ('CMCSA', 'Comcast'),
-                ('NFLX', 'Netflix'), ('ADBE', 'Adobe'), ('CRM', 'Salesforce'),
-                ('ABT', 'Abbott'), ('MCD', "McDonald's"), ('NKE', 'Nike'),
-                ('WMT', 'Walmart'), ('CVX', 'Chevron'), ('MRK', 'Merck'),
-                ('TMO', 'Thermo Fisher'), ('COST', 'Costco'), ('DHR', 'Danaher'),
-                ('LLY', 'Eli Lilly'), ('AVGO', 'Broadcom'), ('TXN', 'Texas Instruments'),
-                ('QCOM', 'Qualcomm'), ('LIN', 'Linde'), ('HON', 'Honeywell'),
-                ('NEE', 'NextEra Energy'), ('PM', 'Philip Morris'), ('IBM', 'IBM'),
-                ('SBUX', 'Starbucks'), ('MDT', 'Medtronic'), ('AMGN', 'Amgen'),
-                ('LOW', "Lowe's"), ('AMAT', 'Applied Materials'), ('GE', 'General Electric'),
-                ('CAT', 'Caterpillar'), ('GS', 'Goldman Sachs'), ('AXP', 'American Express'),
-                ('BLK', 'BlackRock'), ('SPY', 'S&P500 ETF'), ('QQQ', 'Nasdaq100 ETF'),
-                ('EEM', 'Emerging Markets ETF'), ('IWM', 'Russell 2000 ETF'),
-                ('DIA', 'Dow Jones ETF'), ('AIR.PA', 'Airbus'), ('MC.PA', 'LVMH'),
-                ("OR.PA", "L'Oréal"), ('BNP.PA', 'BNP Paribas'), ('SAN.PA', 'Sanofi'),
-                ('SU.PA', 'Schneider Electric'), ('DG.PA', 'Vinci'), ('VIE.PA', 'Veolia'),
-                ('ADS.DE', 'Adidas'), ('ALV.DE', 'Allianz'), ('BAS.DE', 'BASF'),
-                ('BAYN.DE', 'Bayer'), ('BMW.DE', 'BMW'), ('DAI.DE', 'Mercedes-Benz'),
-                ('DBK.DE', 'Deutsche Bank'), ('DPW.DE', 'Deutsche Post'),
-                ('DTE.DE', 'Deutsche Telekom'), ('FME.DE', 'Fresenius'),
-                ('FRE.DE', 'Fresenius SE'), ('HEI.DE', 'HeidelbergCement'),
-                ('HEN3.DE', 'Henkel'), ('IFX.DE', 'Infineon'), ('LHA.DE', 'Lufthansa'),
-                ('LIN.DE', 'Linde'), ('MRK.DE', 'Merck KGaA'), ('MUV2.DE', 'Munich Re'),
-                ('RWE.DE', 'RWE'), ('SAP.DE', 'SAP'), ('SIE.DE', 'Siemens'),
-                ('VOW3.DE', 'Volkswagen'), ('BARC.L', 'Barclays'), ('BP.L', 'BP'),
-                ('GSK.L', 'GSK'), ('HSBA.L', 'HSBC'), ('RIO.L', 'Rio Tinto'),
-                ('SHEL.L', 'Shell'), ('ULVR.L', 'Unilever'), ('VOD.L', 'Vodafone'),
-                ('AZN.L', 'AstraZeneca'), ('LLOY.L', 'Lloyds')
-            ]
+        tickers = load_universe(on_refresh=self._universe_updates.put)
         self.ticker_name_map = {t: n for t, n in tickers}
         return [f"{t} ({n})" for t, n in tickers]
 
+    def _poll_universe(self):
+        """Applique sur le thread Tk l'univers rafraîchi en arrière-plan."""
+        try:
+            tickers = self._universe_updates.get_nowait()
+        except queue.Empty:
+            self.root.after(500, self._poll_universe)
+            return
+        self.ticker_name_map = {t: n for t, n in tickers}
+        self.all_tickers = [f"{t} ({n})" for t, n in tickers]
+        self.ticker_combo['values'] = self.all_tickers
+
     def create_widgets(self):
         """Crée les widgets de l'interface."""
         param_frame = ttk.LabelFrame(self.root, text="Paramètres", padding="10")
@@ -157,14 +118,15 @@ class PortfolioOptimizerApp:
         ttk.Label(param_frame, text="Période:").pack(anchor="w")
         self.period_var = tk.StringVar(value="1y")
         period_combo = ttk.Combobox(param_frame, textvariable=self.period_var)
-        period_combo['values'] = ('1mo', '2mo', '3mo', '6mo', '1y', '2y', '5y')
+        period_combo['values'] = ('1d', '5d', '1mo', '2mo', '3mo', '6mo', '1y', '2y', '5y')
         period_combo.pack(fill="x", pady=5)
         
         # Intervalle
         ttk.Label(param_frame, text="Intervalle:").pack(anchor="w")
         self.interval_var = tk.StringVar(value="1d")
         interval_combo = ttk.Combobox(param_frame, textvariable=self.interval_var)
-        interval_combo['values'] = ('1d', '1wk', '1mo')
+        # Infra-journalier: historique limité par yfinance (7 jours en 1m, 60 jours jusqu'à 30m)
+        interval_combo['values'] = ('1m', '5m', '15m', '30m', '1h', '1d', '1wk', '1mo')
         interval_combo.pack(fill="x", pady=5)
         
         # Type d'optimisation
@@ -174,6 +136,8 @@ class PortfolioOptimizerApp:
                        variable=self.optim_type_var, value="sharpe").pack(anchor="w")
         ttk.Radiobutton(param_frame, text="Rendement cible", 
                        variable=self.optim_type_var, value="target").pack(anchor="w")
+        ttk.Radiobutton(param_frame, text="Parité de risque hiérarchique (sans QP, grands univers)",
+                       variable=self.optim_type_var, value="hrp").pack(anchor="w")
         
         # Rendement cible
         self.target_frame = ttk.Frame(param_frame)
@@ -184,8 +148,24 @@ class PortfolioOptimizerApp:
                                            textvariable=self.target_return_var, width=10)
         self.target_return_entry.pack(side="left", padx=5)
         
-        # Bouton d'optimisation
-        ttk.Button(self.root, text="Optimiser", command=self.optimize).pack(pady=10)
+        # Boutons d'optimisation et d'annulation
+        button_frame = ttk.Frame(self.root)
+        button_frame.pack(pady=10)
+        self.optimize_button = ttk.Button(button_frame, text="Optimiser", command=self.optimize)
+        self.optimize_button.pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Annuler", command=self.cancel_optimization,
+                                        state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+        
+        # Progression par étape
+        self.stage_var = tk.StringVar(value="")
+        ttk.Label(self.root, textvariable=self.stage_var).pack(anchor="w", padx=10)
+        self.progress_var = tk.DoubleVar(value=0.0)
+        ttk.Progressbar(self.root, variable=self.progress_var, maximum=100).pack(fill="x", padx=10)
+        
+        # Frontière efficiente, tracée au fur et à mesure (graphique créé à la première optimisation)
+        self.chart_frame = ttk.Frame(self.root)
+        self.chart_frame.pack(fill="both", expand=True, padx=10, pady=5)
         
     def add_ticker(self):
         combo_value = self.ticker_var.get().strip()
@@ -213,57 +193,194 @@ class PortfolioOptimizerApp:
             self.selected_tickers.remove(ticker)
 
     def optimize(self):
-        """Lance l'optimisation du portefeuille."""
+        """Lance l'optimisation du portefeuille en arrière-plan."""
+        tickers = list(self.selected_tickers)
+        if not tickers:
+            messagebox.showerror("Erreur", "Veuillez sélectionner au moins un ticker.")
+            return
+        params = {
+            'tickers': tickers,
+            'period': self.period_var.get(),
+            'interval': self.interval_var.get(),
+            'optim_type': self.optim_type_var.get(),
+            'target_return': self.target_return_var.get(),
+        }
+        
+        self._run_id += 1
+        self._cancel_event = threading.Event()
+        self.optimize_button.state(["disabled"])
+        self.cancel_button.state(["!disabled"])
+        self.progress_var.set(0.0)
+        self._reset_frontier_chart()
+        self._executor.submit(self._run_pipeline, self._run_id, params, self._cancel_event)
+        self.root.after(50, self._poll_pipeline)
+
+    def cancel_optimization(self):
+        """Demande l'arrêt de l'optimisation en cours (prise en compte entre deux étapes)."""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.stage_var.set("Annulation...")
+
+    def _run_pipeline(self, run_id, params, cancel):
+        """Exécute le pipeline dans un thread de travail ; aucun appel Tk ici."""
+        def post(*message):
+            self._pipeline_queue.put((run_id,) + message)
+        
         try:
-            tickers = self.selected_tickers
-            if not tickers:
-                messagebox.showerror("Erreur", "Veuillez sélectionner au moins un ticker.")
-                return
-            period = self.period_var.get()
-            interval = self.interval_var.get()
+            post('stage', "Téléchargement des données...", 0.0)
+            prices = self.data_loader.get_market_data(params['tickers'], params['period'], params['interval'])
+            if cancel.is_set():
+                return post('cancelled')
             
-            # Récupération des données
-            prices = self.data_loader.get_market_data(tickers, period, interval)
+            post('stage', "Calcul des statistiques...", 30.0)
             returns, mean_returns, cov_matrix = self.data_loader.calculate_returns(prices)
+            if cancel.is_set():
+                return post('cancelled')
             
             # Création de l'optimiseur
-            optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+            post('stage', "Optimisation...", 40.0)
+            from optimizer import PortfolioOptimizer
+            optimizer = PortfolioOptimizer(mean_returns, cov_matrix, cache=self.result_cache)
             
             # Optimisation selon le type choisi
-            if self.optim_type_var.get() == "sharpe":
+            if params['optim_type'] == "sharpe":
                 weights, ret, risk = optimizer.max_sharpe_ratio()
+            elif params['optim_type'] == "hrp":
+                weights, ret, risk = optimizer.hierarchical_risk_parity()
             else:
-                target_return_annual = float(self.target_return_var.get()) / 100
-                freq = interval
-                if freq == "1 jour":
-                    periods = 252
-                elif freq == "1 semaine":
-                    periods = 52
-                elif freq == "1 mois":
-                    periods = 12
-                else:
-                    periods = 252  # fallback
+                from price_cache import bars_per_year
+                target_return_annual = float(params['target_return']) / 100
+                # Barres par an mesurées sur les dates reçues (séances réelles en infra-journalier)
+                periods = bars_per_year(params['interval'], prices.index)
                 # Conversion du rendement annualisé en rendement par période
                 target_return_period = (1 + target_return_annual) ** (1 / periods) - 1
                 weights, ret, risk = optimizer.optimize_portfolio(target_return=target_return_period)
+            post('optimal', ret, risk)
             
-            # Calcul de la frontière efficiente
-            ef_returns, ef_risks, _ = optimizer.efficient_frontier()
-            
-            # Affichage des résultats
-            self.visualizer.plot_efficient_frontier(ef_returns, ef_risks, 
-                                                  optimal_point=(ret, risk))
-            self.visualizer.plot_weights(weights, tickers, name_map=self.ticker_name_map)
-            self.visualizer.plot_correlation_matrix(returns.corr())
+            # Calcul de la frontière efficiente, transmise par lots
+            post('stage', "Frontière efficiente...", 50.0)
+            n_points = 100
+            computed = 0
+            frontier_weights = [weights[None, :]]
+            for ef_returns, ef_risks, ef_weights in optimizer.iter_efficient_frontier(n_points):
+                if cancel.is_set():
+                    return post('cancelled')
+                computed += len(ef_returns)
+                frontier_weights.append(ef_weights)
+                post('frontier', ef_returns, ef_risks, 50.0 + 45.0 * computed / n_points)
             
-            # Affichage des statistiques
-            stats = f"Rendement espéré: {ret*100:.2f}%\nRisque: {risk*100:.2f}%"
-            messagebox.showinfo("Résultats", stats)
+            # Mesures de risque du portefeuille optimal (ligne 0) et de toute la frontière,
+            # en un seul passage sur l'historique, sans nouvelle résolution
+            post('stage', "Analyse des risques...", 95.0)
+            import numpy as np
+            from risk import RiskAnalyzer
+            analyzer = RiskAnalyzer(returns, cov_matrix)
+            risk_summary = analyzer.summary(np.vstack(frontier_weights))
+            _, _, contributions = analyzer.risk_contributions(weights)
             
+            # Corrélations tirées de la covariance estimée (semi-définie positive, même
+            # avec des calendriers de cotation différents)
+            std = cov_matrix.values.diagonal() ** 0.5
+            post('done', weights, ret, risk, params['tickers'], cov_matrix / std / std[:, None],
+                 risk_summary, contributions)
         except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+            post('error', str(e))
+
+    def _poll_pipeline(self):
+        """Traite sur le thread Tk les messages du pipeline en cours."""
+        finished = False
+        while True:
+            try:
+                run_id, kind, *payload = self._pipeline_queue.get_nowait()
+            except queue.Empty:
+                break
+            if run_id != self._run_id:
+                continue  # message d'une exécution annulée
+            if kind == 'stage':
+                self.stage_var.set(payload[0])
+                self.progress_var.set(payload[1])
+            elif kind == 'optimal':
+                self._plot_optimal_point(*payload)
+            elif kind == 'frontier':
+                self._extend_frontier_chart(payload[0], payload[1])
+                self.progress_var.set(payload[2])
+            elif kind == 'done':
+                self._show_results(*payload)
+                finished = True
+            elif kind == 'error':
+                self.stage_var.set("Erreur")
+                messagebox.showerror("Erreur", payload[0])
+                finished = True
+            elif kind == 'cancelled':
+                self.stage_var.set("Optimisation annulée")
+                finished = True
+        
+        if finished:
+            self.optimize_button.state(["!disabled"])
+            self.cancel_button.state(["disabled"])
+            self._cancel_event = None
+        else:
+            self.root.after(50, self._poll_pipeline)
+
+    def _reset_frontier_chart(self):
+        """Crée (une fois) puis vide le graphique intégré de la frontière."""
+        if self._frontier_canvas is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self._frontier_figure = Figure(figsize=(8, 4))
+            self._frontier_ax = self._frontier_figure.add_subplot(111)
+            self._frontier_canvas = FigureCanvasTkAgg(self._frontier_figure, master=self.chart_frame)
+            self._frontier_canvas.get_tk_widget().pack(fill="both", expand=True)
+        ax = self._frontier_ax
+        ax.clear()
+        ax.set_xlabel('Risque (Écart-type)')
+        ax.set_ylabel('Rendement Espéré')
+        ax.set_title("Frontière Efficiente")
+        ax.grid(True)
+        self._frontier_line, = ax.plot([], [], 'b-', label='Frontière Efficiente')
+        self._frontier_points = []
+        self._frontier_canvas.draw_idle()
+
+    def _extend_frontier_chart(self, ef_returns, ef_risks):
+        """Ajoute un lot de points à la frontière affichée."""
+        self._frontier_points.extend(zip(ef_returns, ef_risks))
+        self._frontier_points.sort()
+        self._frontier_line.set_data([r for _, r in self._frontier_points],
+                                     [m for m, _ in self._frontier_points])
+        self._frontier_ax.relim()
+        self._frontier_ax.autoscale_view()
+        self._frontier_canvas.draw_idle()
+
+    def _plot_optimal_point(self, ret, risk):
+        self._frontier_ax.plot(risk, ret, 'ro', label='Portefeuille Optimal')
+        self._frontier_ax.legend()
+        self._frontier_canvas.draw_idle()
+
+    def _show_results(self, weights, ret, risk, tickers, corr_matrix, risk_summary, contributions):
+        """Affiche les graphiques et statistiques d'une optimisation terminée."""
+        self.stage_var.set("Terminé")
+        self.progress_var.set(100.0)
+        self.visualizer.plot_weights(weights, tickers, name_map=self.ticker_name_map)
+        self.visualizer.plot_correlation_matrix(corr_matrix)
+        self.visualizer.plot_risk_contributions(contributions, tickers, name_map=self.ticker_name_map)
+        self.visualizer.plot_frontier_risk(risk_summary.iloc[1:])
+        
+        # Affichage des statistiques (ligne 0: portefeuille optimal)
+        optimal = risk_summary.iloc[0]
+        stats = (f"Rendement espéré: {ret*100:.2f}%\nRisque: {risk*100:.2f}%\n"
+                 f"VaR 95% (historique): {optimal['var']*100:.2f}%\n"
+                 f"CVaR 95% (historique): {optimal['cvar']*100:.2f}%\n"
+                 f"Perte maximale: {optimal['max_drawdown']*100:.2f}%")
+        messagebox.showinfo("Résultats", stats)
 
 if __name__ == "__main__":
+    # RISK_RETURN_TRACE=trace.json: trace Chrome de la session écrite à la fermeture
+    trace_path = os.environ.get('RISK_RETURN_TRACE')
+    if trace_path:
+        import instrumentation
+        instrumentation.enable()
     root = tk.Tk()
     app = PortfolioOptimizerApp(root)
-    root.mainloop() 
\ No newline at end of file
+    root.mainloop()
+    if trace_path:
+        instrumentation.export_chrome_trace(trace_path) 
\ No newline at end of file
@@ -0,0 +1,563 @@
+import threading
+import numpy as np
+from abc import ABC, abstractmethod
+from cvxopt import matrix, solvers, spmatrix
+from typing import List, Optional, Sequence, Tuple, Union
+from covariance import CovarianceModel, FactorCovariance
+from constraints import PortfolioConstraints
+from instrumentation import instrument, record_solver, span
+
+# Options cvxopt passées à chaque appel: solvers.options est global et partagé entre threads
+SOLVER_OPTIONS = {'show_progress': False, 'abstol': 1e-8, 'reltol': 1e-7, 'feastol': 1e-8}
+
+
+def solve_covariance(covariance: CovarianceModel, rhs: np.ndarray) -> np.ndarray:
+    """
+    Calcule Σ⁻¹·rhs.
+
+    Pour un modèle à facteurs Σ = BFBᵀ + D, la formule de Woodbury
+    Σ⁻¹ = D⁻¹ - D⁻¹B(I + FBᵀD⁻¹B)⁻¹FBᵀD⁻¹ évite de former Σ (O(n·k²)).
+
+    Args:
+        covariance: Modèle de covariance
+        rhs: Seconds membres (vecteur ou matrice n x m)
+
+    Returns:
+        Σ⁻¹·rhs
+    """
+    rhs = np.asarray(rhs, dtype=float)
+    try:
+        if isinstance(covariance, FactorCovariance) and np.all(covariance.specific_var > 0):
+            B, F = covariance.loadings, covariance.factor_cov
+            inv_d = 1.0 / covariance.specific_var
+            scaled = rhs * (inv_d if rhs.ndim == 1 else inv_d[:, None])
+            core = np.eye(covariance.n_factors) + F @ ((B.T * inv_d) @ B)
+            correction = (B * inv_d[:, None]) @ np.linalg.solve(core, F @ (B.T @ scaled))
+            return scaled - correction
+        return np.linalg.solve(covariance.dense(), rhs)
+    except np.linalg.LinAlgError:
+        raise ValueError("La matrice de covariance est singulière")
+
+
+@instrument
+class SolverBackend(ABC):
+    name = ''
+    # True si le problème résolu est celui de la ligne critique (bornes par actif, budget)
+    critical_line = True
+
+    def __init__(self):
+        """
+        Interface des solveurs de PortfolioOptimizer.
+
+        Un solveur renvoie des poids bruts ; la normalisation, le rendement, le risque et
+        le cache de résultats restent dans l'optimiseur. Une instance peut être partagée
+        entre threads (service): les factorisations mises en cache sont propres à chaque thread.
+        """
+        self._local = threading.local()
+
+    @property
+    def _state(self):
+        """Factorisation mise en cache pour le dernier univers résolu par ce thread."""
+        return getattr(self._local, 'state', None)
+
+    @_state.setter
+    def _state(self, value) -> None:
+        self._local.state = value
+
+    def check(self, constraints: PortfolioConstraints) -> None:
+        """Lève ValueError si ce solveur ne gère pas les contraintes données."""
+        lower, upper = constraints.bounds()
+        if not (np.all(np.isfinite(lower)) and np.all(np.isfinite(upper))):
+            raise ValueError(f"Le solveur {self.name} nécessite des bornes finies sur les poids "
+                             "(voir le solveur 'analytic' pour des ventes à découvert sans limite)")
+
+    def solve_target(self, optimizer, target_return: float,
+                     initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Portefeuille de variance minimale pour un rendement cible.
+
+        Args:
+            optimizer: PortfolioOptimizer (rendements, covariance, contraintes)
+            target_return: Rendement cible
+            initial_weights: Poids de départ (démarrage à chaud)
+
+        Returns:
+            Poids
+        """
+        weights = self.solve_targets(optimizer, [target_return], initial_weights)[0]
+        if not np.all(np.isfinite(weights)):
+            raise ValueError("L'optimisation n'a pas convergé")
+        return weights
+
+    @abstractmethod
+    def solve_targets(self, optimizer, target_returns: Sequence[float],
+                      initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Portefeuilles de variance minimale pour plusieurs rendements cibles.
+
+        Args:
+            optimizer: PortfolioOptimizer
+            target_returns: Rendements cibles
+            initial_weights: Poids de départ (démarrage à chaud)
+
+        Returns:
+            Poids (cibles x actifs) ; NaN pour les cibles non résolues
+        """
+
+    @abstractmethod
+    def max_sharpe(self, optimizer, risk_free_rate: float,
+                   initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Portefeuille de ratio de Sharpe maximum.
+
+        Args:
+            optimizer: PortfolioOptimizer
+            risk_free_rate: Taux sans risque
+            initial_weights: Poids de départ (démarrage à chaud)
+
+        Returns:
+            Poids
+        """
+
+
+@instrument
+class CvxoptBackend(SolverBackend):
+    name = 'cvxopt'
+
+    def _build_qp(self, optimizer, equality_rows: np.ndarray, equality_rhs: List[float],
+                  homogeneous: bool = False) -> Tuple[matrix, ...]:
+        """
+        Assemble le QP min w'Σw sous les contraintes d'inégalité et d'égalité données.
+
+        Les variables sont [w, z, t, κ]: z = Bᵀw avec un modèle à facteurs (l'objectif
+        devient w'Dw + z'Fz, bloc-diagonal et creux, et Σ n'est jamais formée), t les
+        variables auxiliaires de rotation, κ l'échelle du problème homogénéisé
+        (contraintes G·w <= h·κ et Σw = κ). G est toujours creuse.
+
+        Args:
+            optimizer: PortfolioOptimizer
+            equality_rows: Lignes des contraintes d'égalité sur les poids (m x n)
+            equality_rhs: Seconds membres des contraintes d'égalité
+            homogeneous: Ajoute la variable d'échelle κ (ratio de Sharpe)
+
+        Returns:
+            Tuple (P, q, G, h, A, b) pour cvxopt
+        """
+        covariance = optimizer.covariance
+        n = optimizer.n_assets
+        factor = isinstance(covariance, FactorCovariance)
+        k = covariance.n_factors if factor else 0
+        n_aux = optimizer.constraints.n_auxiliary
+        n_vars = n + k + n_aux + int(homogeneous)
+
+        # Objectif
+        if factor:
+            F_rows, F_cols = np.meshgrid(np.arange(k), np.arange(k), indexing='ij')
+            P = spmatrix(np.concatenate((covariance.specific_var, covariance.factor_cov.ravel())).tolist(),
+                         np.concatenate((np.arange(n), n + F_rows.ravel())).tolist(),
+                         np.concatenate((np.arange(n), n + F_cols.ravel())).tolist(), (n_vars, n_vars))
+        elif n_vars == n:
+            P = matrix(covariance.dense())
+        else:
+            padded = np.zeros((n_vars, n_vars))
+            padded[:n, :n] = covariance.dense()
+            P = matrix(padded)
+        q = matrix(0.0, (n_vars, 1))
+
+        # Inégalités creuses; dans le cas homogène, h·κ passe à gauche
+        G, h = optimizer.constraints.build(n_vars, n + k)
+        if homogeneous:
+            rows = np.flatnonzero(h)
+            G = G + spmatrix((-h[rows]).tolist(), rows.tolist(), [n_vars - 1] * len(rows), G.size)
+            h = np.zeros_like(h)
+
+        # Égalités: contraintes sur w, z = Bᵀw, Σw = κ
+        equality_rows = np.atleast_2d(np.asarray(equality_rows, dtype=float))
+        blocks = [np.hstack((equality_rows, np.zeros((len(equality_rows), n_vars - n))))]
+        rhs = [np.asarray(equality_rhs, dtype=float)]
+        if factor:
+            blocks.append(np.hstack((covariance.loadings.T, -np.eye(k), np.zeros((k, n_vars - n - k)))))
+            rhs.append(np.zeros(k))
+        if homogeneous:
+            budget = np.zeros((1, n_vars))
+            budget[0, :n] = 1.0
+            budget[0, -1] = -1.0
+            blocks.append(budget)
+            rhs.append(np.zeros(1))
+        A = matrix(np.vstack(blocks))
+        b = matrix(np.concatenate(rhs))
+        return P, q, G, matrix(h), A, b
+
+    def _initial_point(self, optimizer, weights: np.ndarray, scale: Optional[float] = None) -> np.ndarray:
+        """
+        Point de départ complet [w, z, t, κ] à partir de poids (démarrage à chaud).
+
+        Args:
+            optimizer: PortfolioOptimizer
+            weights: Poids (ou poids homogénéisés y = κ·w)
+            scale: Échelle κ du problème homogénéisé (None sinon)
+        """
+        weights = np.asarray(weights, dtype=float)
+        parts = [weights]
+        if isinstance(optimizer.covariance, FactorCovariance):
+            parts.append(optimizer.covariance.loadings.T @ weights)
+        if scale is None:
+            parts.append(optimizer.constraints.auxiliary_start(weights))
+        else:
+            parts.append(optimizer.constraints.auxiliary_start(weights / scale) * scale)
+            parts.append([scale])
+        return np.concatenate(parts)
+
+    def _solve_qp(self, optimizer, P: matrix, q: matrix, G: matrix, h: matrix,
+                  A: matrix, b: matrix, initial_x: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Résout le problème quadratique.
+
+        Args:
+            initial_x: Point de départ sur toutes les variables (démarrage à chaud, voir _initial_point)
+
+        Returns:
+            Poids (non normalisés)
+        """
+        initvals = None
+        if initial_x is not None:
+            x0 = matrix(np.asarray(initial_x, dtype=float))
+            slack = np.array(h - G * x0).ravel()
+            initvals = {'x': x0, 's': matrix(np.maximum(slack, 1e-6))}
+
+        with span('cvxopt.qp', n_variables=P.size[0], warm_start=initvals is not None):
+            sol = solvers.qp(P, q, G, h, A, b, initvals=initvals, options=SOLVER_OPTIONS)
+        record_solver(sol)
+
+        if sol['status'] != 'optimal':
+            raise ValueError(f"L'optimisation n'a pas convergé: {sol['status']}")
+        return np.array(sol['x']).flatten()[:optimizer.n_assets]
+
+    def solve_target(self, optimizer, target_return: float,
+                     initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        A = np.vstack((np.ones(optimizer.n_assets), optimizer.mean_returns.values))
+        initial_x = None if initial_weights is None else self._initial_point(optimizer, initial_weights)
+        return self._solve_qp(optimizer, *self._build_qp(optimizer, A, [1.0, target_return]),
+                              initial_x=initial_x)
+
+    def solve_targets(self, optimizer, target_returns: Sequence[float],
+                      initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Le QP est assemblé une seule fois ; chaque cible démarre de la solution précédente."""
+        A = np.vstack((np.ones(optimizer.n_assets), optimizer.mean_returns.values))
+        P, q, G, h, A, b = self._build_qp(optimizer, A, [1.0, 0.0])
+        results = np.full((len(target_returns), optimizer.n_assets), np.nan)
+        previous = initial_weights
+        for i, target in enumerate(target_returns):
+            b[1] = float(target)
+            initial_x = None if previous is None else self._initial_point(optimizer, previous)
+            try:
+                results[i] = previous = self._solve_qp(optimizer, P, q, G, h, A, b, initial_x=initial_x)
+            except ValueError:
+                previous = None
+        return results
+
+    def max_sharpe(self, optimizer, risk_free_rate: float,
+                   initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Le problème est homogénéisé (y = w / κ avec (μ - r_f)'y = 1) pour devenir un
+        unique QP convexe: min y'Σy sous y >= 0, puis w = y / Σy.
+        """
+        excess_returns = optimizer.mean_returns.values - risk_free_rate
+        # Point de départ homogénéisé y = w / ((μ - r_f)'w)
+        initial_x = None
+        if initial_weights is not None and np.dot(excess_returns, initial_weights) > 0:
+            initial_y = np.asarray(initial_weights) / np.dot(excess_returns, initial_weights)
+            initial_x = self._initial_point(optimizer, initial_y, scale=initial_y.sum())
+        return self._solve_qp(optimizer, *self._build_qp(optimizer, excess_returns, [1.0], homogeneous=True),
+                              initial_x=initial_x)
+
+
+@instrument
+class ClosedFormBackend(SolverBackend):
+    name = 'analytic'
+    critical_line = False
+
+    def __init__(self):
+        """
+        Frontière analytique du portefeuille investi à 100 %, ventes à découvert autorisées.
+
+        Avec a = 1ᵀΣ⁻¹1, b = 1ᵀΣ⁻¹μ, c = μᵀΣ⁻¹μ et d = ac - b², le portefeuille de variance
+        minimale de rendement r est w(r) = Σ⁻¹[(c - br)·1 + (ar - b)·μ] / d, affine en r :
+        une fois Σ⁻¹[1, μ] calculé, toute la frontière s'obtient sans itération. Les poids
+        pouvant être négatifs, seules des contraintes explicitement sans borne sont acceptées
+        (PortfolioConstraints.unconstrained) ; les contraintes par défaut w >= 0 sont refusées.
+        """
+        super().__init__()
+
+    def check(self, constraints: PortfolioConstraints) -> None:
+        if not constraints.is_unconstrained:
+            raise ValueError("Le solveur analytique autorise les ventes à découvert: il nécessite des "
+                             "contraintes sans borne (PortfolioConstraints.unconstrained)")
+
+    def _prepare(self, optimizer) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        """Σ⁻¹1, Σ⁻¹μ, a et b, calculés une fois par univers."""
+        if (self._state is None or self._state[0] is not optimizer.covariance
+                or self._state[1] is not optimizer.mean_returns):
+            mu = optimizer.mean_returns.to_numpy(dtype=float)
+            solved = solve_covariance(optimizer.covariance, np.column_stack((np.ones(len(mu)), mu)))
+            a, b, c = solved[:, 0].sum(), solved[:, 1].sum(), mu @ solved[:, 1]
+            if a * c - b * b <= 1e-12 * a * c:
+                raise ValueError("Frontière dégénérée: rendements moyens identiques")
+            self._state = (optimizer.covariance, optimizer.mean_returns, solved, a, b, c)
+        return self._state[2:]
+
+    def solve_targets(self, optimizer, target_returns: Sequence[float],
+                      initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        solved, a, b, c = self._prepare(optimizer)
+        d = a * c - b * b
+        base = (c * solved[:, 0] - b * solved[:, 1]) / d
+        slope = (a * solved[:, 1] - b * solved[:, 0]) / d
+        return base + np.outer(np.asarray(target_returns, dtype=float), slope)
+
+    def max_sharpe(self, optimizer, risk_free_rate: float,
+                   initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Portefeuille tangent Σ⁻¹(μ - r_f) / 1ᵀΣ⁻¹(μ - r_f)."""
+        solved, a, b, c = self._prepare(optimizer)
+        if b - risk_free_rate * a <= 0:
+            raise ValueError("Le taux sans risque dépasse le rendement du portefeuille de variance minimale")
+        return (solved[:, 1] - risk_free_rate * solved[:, 0]) / (b - risk_free_rate * a)
+
+
+@instrument
+class AdmmBackend(SolverBackend):
+    name = 'numpy'
+
+    def __init__(self, tolerance: float = 1e-7, polish_tolerance: float = 1e-4,
+                 max_iterations: int = 5000,
+                 relaxation: float = 1.6, check_every: int = 10):
+        """
+        Solveur ADMM vectorisé (NumPy seul) pour des bornes par actif.
+
+        Le QP min w'Σw sous Aw = b, l <= w <= u est éclaté en x (égalités) et z (bornes).
+        Dans la base propre Σ = VΛVᵀ, l'étape en x se réduit à deux produits matriciels
+        et à un système 2 x 2 par cible: toutes les cibles avancent ensemble, chacune avec
+        son propre pas ρ, ajusté selon l'équilibre des résidus primal et dual. Dès que
+        les résidus passent sous `polish_tolerance`, l'ensemble des bornes actives est
+        deviné et le QP réduit aux actifs libres est résolu exactement ; la solution est
+        acceptée si elle vérifie les conditions KKT.
+
+        Args:
+            tolerance: Tolérance relative d'arrêt sur les résidus primal et dual
+            polish_tolerance: Résidus à partir desquels la résolution exacte est tentée
+            max_iterations: Nombre maximum d'itérations
+            relaxation: Coefficient de sur-relaxation (entre 1 et 2)
+            check_every: Intervalle de test d'arrêt et d'ajustement de ρ
+        """
+        super().__init__()
+        self.tolerance = tolerance
+        self.polish_tolerance = polish_tolerance
+        self.max_iterations = max_iterations
+        self.relaxation = relaxation
+        self.check_every = check_every
+
+    @property
+    def iterations(self) -> int:
+        """Nombre d'itérations de la dernière résolution ADMM de ce thread."""
+        return getattr(self._local, 'iterations', 0)
+
+    def check(self, constraints: PortfolioConstraints) -> None:
+        super().check(constraints)
+        if not constraints.is_box_only:
+            raise ValueError("Le solveur NumPy ne gère que des bornes par actif")
+
+    def _prepare(self, optimizer) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Σ normalisée (trace / n = 1) et sa décomposition propre, calculées une fois par univers."""
+        if self._state is None or self._state[0] is not optimizer.covariance:
+            sigma = optimizer.covariance.dense()
+            sigma = sigma / (np.trace(sigma) / len(sigma))
+            eigenvalues, eigenvectors = np.linalg.eigh(sigma)
+            self._state = (optimizer.covariance, sigma, np.maximum(eigenvalues, 0.0), eigenvectors)
+        return self._state[1:]
+
+    @staticmethod
+    def _polish(sigma: np.ndarray, A: np.ndarray, b: np.ndarray, lower: np.ndarray,
+                upper: np.ndarray, z: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Résout exactement le QP sur les actifs libres, les autres étant fixés à la borne
+        atteinte par z ; renvoie None si les conditions KKT ne sont pas vérifiées.
+        """
+        at_lower, at_upper = z <= lower, z >= upper
+        free = ~(at_lower | at_upper)
+        n_free, p = int(free.sum()), len(A)
+        if n_free < p:
+            return None
+        weights = np.where(at_lower, lower, np.where(at_upper, upper, 0.0))
+        fixed = ~free
+        kkt = np.zeros((n_free + p, n_free + p))
+        kkt[:n_free, :n_free] = 2.0 * sigma[np.ix_(free, free)]
+        kkt[:n_free, n_free:] = A[:, free].T
+        kkt[n_free:, :n_free] = A[:, free]
+        rhs = np.concatenate((-2.0 * sigma[np.ix_(free, fixed)] @ weights[fixed],
+                              b - A[:, fixed] @ weights[fixed]))
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            return None
+        weights[free] = solution[:n_free]
+        # Multiplicateurs des bornes actives: gradient du lagrangien sur les actifs fixés
+        curvature = 2.0 * sigma @ weights
+        gradient = curvature + A.T @ solution[n_free:]
+        slack = 1e-9 * max(np.abs(curvature).max(), 1e-30)
+        if (np.any(weights[free] < lower[free] - 1e-12) or np.any(weights[free] > upper[free] + 1e-12)
+                or np.any(gradient[at_lower] < -slack) or np.any(gradient[at_upper] > slack)):
+            return None
+        return np.clip(weights, lower, upper)
+
+    def _admm(self, optimizer, A: np.ndarray, b: np.ndarray, lower: np.ndarray,
+              upper: np.ndarray, start: np.ndarray) -> np.ndarray:
+        """
+        Résout en parallèle les QP min x'Σx sous A·x = b[:, j], lower <= x <= upper.
+
+        Args:
+            A: Contraintes d'égalité (p x n)
+            b: Seconds membres, une colonne par problème (p x m)
+            lower, upper: Bornes par actif
+            start: Point de départ (n x m)
+
+        Returns:
+            Solutions (n x m) ; NaN pour les problèmes non convergés
+        """
+        sigma, eigenvalues, V = self._prepare(optimizer)
+        alpha, tol = self.relaxation, self.tolerance
+        A_eig = A @ V
+        n, m = start.shape
+        result = np.full((n, m), np.nan)
+        active = np.arange(m)
+        z = np.clip(start, lower[:, None], upper[:, None])
+        u = np.zeros_like(z)
+        rho = np.full(m, 0.1)
+        lower, upper = lower[:, None], upper[:, None]
+        refactor = True
+        attempted = {}
+
+        for iteration in range(1, self.max_iterations + 1):
+            if refactor:
+                # Facteurs de l'étape en x, recalculés quand ρ ou les problèmes actifs changent
+                inv = 1.0 / (2.0 * eigenvalues[:, None] + rho)
+                schur = np.einsum('pi,im,qi->mpq', A_eig, inv, A_eig)
+                refactor = False
+            # Étape en x: min x'Σx + ρ/2·|x - z + u|² sous A·x = b
+            y = (V.T @ (rho * (z - u))) * inv
+            nu = np.linalg.solve(schur, (A_eig @ y - b).T[..., None])[..., 0].T
+            x_eig = y - (A_eig.T @ nu) * inv
+            x = V @ x_eig
+            # Étape en z: projection sur les bornes, avec sur-relaxation
+            x_hat = alpha * x + (1.0 - alpha) * z
+            z_prev = z
+            z = np.clip(x_hat + u, lower, upper)
+            u += x_hat - z
+
+            if iteration % self.check_every:
+                continue
+            primal = np.abs(x - z).max(axis=0)
+            dual = rho * np.abs(z - z_prev).max(axis=0)
+            primal_scale = np.maximum(np.abs(x).max(axis=0), np.abs(z).max(axis=0))
+            dual_scale = np.maximum.reduce([np.abs(V @ (2.0 * eigenvalues[:, None] * x_eig)).max(axis=0),
+                                            np.abs(A.T @ nu).max(axis=0), (rho * np.abs(u)).max(axis=0)])
+            done = (primal <= tol * (1.0 + primal_scale)) & (dual <= tol * (1.0 + dual_scale))
+            close = ~done & (primal <= self.polish_tolerance * (1.0 + primal_scale)) \
+                & (dual <= self.polish_tolerance * (1.0 + dual_scale))
+            for j in np.flatnonzero(close):
+                # Une seule tentative par ensemble actif
+                pattern = (np.packbits(z[:, j] <= lower[:, 0]).tobytes()
+                           + np.packbits(z[:, j] >= upper[:, 0]).tobytes())
+                if attempted.get(active[j]) == pattern:
+                    continue
+                attempted[active[j]] = pattern
+                polished = self._polish(sigma, A, b[:, j], lower[:, 0], upper[:, 0], z[:, j])
+                if polished is not None:
+                    z[:, j] = polished
+                    done[j] = True
+            if done.any():
+                result[:, active[done]] = z[:, done]
+                keep = ~done
+                active, z, u, rho, b = active[keep], z[:, keep], u[:, keep], rho[keep], b[:, keep]
+                primal, dual = primal[keep], dual[keep]
+                primal_scale, dual_scale = primal_scale[keep], dual_scale[keep]
+                if not active.size:
+                    break
+            # Ajustement de ρ (la variable duale réduite u = λ/ρ est remise à l'échelle)
+            ratio = np.sqrt((primal / np.maximum(primal_scale, 1e-30))
+                            / np.maximum(dual / np.maximum(dual_scale, 1e-30), 1e-30))
+            ratio = np.where((ratio > 5.0) | (ratio < 0.2), np.clip(ratio, 1e-3, 1e3), 1.0)
+            rho = rho * ratio
+            u /= ratio
+            refactor = True
+        self._local.iterations = iteration
+        return result
+
+    def _targets_problem(self, optimizer, target_returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Ligne des rendements normalisée: les deux égalités ont la même échelle
+        mu = optimizer.mean_returns.to_numpy(dtype=float)
+        scale = max(np.abs(mu).max(), 1e-30)
+        A = np.vstack((np.ones(len(mu)), mu / scale))
+        b = np.vstack((np.ones(len(target_returns)), target_returns / scale))
+        return A, b
+
+    def solve_targets(self, optimizer, target_returns: Sequence[float],
+                      initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        target_returns = np.asarray(target_returns, dtype=float)
+        n = optimizer.n_assets
+        A, b = self._targets_problem(optimizer, target_returns)
+        start = np.full(n, 1.0 / n) if initial_weights is None else np.asarray(initial_weights, dtype=float)
+        lower, upper = optimizer.constraints.bounds()
+        with span('admm.solve', n_assets=n, n_targets=len(target_returns)):
+            solutions = self._admm(optimizer, A, b, lower, upper,
+                                   np.repeat(start[:, None], len(target_returns), axis=1))
+        return solutions.T
+
+    def max_sharpe(self, optimizer, risk_free_rate: float,
+                   initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Sans autre borne que w >= 0, problème homogénéisé min y'Σy sous (μ - r_f)'y = 1,
+        y >= 0. Avec des bornes, le ratio est maximisé sur des frontières par lots de 17
+        cibles, resserrées 4 fois autour du meilleur point: le résultat est approché, à un
+        pas de grille près (environ 1/8000 de l'intervalle des rendements atteignables, la
+        perte sur le ratio étant du second ordre), là où cvxopt résout le problème exact.
+        """
+        mu = optimizer.mean_returns.to_numpy(dtype=float)
+        if optimizer.constraints.is_long_only:
+            excess = mu - risk_free_rate
+            scale = np.abs(excess).max()
+            start = np.full(len(mu), 1.0 / len(mu)) if initial_weights is None else np.asarray(initial_weights)
+            start = start / max(np.dot(excess / scale, start), 1e-12)
+            y = self._admm(optimizer, (excess / scale)[None, :], np.ones((1, 1)),
+                           np.zeros(len(mu)), np.full(len(mu), np.inf), start[:, None])[:, 0]
+            if not np.all(np.isfinite(y)):
+                raise ValueError("L'optimisation n'a pas convergé")
+            return y
+
+        low, high = optimizer._return_range()
+        weights = None
+        for _ in range(4):
+            targets = np.linspace(low, high, 17)
+            candidates = self.solve_targets(optimizer, targets, weights)
+            risks = np.sqrt(np.maximum(optimizer.covariance.portfolio_variance(candidates), 0.0))
+            sharpe = (candidates @ mu - risk_free_rate) / risks
+            if not np.any(np.isfinite(sharpe)):
+                raise ValueError("L'optimisation n'a pas convergé")
+            best = int(np.nanargmax(sharpe))
+            weights = candidates[best]
+            low, high = targets[max(best - 1, 0)], targets[min(best + 1, len(targets) - 1)]
+        return weights
+
+
+BACKENDS = {backend.name: backend for backend in (CvxoptBackend, ClosedFormBackend, AdmmBackend)}
+
+
+def get_backend(backend: Union[str, SolverBackend]) -> SolverBackend:
+    """
+    Renvoie un solveur à partir de son nom ('cvxopt', 'analytic', 'numpy') ou d'une instance.
+
+    Chaque nom donne une nouvelle instance (les factorisations mises en cache lui sont propres).
+    """
+    if isinstance(backend, SolverBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Solveur inconnu: {backend} (disponibles: {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
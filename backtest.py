@@ -0,0 +1,204 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+
+# Historique de prix complet, transmis une seule fois à chaque processus
+_WORKER_PRICES: Optional[pd.DataFrame] = None
+
+
+def _init_worker(prices: pd.DataFrame) -> None:
+    global _WORKER_PRICES
+    _WORKER_PRICES = prices
+
+
+def _solve_block(task: Tuple[List[int], int, Optional[float], float, str]) -> List[Tuple[Optional[np.ndarray], Optional[str]]]:
+    """
+    Réoptimise sur un bloc de dates de rebalancement consécutives.
+
+    Chaque résolution démarre à chaud depuis les poids de la précédente dans le bloc.
+
+    Args:
+        task: Tuple (positions des dates de rebalancement, fenêtre d'estimation,
+              rendement cible, taux sans risque, estimateur de covariance)
+
+    Returns:
+        Liste de tuples (poids ou None, message d'erreur ou None)
+    """
+    positions, lookback, target_return, risk_free_rate, covariance = task
+    loader = DataLoader()
+    previous = None
+    results = []
+    for position in positions:
+        window = _WORKER_PRICES.iloc[position - lookback:position + 1]
+        try:
+            _, mean_returns, cov_matrix = loader.calculate_returns(window, covariance=covariance)
+            optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+            weights, _, _ = optimizer.optimize_portfolio(target_return=target_return,
+                                                         risk_free_rate=risk_free_rate,
+                                                         initial_weights=previous)
+            previous = weights
+            results.append((weights, None))
+        except Exception as e:
+            results.append((None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+class WalkForwardBacktester:
+    def __init__(self, prices: pd.DataFrame, lookback: int = 252, rebalance_every: int = 21,
+                 target_return: Optional[float] = None, risk_free_rate: float = 0.0,
+                 covariance: str = "sample", transaction_cost: float = 0.0):
+        """
+        Backtest glissant: réestimation et réoptimisation périodiques.
+
+        À chaque date de rebalancement, les statistiques sont estimées sur les
+        `lookback` derniers rendements et les nouveaux poids s'appliquent à partir
+        de la barre suivante. Entre deux rebalancements, les poids dérivent avec les prix.
+
+        Args:
+            prices: DataFrame des prix (sans valeurs manquantes)
+            lookback: Nombre de rendements de la fenêtre d'estimation
+            rebalance_every: Nombre de barres entre deux rebalancements
+            target_return: Rendement cible par période (si None, ratio de Sharpe maximum)
+            risk_free_rate: Taux sans risque par période
+            covariance: Estimateur de covariance passé à DataLoader.calculate_returns
+            transaction_cost: Coût proportionnel à la rotation (ex: 0.001 pour 10 pb)
+        """
+        if prices.isnull().any().any():
+            raise ValueError("Les prix contiennent des valeurs manquantes")
+        if len(prices) <= lookback + 1:
+            raise ValueError("L'historique est trop court pour la fenêtre d'estimation choisie")
+        self.prices = prices
+        self.lookback = lookback
+        self.rebalance_every = rebalance_every
+        self.target_return = target_return
+        self.risk_free_rate = risk_free_rate
+        self.covariance = covariance
+        self.transaction_cost = transaction_cost
+        self.errors: Dict[pd.Timestamp, str] = {}
+
+    def rebalance_positions(self) -> np.ndarray:
+        """Positions (dans l'index des prix) des dates de rebalancement."""
+        return np.arange(self.lookback, len(self.prices) - 1, self.rebalance_every)
+
+    def compute_weights(self, max_workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Calcule les poids à chaque date de rebalancement.
+
+        Les dates sont découpées en blocs contigus répartis entre processus ; à
+        l'intérieur d'un bloc, chaque résolution démarre à chaud depuis la précédente.
+        Une résolution en échec conserve les poids précédents (équipondérés au départ).
+
+        Args:
+            max_workers: Nombre de processus (0 ou 1 pour une exécution séquentielle)
+
+        Returns:
+            DataFrame des poids (dates de rebalancement x actifs)
+        """
+        positions = self.rebalance_positions()
+        if max_workers is None:
+            max_workers = min(len(positions), os.cpu_count() or 1)
+        blocks = [list(block) for block in np.array_split(positions, max(max_workers, 1)) if len(block)]
+        tasks = [(block, self.lookback, self.target_return, self.risk_free_rate, self.covariance)
+                 for block in blocks]
+
+        if max_workers <= 1:
+            _init_worker(self.prices)
+            solved = [_solve_block(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(self.prices,)) as executor:
+                solved = list(executor.map(_solve_block, tasks))
+
+        dates = self.prices.index[positions]
+        n_assets = self.prices.shape[1]
+        weights = np.empty((len(positions), n_assets))
+        previous = np.full(n_assets, 1.0 / n_assets)
+        self.errors = {}
+        for i, (w, error) in enumerate(result for block in solved for result in block):
+            if w is None:
+                self.errors[dates[i]] = error
+                w = previous
+            weights[i] = previous = w
+        return pd.DataFrame(weights, index=dates, columns=self.prices.columns)
+
+    def portfolio_returns(self, weights: pd.DataFrame) -> pd.Series:
+        """
+        Calcule les rendements du portefeuille de façon vectorisée.
+
+        La croissance de chaque actif depuis le dernier rebalancement est obtenue par
+        une somme cumulée des log-rendements remise à zéro à chaque rebalancement.
+
+        Args:
+            weights: Poids aux dates de rebalancement (issus de compute_weights)
+
+        Returns:
+            Série des rendements du portefeuille, nets des coûts de transaction
+        """
+        positions = self.prices.index.get_indexer(weights.index)
+        first = positions[0] + 1
+        asset_returns = self.prices.to_numpy(dtype=float)
+        asset_returns = asset_returns[first:] / asset_returns[first - 1:-1] - 1.0
+
+        # Segment de détention de chaque barre et première barre de chaque segment
+        starts = positions - positions[0]
+        segment = np.searchsorted(starts, np.arange(len(asset_returns)), side='right') - 1
+
+        log_growth = np.cumsum(np.log1p(asset_returns), axis=0)
+        base = np.vstack((np.zeros((1, log_growth.shape[1])), log_growth))[starts]
+        growth = np.exp(log_growth - base[segment])
+
+        W = weights.to_numpy()
+        value = np.einsum('ij,ij->i', growth, W[segment])
+        previous_value = np.concatenate(([1.0], value[:-1]))
+        previous_value[starts] = 1.0
+        returns = value / previous_value - 1.0
+
+        if self.transaction_cost:
+            # Poids dérivés en fin de segment, comparés aux nouveaux poids
+            ends = np.append(starts[1:], len(asset_returns)) - 1
+            drifted = W * growth[ends] / value[ends][:, None]
+            turnover = np.abs(W - np.vstack((np.zeros((1, W.shape[1])), drifted[:-1]))).sum(axis=1)
+            returns[starts] -= self.transaction_cost * turnover
+
+        return pd.Series(returns, index=self.prices.index[first:], name='portfolio')
+
+    def run(self, max_workers: Optional[int] = None) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Lance le backtest complet.
+
+        Args:
+            max_workers: Nombre de processus pour les réoptimisations
+
+        Returns:
+            Tuple contenant (rendements du portefeuille, poids aux dates de rebalancement)
+        """
+        weights = self.compute_weights(max_workers=max_workers)
+        return self.portfolio_returns(weights), weights
+
+
+def summarize(portfolio_returns: pd.Series, periods_per_year: int = 252) -> Dict[str, float]:
+    """
+    Statistiques de performance d'une série de rendements.
+
+    Args:
+        portfolio_returns: Rendements du portefeuille par période
+        periods_per_year: Nombre de périodes par an
+
+    Returns:
+        Dictionnaire (rendement annualisé, volatilité annualisée, ratio de Sharpe, perte maximale)
+    """
+    values = portfolio_returns.to_numpy()
+    wealth = np.cumprod(1.0 + values)
+    annual_return = wealth[-1] ** (periods_per_year / len(values)) - 1.0
+    annual_vol = values.std(ddof=1) * np.sqrt(periods_per_year)
+    drawdown = wealth / np.maximum.accumulate(wealth) - 1.0
+    return {
+        'annual_return': float(annual_return),
+        'annual_volatility': float(annual_vol),
+        'sharpe': float(values.mean() / values.std(ddof=1) * np.sqrt(periods_per_year)),
+        'max_drawdown': float(drawdown.min()),
+    }
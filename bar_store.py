@@ -0,0 +1,301 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from urllib.parse import quote
+from typing import Iterator, List, Optional, Tuple
+from price_cache import bar_duration, bar_start, bars_per_year
+from instrumentation import instrument
+
+
+@instrument
+class BarStore:
+    def __init__(self, directory: str, interval: str):
+        """
+        Stockage colonnaire compact des clôtures d'un univers, pour les longs historiques
+        infra-journaliers (1m, 5m, 1h...).
+
+        Les dates (int64 en ns, UTC sans fuseau) sont stockées une seule fois, et chaque
+        ticker a son propre fichier de clôtures float32: deux fois moins de place qu'un
+        DataFrame float64 (précision relative des prix ~6e-8). Les barres sont ajoutées
+        par blocs chronologiques (`append`) et relues par blocs en projection mémoire
+        (`iter_chunks`), éventuellement rééchantillonnées à la volée: seul un bloc à la
+        fois réside en mémoire. Le nombre de lignes valides est celui de `meta.json`,
+        écrit en dernier: une écriture interrompue n'est jamais visible. La dernière barre,
+        seule modifiée sur place, est d'abord copiée dans un journal, restauré à
+        l'ouverture si `meta.json` n'a pas été validé.
+
+        Args:
+            directory: Répertoire du stockage (créé si besoin)
+            interval: Fréquence des barres stockées (ex: "1m", "5m", "1h", "1d")
+        """
+        bar_duration(interval)
+        self.directory = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        meta = self._load_meta()
+        if meta and meta['interval'] != interval:
+            raise ValueError(f"Ce stockage contient des barres {meta['interval']}, pas {interval}")
+        self.tickers: List[str] = meta.get('tickers', [])
+        self.rows: int = meta.get('rows', 0)
+        # Numéro de la dernière écriture validée, qui relie le journal à meta.json
+        self.generation: int = meta.get('generation', 0)
+        self._recover()
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, 'meta.json')
+
+    def _load_meta(self) -> dict:
+        if not os.path.exists(self._meta_path()):
+            return {}
+        with open(self._meta_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_meta(self) -> None:
+        tmp = self._meta_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'interval': self.interval, 'tickers': self.tickers, 'rows': self.rows,
+                       'generation': self.generation}, f)
+        os.replace(tmp, self._meta_path())
+
+    def _journal_path(self) -> str:
+        return os.path.join(self.directory, 'journal.json')
+
+    def _write_journal(self) -> None:
+        """Copie la dernière barre avant qu'elle ne soit remplacée sur place."""
+        row = self.rows - 1
+        journal = {'generation': self.generation, 'row': row, 'date': int(self._dates()[row]),
+                   'values': {t: float(self._column(t)[row]) for t in self.tickers}}
+        tmp = self._journal_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(journal, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._journal_path())
+
+    def _recover(self) -> None:
+        """Restaure la dernière barre d'un ajout interrompu avant la validation de meta.json."""
+        if not os.path.exists(self._journal_path()):
+            return
+        with open(self._journal_path(), 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+        if journal['generation'] == self.generation:
+            row = journal['row']
+            for ticker, value in journal['values'].items():
+                self._write_at(self._column_path(ticker), row, np.array([value], dtype=np.float32))
+            self._write_at(self._dates_path(), row, np.array([journal['date']], dtype=np.int64))
+        os.remove(self._journal_path())
+
+    def _dates_path(self) -> str:
+        return os.path.join(self.directory, 'dates.i64')
+
+    def _column_path(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{quote(ticker, safe='')}.f32")
+
+    @staticmethod
+    def _write_at(path: str, position: int, values: np.ndarray) -> None:
+        """Écrit des valeurs à partir de la position donnée (les lignes suivantes sont abandonnées)."""
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(position * values.itemsize)
+            values.tofile(f)
+            f.truncate()
+
+    def _dates(self) -> np.ndarray:
+        if not self.rows:
+            return np.empty(0, dtype=np.int64)
+        return np.memmap(self._dates_path(), dtype=np.int64, mode='r', shape=(self.rows,))
+
+    def _column(self, ticker: str) -> np.ndarray:
+        return np.memmap(self._column_path(ticker), dtype=np.float32, mode='r', shape=(self.rows,))
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        """Date de la dernière barre stockée (None si le stockage est vide)."""
+        return pd.Timestamp(int(self._dates()[-1]), unit='ns') if self.rows else None
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des données stockées, en octets."""
+        return self.rows * (8 + 4 * len(self.tickers))
+
+    def append(self, prices: pd.DataFrame) -> int:
+        """
+        Ajoute un bloc de clôtures à la fin du stockage.
+
+        Les barres antérieures à la dernière barre stockée sont ignorées, et celle-ci,
+        potentiellement incomplète, est remplacée si le bloc la contient. Un nouveau
+        ticker reçoit une colonne vide (NaN) pour les lignes existantes ; un ticker absent
+        du bloc y vaut NaN.
+
+        Args:
+            prices: Clôtures (dates x tickers), dates avec ou sans fuseau horaire
+
+        Returns:
+            Nombre de barres ajoutées ou remplacées
+        """
+        index = pd.DatetimeIndex(prices.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        dates = index.values.astype('datetime64[ns]').view(np.int64)
+        order = np.argsort(dates, kind='stable')
+        dates = dates[order]
+        # En cas de dates dupliquées, la dernière valeur l'emporte
+        keep = np.append(dates[1:] != dates[:-1], True) if len(dates) else np.empty(0, dtype=bool)
+        order, dates = order[keep], dates[keep]
+        position = self.rows
+        if self.rows and len(dates):
+            last = int(self._dates()[-1])
+            first = int(np.searchsorted(dates, last, side='left'))
+            if first < len(dates) and dates[first] == last:
+                position -= 1
+            order, dates = order[first:], dates[first:]
+        if not len(dates):
+            return 0
+
+        values = prices.to_numpy(dtype=np.float32)[order]
+        columns = {str(ticker): i for i, ticker in enumerate(prices.columns)}
+        if position < self.rows:
+            self._write_journal()
+        for ticker in columns:
+            if ticker not in self.tickers:
+                np.full(self.rows, np.nan, dtype=np.float32).tofile(self._column_path(ticker))
+                self.tickers.append(ticker)
+        missing = np.full(len(dates), np.nan, dtype=np.float32)
+        for ticker in self.tickers:
+            column = values[:, columns[ticker]] if ticker in columns else missing
+            self._write_at(self._column_path(ticker), position, np.ascontiguousarray(column))
+        self._write_at(self._dates_path(), position, dates)
+        self.rows = position + len(dates)
+        self.generation += 1
+        self._save_meta()
+        if os.path.exists(self._journal_path()):
+            os.remove(self._journal_path())
+        return len(dates)
+
+    def _row_range(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> Tuple[int, int]:
+        dates = self._dates()
+        first = int(np.searchsorted(dates, pd.Timestamp(start).value, side='left')) if start is not None else 0
+        last = int(np.searchsorted(dates, pd.Timestamp(end).value, side='left')) if end is not None else self.rows
+        return first, last
+
+    @staticmethod
+    def _last_by_bar(bars: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Dernière valeur observée de chaque colonne dans chaque barre (bars croissants)."""
+        breaks = np.flatnonzero(bars[1:] != bars[:-1]) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.append(breaks, len(bars)) - 1
+        # Position de la dernière valeur observée jusqu'à chaque ligne, -1 si aucune
+        seen = np.where(np.isnan(values), -1, np.arange(len(values), dtype=np.int32)[:, None])
+        np.maximum.accumulate(seen, axis=0, out=seen)
+        chosen = seen[ends]
+        out = np.take_along_axis(values, np.maximum(chosen, 0), axis=0)
+        out[chosen < starts[:, None]] = np.nan
+        return bars[starts], out
+
+    def iter_chunks(self, chunk_rows: int = 100_000, tickers: Optional[List[str]] = None,
+                    start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                    interval: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Relit les clôtures par blocs de barres, éventuellement rééchantillonnées.
+
+        Le rééchantillonnage garde la dernière clôture observée de chaque ticker dans
+        chaque barre cible, étiquetée par son début (voir bar_start) ; une barre à cheval
+        sur deux blocs est complétée avant d'être émise.
+
+        Args:
+            chunk_rows: Nombre de barres stockées lues par bloc
+            tickers: Tickers à lire (tous par défaut)
+            start: Date de début (incluse)
+            end: Date de fin (exclue)
+            interval: Fréquence cible, au moins égale à celle du stockage (ex: "1h", "1d")
+
+        Returns:
+            Itérateur sur des DataFrames float32 (dates x tickers)
+        """
+        tickers = list(self.tickers if tickers is None else tickers)
+        unknown = [t for t in tickers if t not in self.tickers]
+        if unknown:
+            raise ValueError(f"Tickers absents du stockage: {', '.join(unknown)}")
+        if interval is not None and bar_duration(interval) < bar_duration(self.interval):
+            raise ValueError(f"Impossible de rééchantillonner des barres {self.interval} en {interval}")
+        resample = interval is not None and interval != self.interval
+        first, last = self._row_range(start, end)
+        dates = self._dates()
+        columns = [self._column(t) for t in tickers]
+
+        pending: Optional[Tuple[int, np.ndarray]] = None
+        for position in range(first, last, max(1, chunk_rows)):
+            stop = min(position + chunk_rows, last)
+            block_dates = np.array(dates[position:stop])
+            # Ordre colonne: chaque fichier est copié d'un bloc contigu
+            values = np.empty((stop - position, len(tickers)), dtype=np.float32, order='F')
+            for j, column in enumerate(columns):
+                values[:, j] = column[position:stop]
+            if resample:
+                block_dates, values = self._last_by_bar(bar_start(block_dates, interval), values)
+                if pending is not None:
+                    if block_dates[0] == pending[0]:
+                        values[0] = np.where(np.isnan(values[0]), pending[1], values[0])
+                    else:
+                        block_dates = np.concatenate(([pending[0]], block_dates))
+                        values = np.vstack((pending[1][None, :], values))
+                # La dernière barre peut se poursuivre dans le bloc suivant
+                pending = (block_dates[-1], values[-1].copy())
+                block_dates, values = block_dates[:-1], values[:-1]
+                if not len(block_dates):
+                    continue
+            yield pd.DataFrame(values, index=pd.DatetimeIndex(block_dates.view('datetime64[ns]')),
+                               columns=tickers, copy=False)
+        if pending is not None:
+            yield pd.DataFrame(pending[1][None, :], columns=tickers,
+                               index=pd.DatetimeIndex(np.array([pending[0]]).view('datetime64[ns]')))
+
+    def to_frame(self, tickers: Optional[List[str]] = None, start: Optional[pd.Timestamp] = None,
+                 end: Optional[pd.Timestamp] = None, interval: Optional[str] = None) -> pd.DataFrame:
+        """
+        Charge les clôtures en un seul DataFrame float32 (ex: après rééchantillonnage).
+
+        Args:
+            tickers: Tickers à lire (tous par défaut)
+            start: Date de début (incluse)
+            end: Date de fin (exclue)
+            interval: Fréquence cible (celle du stockage par défaut)
+
+        Returns:
+            DataFrame des clôtures (dates x tickers)
+        """
+        chunks = list(self.iter_chunks(tickers=tickers, start=start, end=end, interval=interval))
+        if not chunks:
+            return pd.DataFrame(columns=list(self.tickers if tickers is None else tickers), dtype=np.float32)
+        return pd.concat(chunks)
+
+    @staticmethod
+    def _distinct(keys: np.ndarray, previous: Optional[int]) -> int:
+        """Nombre de valeurs distinctes de clés triées, sans compter celle du bloc précédent."""
+        return int(np.count_nonzero(keys[1:] != keys[:-1])) + int(previous is None or keys[0] != previous)
+
+    def periods_per_year(self, interval: Optional[str] = None, chunk_rows: int = 1_000_000) -> float:
+        """
+        Nombre de barres par an, mesuré sur les dates stockées (voir bars_per_year).
+
+        Args:
+            interval: Fréquence cible (celle du stockage par défaut)
+            chunk_rows: Nombre de dates lues par bloc
+
+        Returns:
+            Nombre de barres par an
+        """
+        interval = interval or self.interval
+        if bar_duration(interval) >= pd.Timedelta(days=1) or self.rows < 2:
+            return bars_per_year(interval)
+        # Barres et séances distinctes, comptées par blocs (les dates sont triées)
+        dates = self._dates()
+        bars = sessions = 0
+        last_bar = last_day = None
+        for position in range(0, self.rows, chunk_rows):
+            block = np.array(dates[position:position + chunk_rows])
+            bar_keys, day_keys = bar_start(block, interval), bar_start(block, '1d')
+            bars += self._distinct(bar_keys, last_bar)
+            sessions += self._distinct(day_keys, last_day)
+            last_bar, last_day = bar_keys[-1], day_keys[-1]
+        return bars / sessions * bars_per_year('1d')
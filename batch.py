@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from covariance import CovarianceModel
+from result_cache import ResultCache
+
+# Statistiques (rendements moyens, covariance) par univers, chargées une fois par processus
+_WORKER_UNIVERSES: Dict[Hashable, Tuple[pd.Series, pd.DataFrame]] = {}
+_WORKER_OPTIMIZERS: Dict[Hashable, PortfolioOptimizer] = {}
+
+RESULT_COLUMNS = ['tickers', 'target_return', 'risk_free_rate', 'weights',
+                  'expected_return', 'risk', 'sharpe', 'status', 'error']
+
+
+def _init_worker(universes: Dict[Hashable, Tuple[pd.Series, pd.DataFrame]]) -> None:
+    """Reçoit les univers une seule fois par processus."""
+    _WORKER_UNIVERSES.clear()
+    _WORKER_UNIVERSES.update(universes)
+    _WORKER_OPTIMIZERS.clear()
+
+
+def _solve(task: Tuple[Hashable, Optional[float], float]) -> Dict[str, Any]:
+    """
+    Résout un problème dans un processus de travail.
+
+    Args:
+        task: Tuple (clé d'univers, rendement cible, taux sans risque)
+
+    Returns:
+        Dictionnaire du résultat ; les erreurs sont capturées au lieu d'être propagées
+    """
+    key, target_return, risk_free_rate = task
+    try:
+        optimizer = _WORKER_OPTIMIZERS.get(key)
+        if optimizer is None:
+            mean_returns, cov_matrix = _WORKER_UNIVERSES[key]
+            optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+            _WORKER_OPTIMIZERS[key] = optimizer
+        if target_return is None:
+            weights, ret, risk = optimizer.max_sharpe_ratio(risk_free_rate=risk_free_rate)
+        else:
+            weights, ret, risk = optimizer.optimize_portfolio(target_return=target_return,
+                                                              risk_free_rate=risk_free_rate)
+        sharpe = (ret - risk_free_rate) / risk if risk > 0 else np.nan
+        return {'weights': weights, 'expected_return': ret, 'risk': risk,
+                'sharpe': sharpe, 'status': 'ok', 'error': None}
+    except Exception as e:
+        return {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+
+
+def _universe_key(spec: Dict[str, Any], digests: Dict[Tuple[int, int], str]) -> Hashable:
+    """
+    Clé identifiant l'univers d'un problème (données partagées entre problèmes identiques).
+
+    Des statistiques fournies directement sont identifiées par leur contenu (empreinte de
+    ResultCache.key), calculée une seule fois par paire d'objets: les problèmes du lot
+    gardent ces objets en vie, leurs identifiants ne peuvent donc pas être réutilisés.
+    """
+    if 'mean_returns' in spec:
+        mean_returns, cov_matrix = spec['mean_returns'], spec['cov_matrix']
+        objects = (id(mean_returns), id(cov_matrix))
+        if objects not in digests:
+            covariance = cov_matrix if isinstance(cov_matrix, CovarianceModel) else CovarianceModel(cov_matrix)
+            digests[objects] = ResultCache.key(mean_returns, covariance)
+        return ('stats', digests[objects])
+    return ('market', tuple(spec['tickers']), spec.get('period', '1y'), spec.get('interval', '1d'))
+
+
+def optimize_many(specs: List[Dict[str, Any]], data_loader: Optional[DataLoader] = None,
+                  max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Optimise un lot de portefeuilles en parallèle.
+
+    Chaque problème est un dictionnaire contenant soit `tickers` (avec `period` et
+    `interval` optionnels), soit directement `mean_returns` et `cov_matrix`, ainsi que
+    `target_return` (None pour le ratio de Sharpe maximum) et `risk_free_rate`.
+    Les statistiques sont calculées une seule fois par univers distinct (même contenu,
+    y compris pour des objets distincts) et envoyées une seule fois à chaque processus.
+
+    Args:
+        specs: Liste des problèmes
+        data_loader: Chargeur de données utilisé pour les univers définis par tickers
+        max_workers: Nombre de processus (0 ou 1 pour une exécution séquentielle)
+
+    Returns:
+        DataFrame des résultats dans l'ordre des problèmes, avec une colonne `status`
+        ('ok' ou 'error') et le message d'erreur éventuel par problème
+    """
+    data_loader = data_loader or DataLoader()
+    universes: Dict[Hashable, Tuple[pd.Series, pd.DataFrame]] = {}
+    universe_errors: Dict[Hashable, str] = {}
+    digests: Dict[Tuple[int, int], str] = {}
+    keys = []
+
+    for position, spec in enumerate(specs):
+        # Clé propre au problème tant que sa description n'a pas été validée
+        key: Hashable = ('spec', position)
+        try:
+            key = _universe_key(spec, digests)
+            if key not in universes and key not in universe_errors:
+                if key[0] == 'stats':
+                    universes[key] = (spec['mean_returns'], spec['cov_matrix'])
+                else:
+                    prices = data_loader.get_market_data(list(key[1]), key[2], key[3])
+                    _, mean_returns, cov_matrix = data_loader.calculate_returns(prices)
+                    universes[key] = (mean_returns, cov_matrix)
+        except Exception as e:
+            universe_errors[key] = f"{type(e).__name__}: {e}"
+        keys.append(key)
+
+    tasks = [(key, spec.get('target_return'), spec.get('risk_free_rate', 0.0))
+             for key, spec in zip(keys, specs) if key in universes]
+
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+    if max_workers <= 1:
+        _init_worker(universes)
+        solved = [_solve(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(universes,)) as executor:
+            solved = list(executor.map(_solve, tasks, chunksize=chunksize))
+
+    rows = []
+    solved_iter = iter(solved)
+    for key, spec in zip(keys, specs):
+        row = {
+            'tickers': list(universes[key][0].index) if key in universes else list(spec.get('tickers', [])),
+            'target_return': spec.get('target_return'),
+            'risk_free_rate': spec.get('risk_free_rate', 0.0),
+            'weights': None, 'expected_return': np.nan, 'risk': np.nan, 'sharpe': np.nan,
+        }
+        if key in universe_errors:
+            row.update({'status': 'error', 'error': universe_errors[key]})
+        else:
+            row.update(next(solved_iter))
+        rows.append(row)
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
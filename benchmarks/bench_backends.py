@@ -0,0 +1,84 @@
+"""
+Comparaison des solveurs de PortfolioOptimizer: précision et vitesse.
+
+Pour chaque taille d'univers (marché synthétique à facteurs):
+- long-only: 'cvxopt' (référence) et 'numpy' (ADMM par lots) résolvent les mêmes
+  rendements cibles ; l'écart est mesuré par rapport aux poids exacts de la ligne
+  critique (écart de poids, surcoût de risque, erreurs de rendement et de budget),
+  puis le ratio de Sharpe maximum est comparé ;
+- ventes à découvert autorisées: 'analytic' contre 'cvxopt' avec des bornes larges
+  (-10, 10) qui ne sont jamais atteintes, sur covariance dense puis à facteurs.
+
+Usage:
+    python benchmarks/bench_backends.py [--assets 100 300] [--targets 25]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constraints import PortfolioConstraints
+from frontier import CriticalLineFrontier
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+def solve(optimizer: PortfolioOptimizer, targets: np.ndarray):
+    """Résout toutes les cibles (factorisations comprises) ; renvoie (secondes, poids normalisés)."""
+    start = time.perf_counter()
+    weights = optimizer.backend.solve_targets(optimizer, targets)
+    elapsed = time.perf_counter() - start
+    return elapsed, weights / weights.sum(axis=1, keepdims=True)
+
+
+def accuracy(optimizer: PortfolioOptimizer, weights: np.ndarray, exact: np.ndarray,
+             targets: np.ndarray) -> str:
+    risk = np.sqrt(optimizer.covariance.portfolio_variance(weights))
+    exact_risk = np.sqrt(optimizer.covariance.portfolio_variance(exact))
+    return (f"|Δw| {np.nanmax(np.abs(weights - exact)):.1e}  "
+            f"risque {np.nanmax(risk / exact_risk - 1.0):+.1e}  "
+            f"rendement {np.nanmax(np.abs(weights @ optimizer.mean_returns.values - targets)):.1e}  "
+            f"échecs {int(np.isnan(weights).any(axis=1).sum())}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--targets', type=int, default=25)
+    args = parser.parse_args()
+
+    for n_assets in args.assets:
+        market = SyntheticMarket(n_assets, seed=n_assets)
+        mean_returns = market.mean_returns
+        factor_cov = market.true_covariance()
+        cov = factor_cov.to_frame()
+        targets = np.quantile(mean_returns, np.linspace(0.02, 0.98, args.targets))
+        print(f"n={n_assets}, {args.targets} rendements cibles")
+
+        # Long-only: écart aux poids exacts de la ligne critique
+        exact = CriticalLineFrontier(mean_returns.values, cov.values).evaluate(targets)[2]
+        sharpe = {}
+        for backend in ('cvxopt', 'numpy'):
+            optimizer = PortfolioOptimizer(mean_returns, cov, backend=backend)
+            elapsed, weights = solve(optimizer, targets)
+            print(f"  long-only  {backend:8s} {elapsed:8.3f} s  {accuracy(optimizer, weights, exact, targets)}")
+            start = time.perf_counter()
+            _, ret, risk = optimizer.max_sharpe_ratio()
+            sharpe[backend] = (time.perf_counter() - start, ret / risk)
+        print(f"  Sharpe max cvxopt {sharpe['cvxopt'][0]:.3f} s ({sharpe['cvxopt'][1]:.6f})  "
+              f"numpy {sharpe['numpy'][0]:.3f} s ({sharpe['numpy'][1]:.6f})")
+
+        # Ventes à découvert: forme fermée contre cvxopt avec des bornes inactives
+        wide = PortfolioConstraints(list(mean_returns.index), lower=-10.0, upper=10.0)
+        reference = PortfolioOptimizer(mean_returns, cov, constraints=wide)
+        reference_s, reference_w = solve(reference, targets)
+        for label, covariance in (('dense', cov), ('facteurs', factor_cov)):
+            analytic = PortfolioOptimizer(mean_returns, covariance, backend='analytic',
+                                          constraints=PortfolioConstraints.unconstrained(list(mean_returns.index)))
+            elapsed, weights = solve(analytic, targets)
+            print(f"  découvert  analytic ({label:8s}) {elapsed * 1e3:8.3f} ms  "
+                  f"cvxopt {reference_s:7.3f} s  {accuracy(analytic, weights, reference_w, targets)}")
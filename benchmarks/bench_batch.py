@@ -0,0 +1,73 @@
+"""
+Lot de portefeuilles: optimize_many contre une boucle qui reconstruit un optimiseur par problème.
+
+Plusieurs univers synthétiques, chacun interrogé pour de nombreux rendements cibles ; les
+statistiques de chaque univers sont passées sous forme de copies distinctes (même contenu),
+qu'optimize_many doit reconnaître et partager.
+
+- boucle: un PortfolioOptimizer par problème, séquentiel ;
+- optimize_many séquentiel (max_workers=1) puis en parallèle (--workers) ;
+- écart maximal des risques entre la boucle et optimize_many.
+
+Usage:
+    python benchmarks/bench_batch.py [--assets 100] [--universes 4] [--targets 50] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import optimize_many
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+def make_specs(n_assets: int, n_universes: int, n_targets: int):
+    loader = DataLoader()
+    specs = []
+    for u in range(n_universes):
+        _, mean_returns, cov_matrix = loader.calculate_returns(SyntheticMarket(n_assets, seed=u).price_frame(750))
+        targets = np.linspace(mean_returns.quantile(0.3), mean_returns.quantile(0.9), n_targets)
+        for target in targets:
+            # Copies distinctes: seul le contenu permet de reconnaître l'univers
+            specs.append({'mean_returns': mean_returns.copy(), 'cov_matrix': cov_matrix.copy(),
+                          'target_return': float(target)})
+    return specs
+
+
+def loop(specs):
+    risks = []
+    for spec in specs:
+        optimizer = PortfolioOptimizer(spec['mean_returns'], spec['cov_matrix'])
+        risks.append(optimizer.optimize_portfolio(target_return=spec['target_return'])[2])
+    return np.array(risks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=100)
+    parser.add_argument('--universes', type=int, default=4)
+    parser.add_argument('--targets', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    specs = make_specs(args.assets, args.universes, args.targets)
+    print(f"n={args.assets}, {args.universes} univers x {args.targets} rendements cibles "
+          f"({len(specs)} problèmes), {os.cpu_count()} cœurs")
+
+    start = time.perf_counter()
+    reference = loop(specs)
+    print(f"  {'boucle':28s}{time.perf_counter() - start:7.3f} s")
+    for workers in (1, args.workers):
+        start = time.perf_counter()
+        results = optimize_many(specs, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        error = np.max(np.abs(results['risk'].to_numpy(dtype=float) - reference))
+        label = f"optimize_many ({workers} processus)"
+        print(f"  {label:28s}{elapsed:7.3f} s  "
+              f"échecs {int((results['status'] != 'ok').sum())}  écart max des risques {error:.1e}")
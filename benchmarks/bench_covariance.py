@@ -0,0 +1,54 @@
+"""
+Compare la covariance dense échantillonnée au modèle à facteurs B·F·Bᵀ + D:
+temps d'estimation + vérification + optimisation, et pic mémoire du processus.
+
+Usage:
+    python benchmarks/bench_covariance.py [n_assets ...]
+"""
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _run(n_assets: int, n_days: int, covariance: str, queue) -> None:
+    import numpy as np
+    from data_loader import DataLoader
+    from optimizer import PortfolioOptimizer
+
+    loader = DataLoader()
+    prices, _, _ = loader.generate_random_data(n_assets, n_days, seed=n_assets)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    _, mean_returns, cov_matrix = loader.calculate_returns(prices, covariance=covariance)
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+    t_setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, _, risk = optimizer.optimize_portfolio(target_return=float(np.quantile(mean_returns, 0.75)))
+    t_solve = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((t_setup, t_solve, (peak - baseline) / 1024, risk))
+
+
+def bench(n_assets: int, n_days: int) -> None:
+    ctx = mp.get_context('spawn')
+    for covariance in ('sample', 'factor'):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run, args=(n_assets, n_days, covariance, queue))
+        process.start()
+        t_setup, t_solve, memory, risk = queue.get()
+        process.join()
+        print(f"n={n_assets:5d}  {covariance:7s}  estimation={t_setup:7.3f}s  "
+              f"qp={t_solve:7.3f}s  mémoire={memory:8.1f} Mo  risque={risk:.5f}")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [500, 1000, 2000]
+    for n in sizes:
+        bench(n, n_days=1250)
@@ -0,0 +1,43 @@
+"""
+Compare la frontière par ligne critique à la boucle historique de QP cvxopt.
+
+Usage:
+    python benchmarks/bench_frontier.py [n_assets ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+
+
+def bench(n_assets: int, n_days: int, n_points: int = 100) -> None:
+    loader = DataLoader()
+    prices, _, _ = loader.generate_random_data(n_assets, n_days, seed=n_assets)
+    _, mean_returns, cov_matrix = loader.calculate_returns(prices)
+
+    start = time.perf_counter()
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+    cla = optimizer.efficient_frontier(n_points)
+    t_cla = time.perf_counter() - start
+
+    start = time.perf_counter()
+    qp = PortfolioOptimizer(mean_returns, cov_matrix)._efficient_frontier_qp(n_points)
+    t_qp = time.perf_counter() - start
+
+    # Écart de risque aux rendements effectivement résolus par la boucle QP
+    _, cla_risks, _ = optimizer._frontier.evaluate(qp[0])
+    gap = np.abs(cla_risks - qp[1]).max()
+    print(f"n={n_assets:5d}  cla={t_cla:8.3f}s  qp={t_qp:8.3f}s  "
+          f"speedup={t_qp / t_cla:6.1f}x  points={len(cla[0])}/{len(qp[0])}  max|Δrisque|={gap:.2e}")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 50, 100, 300]
+    for n in sizes:
+        bench(n, n_days=max(500, 3 * n))
@@ -0,0 +1,65 @@
+"""
+Parité de risque hiérarchique (sans QP) contre le ratio de Sharpe maximum (QP cvxopt).
+
+- temps de HierarchicalRiskParity et de PortfolioOptimizer.max_sharpe_ratio, covariance
+  dense puis modèle à facteurs ;
+- cas quasi singulier: plus d'actifs que d'observations, où la covariance échantillonnée
+  n'est pas inversible.
+
+Usage:
+    python benchmarks/bench_hrp.py [--assets 100 500 2000] [--days 1250] [--short-days 126]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader
+from hrp import HierarchicalRiskParity
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+def bench(n_assets: int, n_days: int, covariance: str) -> None:
+    prices = SyntheticMarket(n_assets, seed=n_assets).price_frame(n_days)
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(prices, covariance=covariance)
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+    if covariance == 'sample':
+        rank = np.linalg.matrix_rank(cov_matrix.to_numpy())
+        label = f"rang {rank}/{n_assets}"
+    else:
+        label = "facteurs"
+
+    start = time.perf_counter()
+    weights = HierarchicalRiskParity(optimizer.covariance).weights()
+    t_hrp = time.perf_counter() - start
+    _, _, risk_hrp = optimizer._solution(weights)
+
+    start = time.perf_counter()
+    try:
+        _, _, risk_qp = optimizer.max_sharpe_ratio()
+        qp = f"{time.perf_counter() - start:7.3f} s  risque {risk_qp:.5f}"
+    except ValueError as e:
+        qp = f"échec après {time.perf_counter() - start:.3f} s ({str(e)[:60]})"
+    print(f"n={n_assets:5d}  {n_days:5d} j  {label:14s}  hrp {t_hrp:7.3f} s  risque {risk_hrp:.5f}  "
+          f"(min {weights.min():.1e})  |  qp {qp}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--days', type=int, default=1250)
+    parser.add_argument('--short-days', type=int, default=126)
+    args = parser.parse_args()
+
+    for n in args.assets:
+        for covariance in ('sample', 'factor'):
+            bench(n, args.days, covariance)
+    print("Plus d'actifs que d'observations:")
+    for n in args.assets:
+        if n > args.short_days:
+            bench(n, args.short_days, 'sample')
@@ -0,0 +1,102 @@
+"""
+Barres minute sur un grand univers: BarStore float32 et statistiques en flux contre un
+DataFrame float64 chargé en entier.
+
+- ingestion par séances dans le BarStore (taille sur disque contre DataFrame float64) ;
+- statistiques: calculate_returns sur le DataFrame complet contre stream_statistics par
+  blocs (temps, pic mémoire tracemalloc, écarts) ;
+- rééchantillonnage en 1h: iter_chunks à la volée contre DataFrame.resample ;
+- barres par an mesurées pour chaque fréquence.
+
+Usage:
+    python benchmarks/bench_intraday.py [--assets 200] [--sessions 120] [--budget 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bar_store import BarStore
+from data_loader import DataLoader
+from price_cache import SESSION_MINUTES
+from synthetic import SyntheticMarket
+
+
+def minute_sessions(market: SyntheticMarket, n_sessions: int):
+    """Séances de 390 barres minute (14h30-21h00 UTC), générées une par une."""
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_sessions)
+    level = np.full(market.n_assets, 100.0)
+    blocks = market.iter_returns(n_sessions * SESSION_MINUTES, memory_budget_mb=4.0)
+    buffer = np.empty((0, market.n_assets))
+    for day in days:
+        while len(buffer) < SESSION_MINUTES:
+            buffer = np.vstack((buffer, next(blocks)))
+        returns, buffer = buffer[:SESSION_MINUTES], buffer[SESSION_MINUTES:]
+        prices = level * np.cumprod(1.0 + returns / np.sqrt(SESSION_MINUTES), axis=0)
+        level = prices[-1]
+        index = pd.date_range(day + pd.Timedelta(hours=14, minutes=30), periods=SESSION_MINUTES, freq='1min')
+        yield pd.DataFrame(prices, index=index, columns=market.asset_names)
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=200)
+    parser.add_argument('--sessions', type=int, default=120)
+    parser.add_argument('--budget', type=float, default=16.0)
+    args = parser.parse_args()
+
+    market = SyntheticMarket(args.assets, seed=0)
+    loader = DataLoader()
+    with tempfile.TemporaryDirectory() as directory:
+        store = BarStore(directory, '1m')
+        start = time.perf_counter()
+        for session in minute_sessions(market, args.sessions):
+            store.append(session)
+        elapsed = time.perf_counter() - start
+        frame_mb = store.rows * args.assets * 8 / 2 ** 20
+        print(f"n={args.assets}, {store.rows} barres 1m ({args.sessions} séances)")
+        print(f"  ingestion par séance      {elapsed:7.3f} s  stockage {store.nbytes / 2 ** 20:7.1f} Mo  "
+              f"(DataFrame float64: {frame_mb:.1f} Mo)")
+
+        def in_memory():
+            _, mean, cov = loader.calculate_returns(store.to_frame().astype(np.float64))
+            return mean, cov
+
+        (mean_ref, cov_ref), t_ref, peak_ref = measure(in_memory)
+        print(f"  DataFrame complet         {t_ref:7.3f} s  pic {peak_ref:7.1f} Mo")
+        (mean, cov), t_stream, peak_stream = measure(
+            lambda: loader.stream_statistics(store, memory_budget_mb=args.budget))
+        error = np.abs(cov - cov_ref).to_numpy().max() / np.abs(cov_ref.to_numpy()).max()
+        label = f"stream_statistics ({args.budget:g} Mo)"
+        print(f"  {label:26s}{t_stream:7.3f} s  pic {peak_stream:7.1f} Mo  "
+              f"écart relatif {error:.1e}, moyennes {np.abs(mean - mean_ref).max():.1e}")
+
+        frame = store.to_frame()
+        start = time.perf_counter()
+        expected = frame.resample('1h').last().dropna(how='all')
+        t_pandas = time.perf_counter() - start
+        start = time.perf_counter()
+        hourly = pd.concat(list(store.iter_chunks(interval='1h')))
+        t_store = time.perf_counter() - start
+        same = np.array_equal(hourly.to_numpy(), expected.to_numpy(), equal_nan=True)
+        print(f"  rééchantillonnage 1h      pandas {t_pandas:7.3f} s  BarStore {t_store:7.3f} s  identique: {same}")
+        print("  barres par an: " + ", ".join(f"{interval} {store.periods_per_year(interval):.0f}"
+                                                for interval in ('1m', '5m', '1h', '1d')))
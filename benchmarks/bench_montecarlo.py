@@ -0,0 +1,45 @@
+"""
+Débit de la simulation Monte Carlo de portefeuilles aléatoires.
+
+Mesure, pour plusieurs tailles d'univers et les deux types flottants, le nombre de
+portefeuilles simulés par seconde et le pic mémoire (tracemalloc).
+
+Usage:
+    python benchmarks/bench_montecarlo.py [--portfolios 1000000] [--assets 50 500] [--budget-mb 64]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader
+from montecarlo import RandomPortfolioSimulator
+from optimizer import PortfolioOptimizer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--portfolios', type=int, default=1_000_000)
+    parser.add_argument('--assets', type=int, nargs='+', default=[50, 500])
+    parser.add_argument('--budget-mb', type=float, default=64.0)
+    args = parser.parse_args()
+
+    loader = DataLoader()
+    for n_assets in args.assets:
+        prices, _, _ = loader.generate_random_data(n_assets, 500)
+        _, mean_returns, cov_matrix = loader.calculate_returns(prices)
+        optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+        for dtype in (np.float64, np.float32):
+            simulator = RandomPortfolioSimulator(optimizer, dtype=dtype, seed=0,
+                                                 memory_budget_mb=args.budget_mb)
+            tracemalloc.start()
+            simulator.simulate(args.portfolios)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"n={n_assets:5d} {np.dtype(dtype).name:8s} bloc={simulator.chunk_size:7d}  "
+                  f"{simulator.throughput:12,.0f} portefeuilles/s  {simulator.elapsed:7.2f} s  "
+                  f"pic {peak / 2 ** 20:8.1f} Mo")
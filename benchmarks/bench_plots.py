@@ -0,0 +1,59 @@
+"""
+Temps de rendu du rapport hors écran selon la taille de l'univers.
+
+Compare l'export Agg (réutilisation des figures, regroupement et décimation) au tracé
+interactif de la matrice de corrélation pleine, sans regroupement par blocs.
+
+Usage:
+    python benchmarks/bench_plots.py [--assets 20 100 500 1000] [--format png]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from plots import PortfolioVisualizer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, nargs='+', default=[20, 100, 500, 1000])
+    parser.add_argument('--format', default='png', choices=['png', 'svg'])
+    args = parser.parse_args()
+
+    visualizer = PortfolioVisualizer(block=False)
+    loader = DataLoader()
+    with tempfile.TemporaryDirectory() as directory:
+        for n_assets in args.assets:
+            prices, _, _ = loader.generate_random_data(n_assets, 500)
+            returns, mean_returns, cov_matrix = loader.calculate_returns(prices)
+            optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+            frontier_returns, frontier_risks, _ = optimizer.efficient_frontier(50)
+            weights, ret, risk = optimizer.max_sharpe_ratio()
+            corr_matrix = returns.corr()
+
+            start = time.perf_counter()
+            visualizer.export_report(directory, frontier=(frontier_returns, frontier_risks),
+                                     optimal_point=(ret, risk), weights=weights,
+                                     asset_names=list(prices.columns), corr_matrix=corr_matrix,
+                                     returns=returns, fmt=args.format)
+            export_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            visualizer.plot_correlation_matrix(corr_matrix, max_assets=len(corr_matrix))
+            plt.gcf().savefig(os.path.join(directory, f"direct.{args.format}"))
+            plt.close('all')
+            direct_s = time.perf_counter() - start
+
+            print(f"n={n_assets:5d}  rapport complet {export_s:6.2f} s  "
+                  f"corrélation pleine {direct_s:6.2f} s")
+    visualizer.close()
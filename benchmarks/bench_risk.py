@@ -0,0 +1,70 @@
+"""
+Mesures de risque sur toute la frontière: RiskAnalyzer par lots contre une boucle par portefeuille.
+
+- référence: pour chaque portefeuille, volatilité par np.dot, série de rendements,
+  quantile et queue pandas, pertes maximales ;
+- RiskAnalyzer.summary: tous les portefeuilles en produits matriciels, historique parcouru
+  par blocs ; pic mémoire (tracemalloc) pour plusieurs budgets, écarts à la référence.
+
+Usage:
+    python benchmarks/bench_risk.py [--assets 200] [--days 5000] [--portfolios 100]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk import RiskAnalyzer
+from synthetic import SyntheticMarket
+
+
+def reference(returns: pd.DataFrame, cov: np.ndarray, weights: np.ndarray, confidence: float) -> pd.DataFrame:
+    rows = []
+    for w in weights:
+        volatility = np.sqrt(np.dot(w, np.dot(cov, w)))
+        series = returns.fillna(0.0) @ w
+        var = -series.quantile(1.0 - confidence, interpolation='lower')
+        cvar = -series[series <= -var].mean()
+        wealth = (1.0 + series).cumprod()
+        drawdown = 1.0 - wealth / np.maximum(wealth.cummax(), 1.0)
+        rows.append((volatility, var, cvar, drawdown.max()))
+    return pd.DataFrame(rows, columns=['volatility', 'var', 'cvar', 'max_drawdown'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=200)
+    parser.add_argument('--days', type=int, default=5000)
+    parser.add_argument('--portfolios', type=int, default=100)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    args = parser.parse_args()
+
+    market = SyntheticMarket(args.assets, seed=0)
+    returns = market.price_frame(args.days).pct_change().iloc[1:]
+    cov = returns.cov()
+    rng = np.random.default_rng(0)
+    weights = rng.dirichlet(np.full(args.assets, 0.2), size=args.portfolios)
+    print(f"n={args.assets}, {len(returns)} dates, {args.portfolios} portefeuilles")
+
+    start = time.perf_counter()
+    expected = reference(returns, cov.to_numpy(), weights, args.confidence)
+    print(f"  boucle par portefeuille   {time.perf_counter() - start:7.3f} s")
+
+    for budget in (64.0, 8.0, 1.0):
+        analyzer = RiskAnalyzer(returns, cov, confidence=args.confidence, memory_budget_mb=budget)
+        start = time.perf_counter()
+        summary = analyzer.summary(weights)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        analyzer.summary(weights)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        error = max(np.max(np.abs(summary[c].to_numpy() - expected[c].to_numpy())) for c in expected.columns)
+        print(f"  RiskAnalyzer ({budget:5.1f} Mo)   {elapsed:7.3f} s  pic {peak / 2 ** 20:7.1f} Mo  "
+              f"blocs de {analyzer._chunk_rows(len(weights))} dates  écart max {error:.1e}")
@@ -0,0 +1,131 @@
+"""
+Service d'optimisation: latence et débit sous charge concurrente, hors ligne.
+
+Un cache de prix temporaire est rempli avec un marché synthétique, puis le service est
+démarré dans le processus (TCP local) sur ce cache en mode hors ligne:
+- référence: chaîne complète par requête (lecture des prix, statistiques, optimisation),
+  comme un appel ponctuel de l'interface ou d'un script ;
+- service: `--clients` connexions keep-alive envoient des requêtes /optimize (rendements
+  cibles aléatoires, interpolés entre les coins dès qu'une frontière de l'univers est en
+  mémoire) et /frontier sur quelques univers ;
+- saturation: pool de 2 threads avec une file de 2, pour vérifier les réponses 503.
+
+Usage:
+    python benchmarks/bench_service.py [--assets 60] [--universes 4] [--clients 16] [--requests 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from price_cache import PriceCache
+from service import MarketState, OptimizationService
+from synthetic import SyntheticMarket
+
+
+async def call(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+               method: str, path: str, payload=None):
+    """Envoie une requête HTTP/1.1 sur une connexion ouverte ; renvoie (code, JSON)."""
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: local\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port: int, universes, n_requests: int, rng: np.random.Generator, latencies, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for _ in range(n_requests):
+        tickers, low, high = universes[rng.integers(len(universes))]
+        if rng.random() < 0.1:
+            path, payload = '/frontier', {'tickers': tickers, 'n_points': 50}
+        else:
+            path, payload = '/optimize', {'tickers': tickers, 'target_return': float(rng.uniform(low, high))}
+        start = time.perf_counter()
+        status, _ = await call(reader, writer, 'POST', path, payload)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(status)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(cache_dir: str, universes, workers: int, queue: int, clients: int, n_requests: int):
+    service = OptimizationService(MarketState(DataLoader(cache_dir, offline=True)), workers=workers, queue_size=queue)
+    server = await service.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    latencies, statuses = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, universes, n_requests, np.random.default_rng(i), latencies, statuses)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, stats = await call(reader, writer, 'GET', '/stats')
+    writer.close()
+    await writer.wait_closed()
+    server.close()
+    await server.wait_closed()
+    service.close()
+    return elapsed, np.array(latencies) * 1e3, np.array(statuses), stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=60)
+    parser.add_argument('--universes', type=int, default=4)
+    parser.add_argument('--days', type=int, default=500)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        market = SyntheticMarket(args.assets * args.universes, seed=0)
+        prices = market.price_frame(args.days)
+        PriceCache(cache_dir).write(prices, '1d')
+        mean_returns = prices.pct_change().mean()
+        universes = []
+        for u in range(args.universes):
+            tickers = list(prices.columns[u * args.assets:(u + 1) * args.assets])
+            low, high = np.quantile(mean_returns[tickers], [0.2, 0.8])
+            universes.append((tickers, float(low), float(high)))
+
+        # Référence: toute la chaîne à chaque requête
+        loader = DataLoader(cache_dir, offline=True)
+        rng = np.random.default_rng(0)
+        cold = []
+        for _ in range(10):
+            tickers, low, high = universes[rng.integers(len(universes))]
+            start = time.perf_counter()
+            _, mu, cov = loader.calculate_returns(loader.get_market_data(tickers, '1y', '1d'))
+            PortfolioOptimizer(mu, cov).optimize_portfolio(target_return=float(rng.uniform(low, high)))
+            cold.append(time.perf_counter() - start)
+        print(f"référence (chaîne complète)  médiane {np.median(cold) * 1e3:7.1f} ms par requête")
+
+        elapsed, latencies, statuses, stats = asyncio.run(
+            load(cache_dir, universes, args.workers, 4 * args.clients, args.clients, args.requests))
+        print(f"service {args.workers} threads, {args.clients} clients  {len(latencies) / elapsed:7.1f} req/s  "
+              f"p50 {np.percentile(latencies, 50):6.1f} ms  p99 {np.percentile(latencies, 99):6.1f} ms  "
+              f"erreurs {int((statuses != 200).sum())}  chargements d'univers {stats['universe_loads']}")
+        print("  /stats latency_ms:", json.dumps({route: {k: round(v, 2) for k, v in s.items()}
+                                                  for route, s in stats['latency_ms'].items()}))
+
+        _, _, statuses, stats = asyncio.run(load(cache_dir, universes, 2, 2, 4 * args.clients, 5))
+        print(f"saturation (2 threads, file de 2, {4 * args.clients} clients)  "
+              f"503: {int((statuses == 503).sum())}/{len(statuses)}  rejets publiés: {stats['rejected']}")
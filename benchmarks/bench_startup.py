@@ -0,0 +1,78 @@
+"""
+Mesure le démarrage à froid de l'application et le compare à un objectif.
+
+- import de `app` dans un processus neuf (médiane sur plusieurs essais) ;
+- si un affichage est disponible, délai jusqu'à la première fenêtre dessinée ;
+- import de `cli` et vérification qu'il ne charge ni tkinter ni matplotlib.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--target-ms 150]
+
+Le code de sortie vaut 1 si la médiane dépasse l'objectif.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import app
+print((time.perf_counter() - start) * 1000)
+"""
+
+WINDOW_SNIPPET = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+import app
+root = tk.Tk()
+app.PortfolioOptimizerApp(root)
+root.update()
+print((time.perf_counter() - start) * 1000)
+root.destroy()
+"""
+
+CLI_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import cli
+elapsed = (time.perf_counter() - start) * 1000
+forbidden = sorted(m for m in ('tkinter', 'matplotlib', 'requests', 'yfinance') if m in sys.modules)
+print(','.join(forbidden) or '-')
+print(elapsed)
+"""
+
+
+def _measure(snippet: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', snippet], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=150.0)
+    args = parser.parse_args()
+
+    import_ms = _measure(IMPORT_SNIPPET, args.runs)
+    print(f"import app: {import_ms:7.1f} ms (objectif {args.target_ms:.0f} ms)")
+    cli_ms = _measure(CLI_SNIPPET, args.runs)
+    print(f"import cli: {cli_ms:7.1f} ms")
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        print(f"première fenêtre: {_measure(WINDOW_SNIPPET, args.runs):7.1f} ms")
+    else:
+        print("première fenêtre: ignorée (aucun affichage disponible)")
+    loaded = subprocess.run([sys.executable, '-c', CLI_SNIPPET], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.splitlines()[-2]
+    if loaded != '-':
+        print(f"cli charge des modules interdits: {loaded}")
+    sys.exit(0 if import_ms <= args.target_ms and loaded == '-' else 1)
@@ -0,0 +1,165 @@
+"""
+Suite de benchmarks hors ligne sur des univers synthétiques (DataLoader.generate_random_data).
+
+Mesure le temps (médiane sur plusieurs répétitions) et le pic mémoire (tracemalloc) de:
+get_market_data (cache hors ligne), calculate_returns, PortfolioOptimizer.__init__,
+optimize_portfolio, max_sharpe_ratio et efficient_frontier.
+
+Usage:
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --assets 10 100 1000 --days 250 5000 --output new.json
+    python benchmarks/suite.py --output new.json --compare bench.json --threshold 0.2
+
+Avec --compare, le code de sortie vaut 1 si un cas est plus lent que la référence
+de plus de `threshold` (en proportion).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from price_cache import PriceCache
+
+DEFAULT_ASSETS = [10, 50, 100, 250, 500]
+DEFAULT_DAYS = [250, 1000]
+
+
+def _measure(func: Callable[[], object], repeats: int) -> Dict[str, float]:
+    """Temps médian puis pic mémoire d'une exécution supplémentaire sous tracemalloc."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'wall_s': statistics.median(timings), 'peak_mb': peak / 2 ** 20}
+
+
+def bench_universe(n_assets: int, n_days: int, repeats: int, n_points: int,
+                   generator: str = 'random') -> List[Dict[str, float]]:
+    """
+    Mesure tous les cas pour un univers synthétique.
+
+    Args:
+        n_assets: Nombre d'actifs
+        n_days: Nombre de jours
+        repeats: Nombre de répétitions chronométrées
+        n_points: Nombre de points de la frontière
+        generator: "random" (generate_random_data) ou "factor" (generate_factor_data, corrélé)
+
+    Returns:
+        Liste des résultats par cas
+    """
+    if generator == 'factor':
+        prices, _, _ = DataLoader().generate_factor_data(n_assets, n_days, seed=n_assets + n_days)
+    else:
+        prices, _, _ = DataLoader().generate_random_data(n_assets, n_days, seed=n_assets + n_days)
+    tickers = list(prices.columns)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Fournisseur local: le cache hors ligne remplace yfinance
+        PriceCache(cache_dir).write(prices, '1d')
+        loader = DataLoader(cache_dir=cache_dir, offline=True)
+
+        cached = loader.get_market_data(tickers, period='max', interval='1d')
+        _, mean_returns, cov_matrix = loader.calculate_returns(cached)
+        optimizer = PortfolioOptimizer(mean_returns, cov_matrix)
+        target = float(np.quantile(mean_returns, 0.75))
+
+        def frontier():
+            # Nouvel optimiseur à chaque mesure: le calcul des coins n'est pas mis en cache
+            return PortfolioOptimizer(mean_returns, cov_matrix).efficient_frontier(n_points)
+
+        cases = {
+            'get_market_data': lambda: loader.get_market_data(tickers, period='max', interval='1d'),
+            'calculate_returns': lambda: loader.calculate_returns(cached),
+            'optimizer_init': lambda: PortfolioOptimizer(mean_returns, cov_matrix),
+            'optimize_portfolio': lambda: optimizer.optimize_portfolio(target_return=target),
+            'max_sharpe_ratio': lambda: optimizer.max_sharpe_ratio(),
+            'efficient_frontier': frontier,
+        }
+        results = []
+        for case, func in cases.items():
+            measurement = _measure(func, repeats)
+            results.append({'case': case, 'n_assets': n_assets, 'n_days': n_days, **measurement})
+            print(f"{case:20s} n={n_assets:5d} jours={n_days:5d}  "
+                  f"{measurement['wall_s'] * 1000:10.2f} ms  {measurement['peak_mb']:9.2f} Mo", flush=True)
+        return results
+
+
+def compare(results: List[Dict[str, float]], baseline_path: str, threshold: float) -> bool:
+    """
+    Compare les résultats à une exécution de référence.
+
+    Args:
+        results: Résultats courants
+        baseline_path: Fichier JSON de référence
+        threshold: Ralentissement toléré (0.2 pour +20 %)
+
+    Returns:
+        True si aucune régression n'a été détectée
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['case'], r['n_assets'], r['n_days']): r for r in json.load(f)['results']}
+    ok = True
+    for result in results:
+        reference = baseline.get((result['case'], result['n_assets'], result['n_days']))
+        if reference is None:
+            continue
+        ratio = result['wall_s'] / reference['wall_s'] if reference['wall_s'] > 0 else 1.0
+        if ratio > 1.0 + threshold:
+            ok = False
+            print(f"RÉGRESSION {result['case']} n={result['n_assets']} jours={result['n_days']}: "
+                  f"{reference['wall_s'] * 1000:.2f} ms -> {result['wall_s'] * 1000:.2f} ms (x{ratio:.2f})")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--assets', type=int, nargs='+', default=DEFAULT_ASSETS)
+    parser.add_argument('--days', type=int, nargs='+', default=DEFAULT_DAYS)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--points', type=int, default=100)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--generator', choices=['random', 'factor'], default='random')
+    args = parser.parse_args()
+
+    results = []
+    for n_days in args.days:
+        for n_assets in args.assets:
+            results.extend(bench_universe(n_assets, n_days, args.repeats, args.points, args.generator))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'generator': args.generator,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats enregistrés dans {args.output}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,231 @@
+"""
+Point d'entrée en ligne de commande, sans interface graphique.
+
+Lit un fichier de lots (JSON), optimise les portefeuilles en parallèle et écrit les poids,
+les frontières efficientes et les statistiques en JSON ou en Parquet. Seuls pandas, numpy
+et cvxopt sont chargés: ni tkinter, ni matplotlib, ni les scrapers de l'univers.
+
+Format du fichier de lots:
+    {
+        "defaults": {"period": "1y", "interval": "1d", "risk_free_rate": 0.0, "covariance": "sample"},
+        "portfolios": [
+            {"name": "tech", "tickers": ["AAPL", "MSFT", "NVDA"], "target_return": 0.001},
+            {"name": "tech-sharpe", "tickers": ["AAPL", "MSFT", "NVDA"]}
+        ]
+    }
+
+Sans `target_return`, c'est le portefeuille de ratio de Sharpe maximum qui est calculé.
+
+Usage:
+    python cli.py lots.json --output resultats.json
+    python cli.py lots.json --output resultats/ --format parquet --offline
+
+Le code de sortie vaut 1 si au moins un portefeuille a échoué.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+# Même répertoire que le cache de l'interface graphique
+PRICE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.risk_return_wallet', 'prices')
+
+SPEC_DEFAULTS = {'period': '1y', 'interval': '1d', 'risk_free_rate': 0.0, 'covariance': 'sample'}
+
+
+def load_spec(path: str) -> List[Dict[str, Any]]:
+    """
+    Lit un fichier de lots et applique les valeurs par défaut.
+
+    Args:
+        path: Chemin du fichier JSON (objet avec `portfolios`, ou liste de portefeuilles)
+
+    Returns:
+        Liste des portefeuilles, chacun avec un nom et tous ses paramètres
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {'portfolios': spec}
+    defaults = {**SPEC_DEFAULTS, **spec.get('defaults', {})}
+
+    portfolios = []
+    for i, portfolio in enumerate(spec.get('portfolios', [])):
+        portfolio = {**defaults, **portfolio}
+        portfolio.setdefault('name', f'portfolio_{i}')
+        if not portfolio.get('tickers'):
+            raise ValueError(f"Le portefeuille '{portfolio['name']}' ne contient aucun ticker")
+        portfolios.append(portfolio)
+    if not portfolios:
+        raise ValueError("Le fichier de lots ne contient aucun portefeuille")
+    return portfolios
+
+
+def run(portfolios: List[Dict[str, Any]], cache_dir: str = None, offline: bool = False,
+        frontier_points: int = 50, max_workers: int = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Exécute le lot: chargement des univers, optimisations parallèles, frontières.
+
+    Args:
+        portfolios: Portefeuilles issus de load_spec
+        cache_dir: Répertoire du cache des prix (aucun cache si None)
+        offline: Si True, les prix sont lus uniquement dans le cache
+        frontier_points: Nombre de points par frontière (0 pour ne pas les calculer)
+        max_workers: Nombre de processus pour les optimisations
+
+    Returns:
+        Tuple contenant (résultats par portefeuille, frontières par univers)
+    """
+    # Imports différés: `python cli.py --help` ne charge ni pandas ni cvxopt
+    from batch import optimize_many
+    from data_loader import DataLoader
+    from optimizer import PortfolioOptimizer
+
+    loader = DataLoader(cache_dir=cache_dir, offline=offline)
+
+    # Un univers par combinaison (tickers, période, fréquence, estimateur)
+    universe_index: Dict[Tuple, int] = {}
+    universes: List[Dict[str, Any]] = []
+    assignments: List[int] = []
+    for portfolio in portfolios:
+        key = (tuple(portfolio['tickers']), portfolio['period'], portfolio['interval'], portfolio['covariance'])
+        if key not in universe_index:
+            universe_index[key] = len(universes)
+            universe = {'tickers': list(key[0]), 'period': key[1], 'interval': key[2], 'covariance': key[3],
+                        'stats': None, 'error': None}
+            try:
+                prices = loader.get_market_data(universe['tickers'], universe['period'], universe['interval'])
+                _, mean_returns, cov_matrix = loader.calculate_returns(prices, covariance=universe['covariance'])
+                universe['stats'] = (mean_returns, cov_matrix)
+            except Exception as e:
+                universe['error'] = f"{type(e).__name__}: {e}"
+            universes.append(universe)
+        assignments.append(universe_index[key])
+
+    specs, positions = [], []
+    for i, (portfolio, u) in enumerate(zip(portfolios, assignments)):
+        universe = universes[u]
+        if universe['stats'] is not None:
+            mean_returns, cov_matrix = universe['stats']
+            specs.append({'mean_returns': mean_returns, 'cov_matrix': cov_matrix,
+                          'target_return': portfolio.get('target_return'),
+                          'risk_free_rate': portfolio['risk_free_rate']})
+            positions.append(i)
+
+    solved = optimize_many(specs, max_workers=max_workers) if specs else None
+
+    results = []
+    for portfolio, u in zip(portfolios, assignments):
+        universe = universes[u]
+        results.append({
+            'name': portfolio['name'], 'universe': u,
+            'tickers': universe['tickers'], 'target_return': portfolio.get('target_return'),
+            'risk_free_rate': portfolio['risk_free_rate'], 'weights': None,
+            'expected_return': None, 'risk': None, 'sharpe': None,
+            'status': 'error', 'error': universe['error'],
+        })
+    for row, i in zip(solved.itertuples(index=False) if solved is not None else [], positions):
+        weights = None if row.weights is None else dict(zip(results[i]['tickers'], map(float, row.weights)))
+        results[i].update({
+            'weights': weights, 'status': row.status, 'error': row.error,
+            'expected_return': None if row.status != 'ok' else float(row.expected_return),
+            'risk': None if row.status != 'ok' else float(row.risk),
+            'sharpe': None if row.status != 'ok' else float(row.sharpe),
+        })
+
+    frontiers = []
+    for i, universe in enumerate(universes):
+        frontier = {'universe': i, 'tickers': universe['tickers'], 'period': universe['period'],
+                    'interval': universe['interval'], 'covariance': universe['covariance'],
+                    'returns': [], 'risks': [], 'error': universe['error']}
+        if universe['stats'] is not None and frontier_points > 0:
+            try:
+                returns, risks, _ = PortfolioOptimizer(*universe['stats']).efficient_frontier(frontier_points)
+                frontier.update({'returns': returns.tolist(), 'risks': risks.tolist()})
+            except Exception as e:
+                frontier['error'] = f"{type(e).__name__}: {e}"
+        frontiers.append(frontier)
+    return results, frontiers
+
+
+def write_json(results: List[Dict[str, Any]], frontiers: List[Dict[str, Any]], path: str) -> None:
+    """Écrit les résultats et les frontières dans un seul fichier JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'portfolios': results, 'frontiers': frontiers}, f, indent=2)
+
+
+def write_parquet(results: List[Dict[str, Any]], frontiers: List[Dict[str, Any]], directory: str) -> None:
+    """
+    Écrit trois tables Parquet dans `directory`: portfolios, weights (format long) et frontiers.
+
+    Nécessite pyarrow ou fastparquet.
+    """
+    import pandas as pd
+
+    os.makedirs(directory, exist_ok=True)
+    stats_columns = ['name', 'universe', 'target_return', 'risk_free_rate',
+                     'expected_return', 'risk', 'sharpe', 'status', 'error']
+    pd.DataFrame([{c: r[c] for c in stats_columns} for r in results], columns=stats_columns).to_parquet(
+        os.path.join(directory, 'portfolios.parquet'), index=False)
+    pd.DataFrame([(r['name'], ticker, weight) for r in results if r['weights']
+                  for ticker, weight in r['weights'].items()],
+                 columns=['name', 'ticker', 'weight']).to_parquet(
+        os.path.join(directory, 'weights.parquet'), index=False)
+    pd.DataFrame([(f['universe'], point, ret, risk) for f in frontiers
+                  for point, (ret, risk) in enumerate(zip(f['returns'], f['risks']))],
+                 columns=['universe', 'point', 'return', 'risk']).to_parquet(
+        os.path.join(directory, 'frontiers.parquet'), index=False)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('spec', help="Fichier de lots (JSON)")
+    parser.add_argument('--output', '-o', required=True,
+                        help="Fichier JSON, ou répertoire pour le format Parquet")
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json')
+    parser.add_argument('--frontier-points', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (1 pour une exécution séquentielle)")
+    parser.add_argument('--cache-dir', default=PRICE_CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="Télécharge sans cache disque")
+    parser.add_argument('--offline', action='store_true', help="Lit les prix uniquement dans le cache")
+    parser.add_argument('--trace', help="Trace Chrome (JSON) des appels et des résolutions ; "
+                                        "les processus de travail ne sont tracés qu'avec --workers 1")
+    args = parser.parse_args(argv)
+
+    try:
+        portfolios = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        print(f"Erreur: fichier de lots invalide: {e}", file=sys.stderr)
+        return 2
+    if args.no_cache and args.offline:
+        print("Erreur: --offline nécessite le cache", file=sys.stderr)
+        return 2
+
+    if args.trace:
+        import instrumentation
+        instrumentation.enable()
+    results, frontiers = run(portfolios, cache_dir=None if args.no_cache else args.cache_dir,
+                             offline=args.offline, frontier_points=args.frontier_points,
+                             max_workers=args.workers)
+    if args.trace:
+        instrumentation.export_chrome_trace(args.trace)
+    if args.format == 'parquet':
+        try:
+            write_parquet(results, frontiers, args.output)
+        except ImportError as e:
+            print(f"Erreur: le format Parquet nécessite pyarrow ou fastparquet ({e})", file=sys.stderr)
+            return 2
+    else:
+        write_json(results, frontiers, args.output)
+
+    failed = [r for r in results if r['status'] != 'ok']
+    for r in failed:
+        print(f"{r['name']}: {r['error']}", file=sys.stderr)
+    print(f"{len(results) - len(failed)}/{len(results)} portefeuilles optimisés -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import json
+import numpy as np
+from cvxopt import spmatrix
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class PortfolioConstraints:
+    def __init__(self, asset_names: List[str],
+                 lower: Union[float, np.ndarray] = 0.0,
+                 upper: Union[float, np.ndarray, None] = None,
+                 sectors: Optional[Dict[str, str]] = None,
+                 sector_bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                 current_weights: Optional[np.ndarray] = None,
+                 max_turnover: Optional[float] = None):
+        """
+        Contraintes d'inégalité sur les poids, assemblées sous forme creuse pour cvxopt.
+
+        Chaque contrainte s'écrit G·x <= h·s, avec s = 1 (budget Σw = 1) ; pour le problème
+        homogénéisé du ratio de Sharpe, s devient la variable d'échelle κ. La rotation
+        Σ|w - w0| <= T est linéarisée par des variables auxiliaires t >= |w - w0|.
+
+        Args:
+            asset_names: Noms des actifs, dans l'ordre des poids
+            lower: Poids minimum par actif (scalaire ou vecteur)
+            upper: Poids maximum par actif (None: 1, soit au plus 100 % par actif)
+            sectors: Secteur de chaque actif (ticker -> secteur)
+            sector_bounds: Poids total (minimum, maximum) par secteur
+            current_weights: Portefeuille actuel, référence de la rotation
+            max_turnover: Rotation maximale Σ|w - w0| (ex: 0.2 pour 20 %)
+        """
+        self.asset_names = list(asset_names)
+        self.n_assets = n = len(self.asset_names)
+        self.lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+        self.upper = (np.ones(n) if upper is None
+                      else np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy())
+        if np.any(self.lower > self.upper) or self.lower.sum() > 1.0 + 1e-12 or self.upper.sum() < 1.0 - 1e-12:
+            raise ValueError("Les bornes sur les poids sont incompatibles avec un portefeuille investi à 100%")
+
+        self.sector_bounds = dict(sector_bounds or {})
+        self.sectors = dict(sectors or {})
+        unknown = set(self.sector_bounds) - set(self.sectors.values())
+        if unknown:
+            raise ValueError(f"Secteurs sans actif: {', '.join(sorted(unknown))}")
+
+        if (current_weights is None) != (max_turnover is None):
+            raise ValueError("La contrainte de rotation nécessite le portefeuille actuel et la rotation maximale")
+        self.current_weights = None if current_weights is None else np.asarray(current_weights, dtype=float)
+        self.max_turnover = max_turnover
+
+    @property
+    def n_auxiliary(self) -> int:
+        """Nombre de variables auxiliaires (rotation)."""
+        return self.n_assets if self.max_turnover is not None else 0
+
+    @property
+    def is_box_only(self) -> bool:
+        """True si seules des bornes par actif sont imposées (cas traité par la ligne critique)."""
+        return not self.sector_bounds and self.max_turnover is None
+
+    @property
+    def is_unconstrained(self) -> bool:
+        """True si seul le budget est imposé (bornes infinies: ventes à découvert sans limite)."""
+        return self.is_box_only and bool(np.all(np.isneginf(self.lower)) and np.all(np.isposinf(self.upper)))
+
+    @classmethod
+    def unconstrained(cls, asset_names: List[str]) -> 'PortfolioConstraints':
+        """Contraintes réduites au budget Σw = 1, ventes à découvert autorisées (solveur 'analytic')."""
+        return cls(asset_names, lower=-np.inf, upper=np.inf)
+
+    @property
+    def is_long_only(self) -> bool:
+        """True pour la seule contrainte par défaut w >= 0."""
+        return self.is_box_only and not self.lower.any() and bool(np.all(self.upper >= 1.0))
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Bornes (minimum, maximum) par actif."""
+        return self.lower, self.upper
+
+    def signature(self) -> str:
+        """Description canonique des contraintes (clé du cache de résultats)."""
+        if self.is_long_only:
+            return 'long_only'
+        return json.dumps({
+            'lower': self.lower.tolist(), 'upper': self.upper.tolist(),
+            'sectors': sorted((a, s) for a, s in self.sectors.items() if s in self.sector_bounds),
+            'sector_bounds': sorted((s, list(b)) for s, b in self.sector_bounds.items()),
+            'current': None if self.current_weights is None else self.current_weights.tolist(),
+            'max_turnover': self.max_turnover,
+        })
+
+    def build(self, n_columns: int, aux_offset: int) -> Tuple[spmatrix, np.ndarray]:
+        """
+        Assemble les inégalités G·x <= h en O(n) éléments non nuls.
+
+        Args:
+            n_columns: Nombre total de variables du QP
+            aux_offset: Indice de la première variable auxiliaire de rotation
+
+        Returns:
+            Tuple contenant (G creuse, h)
+        """
+        n = self.n_assets
+        values: List[np.ndarray] = []
+        rows: List[np.ndarray] = []
+        cols: List[np.ndarray] = []
+        rhs: List[np.ndarray] = []
+        n_rows = 0
+
+        def add(v, r, c, h):
+            nonlocal n_rows
+            values.append(np.asarray(v, dtype=float))
+            rows.append(np.asarray(r) + n_rows)
+            cols.append(np.asarray(c))
+            rhs.append(np.asarray(h, dtype=float))
+            n_rows += len(h)
+
+        assets = np.arange(n)
+        # -w_i <= -l_i (une borne infinie n'impose rien)
+        floored = np.flatnonzero(np.isfinite(self.lower))
+        if floored.size:
+            add(-np.ones(floored.size), np.arange(floored.size), floored, -self.lower[floored])
+        # w_i <= u_i, sauf si le budget l'implique déjà: w_i = 1 - Σ_{j≠i} w_j <= 1 dès que
+        # les autres poids minimum sont de somme positive (ventes à découvert exclues)
+        with np.errstate(invalid='ignore'):
+            implied = (self.upper >= 1.0) & (self.lower.sum() - self.lower >= 0.0)
+        capped = np.flatnonzero(np.isfinite(self.upper) & ~implied)
+        if capped.size:
+            add(np.ones(capped.size), np.arange(capped.size), capped, self.upper[capped])
+
+        # Poids par secteur: min <= Σ_{i ∈ secteur} w_i <= max
+        index = {name: i for i, name in enumerate(self.asset_names)}
+        for sector, (low, high) in sorted(self.sector_bounds.items()):
+            members = np.array([index[a] for a, s in self.sectors.items() if s == sector and a in index], dtype=int)
+            if high is not None and high < 1.0:
+                add(np.ones(members.size), np.zeros(members.size, dtype=int), members, [high])
+            if low is not None and low > 0.0:
+                add(-np.ones(members.size), np.zeros(members.size, dtype=int), members, [-low])
+
+        # Rotation: w - t <= w0, -w - t <= -w0, Σt <= T
+        if self.max_turnover is not None:
+            aux = aux_offset + assets
+            w0 = self.current_weights
+            add(np.concatenate((np.ones(n), -np.ones(n))), np.tile(assets, 2),
+                np.concatenate((assets, aux)), w0)
+            add(np.concatenate((-np.ones(n), -np.ones(n))), np.tile(assets, 2),
+                np.concatenate((assets, aux)), -w0)
+            add(np.ones(n), np.zeros(n, dtype=int), aux, [self.max_turnover])
+
+        if not n_rows:
+            return spmatrix([], [], [], (0, n_columns)), np.empty(0)
+        G = spmatrix(np.concatenate(values).tolist(), np.concatenate(rows).tolist(),
+                     np.concatenate(cols).tolist(), (n_rows, n_columns))
+        return G, np.concatenate(rhs)
+
+    def auxiliary_start(self, weights: np.ndarray) -> np.ndarray:
+        """Point de départ des variables auxiliaires pour des poids donnés (démarrage à chaud)."""
+        if self.max_turnover is None:
+            return np.empty(0)
+        return np.abs(np.asarray(weights, dtype=float) - self.current_weights) + 1e-6
+
@@ -0,0 +1,403 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from instrumentation import instrument
+
+
+def nearest_psd(matrix: np.ndarray, max_iterations: int = 100, tol: float = 1e-4,
+                memory: int = 5) -> np.ndarray:
+    """
+    Projette une matrice de covariance symétrique sur les matrices semi-définies positives.
+
+    Les variances sont conservées: on calcule la matrice de corrélation la plus proche
+    au sens de Frobenius (projections alternées de Higham, 2002), puis on la remet à
+    l'échelle des écarts-types. La correction de Dykstra ne portant que sur la diagonale,
+    l'itération se réduit à un point fixe sur un vecteur y de taille n,
+    y ← y + 1 - diag((C + diag(y))₊), accéléré par la méthode d'Anderson (Higham et
+    Strabić, 2016). Chaque itération coûte une décomposition spectrale ; la matrice
+    projetée n'est formée qu'à la fin. Si la factorisation de Cholesky réussit, la
+    matrice est renvoyée telle quelle.
+
+    Args:
+        matrix: Matrice de covariance symétrique (n x n), diagonale strictement positive
+        max_iterations: Nombre maximum de décompositions spectrales
+        tol: Écart maximal toléré entre la diagonale projetée et 1, avant remise à l'échelle
+        memory: Nombre d'itérations conservées par l'accélération d'Anderson (0 pour aucune)
+
+    Returns:
+        Matrice semi-définie positive de même diagonale
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    try:
+        np.linalg.cholesky(matrix)
+        return matrix
+    except np.linalg.LinAlgError:
+        pass
+    if np.any(np.diag(matrix) <= 0):
+        raise ValueError("La diagonale de la matrice de covariance doit être strictement positive")
+    std = np.sqrt(np.diag(matrix))
+    corr = matrix / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    y = np.zeros(len(corr))
+    residuals: List[np.ndarray] = []
+    images: List[np.ndarray] = []
+    for _ in range(max_iterations):
+        shifted = corr.copy()
+        shifted.flat[::len(corr) + 1] += y
+        values, vectors = np.linalg.eigh(shifted)
+        positive = np.maximum(values, 0.0)
+        # diag(V·Λ₊·Vᵀ) en O(n²)
+        residual = 1.0 - (vectors ** 2) @ positive
+        if np.max(np.abs(residual)) <= tol:
+            break
+        image = y + residual
+        residuals.append(residual)
+        images.append(image)
+        if len(residuals) > memory + 1:
+            residuals.pop(0)
+            images.pop(0)
+        if len(residuals) > 1:
+            gamma = np.linalg.lstsq(np.diff(residuals, axis=0).T, residual, rcond=None)[0]
+            y = image - np.diff(images, axis=0).T @ gamma
+        else:
+            y = image
+    projected = (vectors * positive) @ vectors.T
+    # La remise à l'échelle de la diagonale préserve la semi-définie positivité
+    scale = std / np.sqrt(np.maximum(np.diag(projected), np.finfo(float).tiny))
+    projected *= np.outer(scale, scale)
+    return (projected + projected.T) / 2.0
+
+
+@instrument
+class CovarianceModel:
+    def __init__(self, cov_matrix: pd.DataFrame):
+        """
+        Modèle de covariance dense.
+
+        La vérification de semi-définie positivité est calculée une seule fois puis
+        mise en cache, de sorte qu'un même modèle peut être partagé entre optimiseurs.
+
+        Args:
+            cov_matrix: Matrice de covariance des rendements
+        """
+        self.asset_names: List[str] = list(cov_matrix.index)
+        self.n_assets = len(self.asset_names)
+        self._matrix = np.asarray(cov_matrix, dtype=float)
+        self._frame: Optional[pd.DataFrame] = cov_matrix if isinstance(cov_matrix, pd.DataFrame) else None
+        self._psd: Optional[bool] = None
+
+    @classmethod
+    def sample(cls, returns: pd.DataFrame) -> 'CovarianceModel':
+        """
+        Covariance empirique des rendements.
+
+        Args:
+            returns: DataFrame des rendements
+
+        Returns:
+            Modèle de covariance dense
+        """
+        return cls(returns.cov())
+
+    @classmethod
+    def pairwise(cls, returns: pd.DataFrame, min_periods: int = 2) -> 'CovarianceModel':
+        """
+        Covariance par paires sur les dates communes, pour des historiques à trous.
+
+        Chaque paire d'actifs utilise toutes les dates où les deux sont observés (comme
+        `DataFrame.cov`), mais en trois produits matriciels masqués au lieu d'une boucle
+        sur les paires. Les paires sans assez de dates communes sont supposées non
+        corrélées, puis la matrice est projetée sur les matrices semi-définies positives
+        (`nearest_psd`). Sans valeur manquante, le résultat est la covariance empirique.
+
+        Args:
+            returns: DataFrame des rendements (NaN pour les dates non observées)
+            min_periods: Nombre minimum d'observations communes d'une paire
+
+        Returns:
+            Modèle de covariance dense, avec le nombre d'observations par actif dans
+            `observations` et l'écart relatif dû à la projection dans `projection`
+        """
+        # Un seul bloc: le décalage est la moyenne exacte de chaque actif
+        moments = StreamingCovariance(returns.columns)
+        moments.update(returns.to_numpy(dtype=float))
+        return moments.model(min_periods)
+
+    @classmethod
+    def ledoit_wolf(cls, returns: pd.DataFrame) -> 'CovarianceModel':
+        """
+        Covariance rétrécie vers une matrice identité pondérée (Ledoit-Wolf, 2004).
+
+        Le résultat est une combinaison convexe de deux matrices semi-définies positives,
+        il est donc semi-défini positif par construction (pas de décomposition spectrale).
+
+        Args:
+            returns: DataFrame des rendements
+
+        Returns:
+            Modèle de covariance dense, avec l'intensité de rétrécissement dans `shrinkage`
+        """
+        X = returns.to_numpy(dtype=float)
+        X = X - X.mean(axis=0)
+        n_samples, n_features = X.shape
+        emp_cov = X.T @ X / n_samples
+        X2 = X ** 2
+        emp_cov_trace = X2.sum(axis=0) / n_samples
+        mu = emp_cov_trace.sum() / n_features
+
+        beta_ = (X2.T @ X2).sum()
+        delta_ = (emp_cov ** 2).sum()
+        beta = (beta_ / n_samples - delta_) / (n_features * n_samples)
+        delta = (delta_ - 2.0 * mu * emp_cov_trace.sum() + n_features * mu ** 2) / n_features
+        beta = min(beta, delta)
+        shrinkage = 0.0 if beta == 0 else beta / delta
+
+        shrunk = (1.0 - shrinkage) * emp_cov
+        shrunk.flat[::n_features + 1] += shrinkage * mu
+        model = cls(pd.DataFrame(shrunk, index=returns.columns, columns=returns.columns))
+        model.shrinkage = shrinkage
+        model._psd = True
+        return model
+
+    def to_frame(self) -> pd.DataFrame:
+        """Matrice de covariance dense (calculée une seule fois)."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.dense(), index=self.asset_names, columns=self.asset_names)
+        return self._frame
+
+    def dense(self) -> np.ndarray:
+        """Matrice de covariance dense sous forme de tableau."""
+        return self._matrix
+
+    def is_psd(self, tol: float = 1e-10) -> bool:
+        """
+        Vérifie (une seule fois) que la matrice est semi-définie positive.
+
+        Args:
+            tol: Tolérance pour les erreurs numériques
+
+        Returns:
+            True si toutes les valeurs propres sont >= -tol
+        """
+        if self._psd is None:
+            self._psd = bool(np.all(np.linalg.eigvalsh(self._matrix) >= -tol))
+        return self._psd
+
+    def portfolio_variance(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Variance d'un ou plusieurs portefeuilles.
+
+        Args:
+            weights: Poids (vecteur, ou matrice portefeuilles x actifs)
+
+        Returns:
+            Variance (scalaire ou vecteur)
+        """
+        weights = np.asarray(weights, dtype=float)
+        return np.einsum('...i,...i->...', weights @ self._matrix, weights)
+
+
+@instrument
+class FactorCovariance(CovarianceModel):
+    def __init__(self, loadings: np.ndarray, factor_cov: np.ndarray,
+                 specific_var: np.ndarray, asset_names: List[str]):
+        """
+        Modèle de covariance à facteurs: Σ = B·F·Bᵀ + D.
+
+        Le risque d'un portefeuille se calcule en O(n·k) sans jamais former la matrice
+        dense ; la factorisation de Cholesky de F est calculée une seule fois.
+
+        Args:
+            loadings: Expositions B aux facteurs (n x k)
+            factor_cov: Covariance des facteurs F (k x k)
+            specific_var: Variances spécifiques, diagonale de D (n)
+            asset_names: Noms des actifs
+        """
+        self.asset_names = list(asset_names)
+        self.n_assets = len(self.asset_names)
+        self.loadings = np.asarray(loadings, dtype=float)
+        self.factor_cov = np.asarray(factor_cov, dtype=float)
+        self.specific_var = np.asarray(specific_var, dtype=float)
+        self.n_factors = self.loadings.shape[1]
+        self._frame = None
+        self._matrix = None
+        self._psd = None
+        self._factor_chol: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, n_factors: int = 10) -> 'FactorCovariance':
+        """
+        Estime un modèle à facteurs statistiques (composantes principales).
+
+        Les composantes sont obtenues par SVD randomisée (quelques itérations de puissance),
+        en O(T·n·k) opérations et O((T + n)·k) mémoire, sans former de matrice n x n.
+
+        Args:
+            returns: DataFrame des rendements
+            n_factors: Nombre de facteurs conservés
+
+        Returns:
+            Modèle de covariance à facteurs
+        """
+        X = returns.to_numpy(dtype=float, copy=True)
+        X -= X.mean(axis=0)
+        n_samples, n_features = X.shape
+        n_factors = min(n_factors, min(X.shape) - 1)
+        if n_factors < 1:
+            raise ValueError("Pas assez d'observations pour estimer un modèle à facteurs")
+
+        rng = np.random.default_rng(0)
+        sketch = min(n_factors + 10, min(X.shape))
+        Q, _ = np.linalg.qr(X @ rng.standard_normal((n_features, sketch)))
+        for _ in range(2):
+            Q, _ = np.linalg.qr(X @ (X.T @ Q))
+        _, s, vt = np.linalg.svd(Q.T @ X, full_matrices=False)
+        loadings = vt[:n_factors].T
+        factor_var = s[:n_factors] ** 2 / (n_samples - 1)
+        total_var = np.einsum('ij,ij->j', X, X) / (n_samples - 1)
+        specific_var = total_var - (loadings ** 2) @ factor_var
+        # Plancher sur le risque spécifique pour garder D strictement positive
+        specific_var = np.maximum(specific_var, 1e-6 * total_var.mean())
+        return cls(loadings, np.diag(factor_var), specific_var, list(returns.columns))
+
+    def dense(self) -> np.ndarray:
+        """Matrice de covariance dense (O(n²) en mémoire, calculée une seule fois)."""
+        if self._matrix is None:
+            matrix = self.loadings @ self.factor_cov @ self.loadings.T
+            matrix.flat[::self.n_assets + 1] += self.specific_var
+            self._matrix = matrix
+        return self._matrix
+
+    def factor_cholesky(self) -> np.ndarray:
+        """Facteur de Cholesky L de F (F = L·Lᵀ), calculé une seule fois."""
+        if self._factor_chol is None:
+            self._factor_chol = np.linalg.cholesky(self.factor_cov)
+        return self._factor_chol
+
+    def is_psd(self, tol: float = 1e-10) -> bool:
+        """
+        Vérifie (une seule fois) la semi-définie positivité en O(k³): F semi-définie
+        positive et D positive suffisent.
+
+        Args:
+            tol: Tolérance pour les erreurs numériques
+
+        Returns:
+            True si le modèle est semi-défini positif
+        """
+        if self._psd is None:
+            self._psd = bool(np.all(np.linalg.eigvalsh(self.factor_cov) >= -tol)
+                             and np.all(self.specific_var >= -tol))
+        return self._psd
+
+    def portfolio_variance(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Variance d'un ou plusieurs portefeuilles en O(n·k).
+
+        Args:
+            weights: Poids (vecteur, ou matrice portefeuilles x actifs)
+
+        Returns:
+            Variance (scalaire ou vecteur)
+        """
+        weights = np.asarray(weights, dtype=float)
+        exposures = (weights @ self.loadings) @ self.factor_cholesky()
+        return (np.einsum('...i,...i->...', exposures, exposures)
+                + np.einsum('...i,...i->...', weights * self.specific_var, weights))
+
+
+@instrument
+class StreamingCovariance:
+    def __init__(self, asset_names: List[str]):
+        """
+        Moyennes et covariance par paires accumulées bloc de rendements par bloc.
+
+        Chaque bloc ajoute ses produits masqués (voir CovarianceModel.pairwise) à trois
+        sommes n x n: la mémoire ne dépend pas de la longueur de l'historique, qui peut
+        être lu par morceaux (ex: BarStore). Les rendements sont décalés par les moyennes
+        du premier bloc (la covariance est invariante par translation), ce qui limite les
+        pertes de précision des sommes de produits. Un bloc sans valeur manquante ne
+        coûte qu'un produit matriciel.
+
+        Args:
+            asset_names: Noms des actifs, dans l'ordre des colonnes des blocs
+        """
+        self.asset_names = list(asset_names)
+        self.n_assets = len(self.asset_names)
+        self.n_periods = 0
+        self._shift: Optional[np.ndarray] = None
+        self._cross = np.zeros((self.n_assets, self.n_assets))
+        # sums[i, j]: somme des rendements de i sur les dates où j est observé
+        self._sums = np.zeros((self.n_assets, self.n_assets))
+        self._pairs = np.zeros((self.n_assets, self.n_assets))
+
+    def update(self, returns: np.ndarray) -> None:
+        """
+        Ajoute un bloc de rendements (dates x actifs, NaN pour les dates non observées).
+
+        Args:
+            returns: Bloc de rendements (tableau ou DataFrame, float32 ou float64)
+        """
+        X = np.array(returns, dtype=float)
+        if X.ndim != 2 or X.shape[1] != self.n_assets:
+            raise ValueError(f"Les rendements doivent avoir {self.n_assets} colonnes (une par actif)")
+        if not len(X):
+            return
+        observed = np.isfinite(X)
+        complete = bool(observed.all())
+        if self._shift is None:
+            counts = observed.sum(axis=0)
+            self._shift = np.where(observed, X, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        X -= self._shift
+        if complete:
+            self._cross += X.T @ X
+            self._sums += X.sum(axis=0)[:, None]
+            self._pairs += len(X)
+        else:
+            X[~observed] = 0.0
+            M = observed.astype(float)
+            self._cross += X.T @ X
+            self._sums += X.T @ M
+            self._pairs += M.T @ M
+        self.n_periods += len(X)
+
+    @property
+    def observations(self) -> np.ndarray:
+        """Nombre de rendements observés par actif."""
+        return np.diag(self._pairs).astype(np.int64)
+
+    def mean(self) -> pd.Series:
+        """Rendement moyen de chaque actif sur ses dates observées."""
+        counts = np.diag(self._pairs)
+        shift = self._shift if self._shift is not None else np.zeros(self.n_assets)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(shift + np.diag(self._sums) / counts, index=self.asset_names)
+
+    def model(self, min_periods: int = 2) -> CovarianceModel:
+        """
+        Covariance par paires des blocs reçus, projetée sur les matrices semi-définies positives.
+
+        Args:
+            min_periods: Nombre minimum d'observations communes d'une paire
+
+        Returns:
+            Modèle de covariance dense, avec le nombre d'observations par actif dans
+            `observations` et l'écart relatif dû à la projection dans `projection`
+        """
+        counts = self.observations
+        short = [str(name) for name, count in zip(self.asset_names, counts) if count < min_periods]
+        if short:
+            raise ValueError(f"Historique insuffisant pour: {', '.join(short)}")
+
+        pairs, sums = self._pairs, self._sums
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = (self._cross - sums * sums.T / pairs) / (pairs - 1.0)
+        cov[pairs < max(min_periods, 2)] = 0.0
+        cov = (cov + cov.T) / 2.0
+
+        projected = nearest_psd(cov)
+        model = CovarianceModel(pd.DataFrame(projected, index=self.asset_names, columns=self.asset_names))
+        model.observations = counts
+        model.projection = float(np.linalg.norm(projected - cov) / np.linalg.norm(cov))
+        model._psd = True
+        return model
@@ -1,57 +1,229 @@
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
+from price_cache import PriceCache, bar_duration, period_start
+from providers import FetchPipeline, PriceProvider
+from covariance import CovarianceModel, FactorCovariance, StreamingCovariance
+from bar_store import BarStore
+from synthetic import SyntheticMarket
+from instrumentation import instrument
 
+@instrument
 class DataLoader:
-    def __init__(self):
-        """Initialise le chargeur de données."""
-        pass
+    def __init__(self, cache_dir: Optional[str] = None, offline: bool = False,
+                 provider: Optional[PriceProvider] = None, chunk_size: int = 50,
+                 max_workers: int = 4, retries: int = 3):
+        """
+        Initialise le chargeur de données.
+        
+        Args:
+            cache_dir: Répertoire du cache disque des prix (pas de cache si None)
+            offline: Si True, les prix sont lus uniquement dans le cache, sans accès réseau
+            provider: Source des prix (yfinance par défaut ; FileProvider, MemoryProvider...)
+            chunk_size: Nombre de tickers par requête à la source
+            max_workers: Nombre maximum de requêtes simultanées
+            retries: Nombre de reprises d'un lot en échec
+        """
+        if offline and cache_dir is None:
+            raise ValueError("Le mode hors ligne nécessite un répertoire de cache")
+        self.cache = PriceCache(cache_dir) if cache_dir is not None else None
+        self.offline = offline
+        self.pipeline = FetchPipeline(provider, chunk_size=chunk_size, max_workers=max_workers, retries=retries)
+        # Statut par ticker des téléchargements du dernier appel à get_market_data
+        self.fetch_report: Optional[pd.DataFrame] = None
 
-    def get_market_data(self, tickers: List[str], period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+    def _download(self, tickers: List[str], start: Optional[pd.Timestamp] = None,
+                  end: Optional[pd.Timestamp] = None, interval: str = "1d",
+                  period: Optional[str] = None) -> pd.DataFrame:
         """
-        Récupère les données boursières via yfinance.
+        Télécharge les prix de clôture par lots parallèles, avec reprises.
+        
+        Args:
+            tickers: Liste des symboles boursiers
+            start: Date de début (ignorée si `period` est fourni)
+            end: Date de fin exclue (None pour aujourd'hui)
+            interval: Fréquence des données
+            period: Période d'analyse
+            
+        Returns:
+            DataFrame contenant les prix de clôture ajustés
+        """
+        if period is not None:
+            start = period_start(period, pd.Timestamp.now(tz='UTC').tz_localize(None))
+        prices, report = self.pipeline.fetch(tickers, start, end, interval)
+        self.fetch_report = report if self.fetch_report is None else pd.concat([self.fetch_report, report])
+        return prices
+
+    def get_market_data(self, tickers: List[str], period: str = "1y", interval: str = "1d",
+                        dropna: bool = False) -> pd.DataFrame:
+        """
+        Récupère les données boursières auprès de la source de prix (yfinance par défaut).
+        
+        Avec un cache, seules les plages de dates manquantes sont téléchargées ;
+        en mode hors ligne, aucune requête réseau n'est effectuée.
+        
+        Le calendrier complet est conservé: pour des places de cotation différentes
+        (jours fériés distincts, introductions récentes), un ticker non coté à une date
+        y vaut NaN, et calculate_returns en tient compte.
         
         Args:
             tickers: Liste des symboles boursiers
-            period: Période d'analyse (ex: "1mo", "2mo", "3mo", "6mo", "1y", "2y", "5y")
-            interval: Fréquence des données (ex: "1d", "1wk", "1mo")
+            period: Période d'analyse (ex: "5d", "1mo", "2mo", "3mo", "6mo", "1y", "2y", "5y")
+            interval: Fréquence des données (ex: "1m", "5m", "1h", "1d", "1wk", "1mo") ; les
+                sources limitent l'historique infra-journalier (ex: 7 jours en 1m pour
+                yfinance), voir ingest pour les longs historiques
+            dropna: Si True, seules les dates où tous les tickers sont cotés sont conservées
+                (prix rectangulaires, ex: pour WalkForwardBacktester)
             
         Returns:
             DataFrame contenant les prix de clôture ajustés
         """
+        self.fetch_report = None
         try:
-            data = yf.download(tickers, period=period, interval=interval, auto_adjust=True)
-            # On prend 'Close' si auto_adjust=True, sinon 'Adj Close'
-            if isinstance(data, pd.DataFrame) and 'Close' in data:
-                prices = data['Close']
-            elif isinstance(data, pd.DataFrame) and 'Adj Close' in data:
-                prices = data['Adj Close']
+            if self.cache is not None:
+                fetch = None if self.offline else self._download
+                prices = self.cache.get(list(tickers), period, interval, fetch=fetch)
             else:
-                raise ValueError("Aucune colonne de prix ('Close' ou 'Adj Close') trouvée dans les données téléchargées.")
+                prices = self._download(tickers, interval=interval, period=period)
             if prices.empty:
                 raise ValueError("Aucune donnée n'a été récupérée")
+            missing = [ticker for ticker in prices.columns if prices[ticker].isnull().all()]
+            if missing:
+                raise ValueError(f"Aucune donnée pour: {', '.join(map(str, missing))}")
             if prices.isnull().any().any():
-                prices = prices.dropna()
+                prices = prices.dropna() if dropna else prices.dropna(how='all')
                 if prices.empty:
                     raise ValueError("Toutes les données ont été supprimées après le nettoyage des valeurs manquantes")
             return prices
         except Exception as e:
             raise ValueError(f"Erreur lors de la récupération des données: {str(e)}")
 
-    def calculate_returns(self, prices: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+    def ingest(self, store: BarStore, tickers: List[str], period: str = "1mo",
+               window: Optional[pd.Timedelta] = None) -> int:
+        """
+        Alimente un BarStore par fenêtres de dates successives, sans jamais charger tout
+        l'historique en mémoire.
+        
+        Chaque fenêtre est téléchargée pour tous les tickers (par lots parallèles) puis
+        ajoutée au stockage. Le téléchargement reprend à la dernière barre stockée: un
+        nouvel appel ne demande que les barres manquantes. Un ticker ajouté à un stockage
+        existant n'a d'historique qu'à partir de son ajout.
+        
+        Args:
+            store: Stockage des barres (sa fréquence est celle téléchargée)
+            tickers: Liste des symboles boursiers
+            period: Période d'analyse, si le stockage est vide
+            window: Durée d'une fenêtre (10 000 barres par défaut, ex: 7 jours en 1m)
+            
+        Returns:
+            Nombre de barres ajoutées ou remplacées
+        """
+        if self.offline:
+            raise ValueError("Le mode hors ligne ne permet pas d'alimenter un stockage de barres")
+        self.fetch_report = None
+        try:
+            now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+            start = period_start(period, now)
+            if store.last_date is not None:
+                start = max(start, store.last_date)
+            window = window if window is not None else bar_duration(store.interval) * 10_000
+            added = 0
+            while start < now:
+                end = start + window
+                prices = self._download(tickers, start, end if end < now else None, store.interval)
+                if len(prices):
+                    added += store.append(prices)
+                start = end
+            return added
+        except Exception as e:
+            raise ValueError(f"Erreur lors de la récupération des données: {str(e)}")
+
+    @staticmethod
+    def _chunk_returns(prices: np.ndarray, last: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rendements d'un bloc de prix entre cotations successives de chaque actif.
+        
+        Args:
+            prices: Bloc de prix (dates x actifs, NaN si non coté)
+            last: Dernier prix coté de chaque actif avant le bloc (NaN si aucun)
+            
+        Returns:
+            Tuple contenant (rendements du bloc, derniers prix cotés à la fin du bloc)
+        """
+        seen = np.where(np.isnan(prices), -1, np.arange(len(prices))[:, None])
+        np.maximum.accumulate(seen, axis=0, out=seen)
+        filled = np.where(seen >= 0, np.take_along_axis(prices, np.maximum(seen, 0), axis=0), last)
+        previous = np.vstack((last[None, :], filled[:-1]))
+        return prices / previous - 1.0, filled[-1]
+
+    def stream_statistics(self, store: BarStore, interval: Optional[str] = None,
+                          tickers: Optional[List[str]] = None, min_periods: int = 2,
+                          memory_budget_mb: float = 64.0) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Rendements moyens et covariance d'un BarStore, lu par blocs.
+        
+        Mêmes conventions que calculate_returns avec l'estimateur "sample" (rendements
+        entre cotations successives, covariance par paires projetée en cas de trous),
+        mais seul un bloc de barres réside en mémoire, dont la taille est déduite du
+        budget: la mémoire ne dépend que du nombre d'actifs, pas de la longueur de
+        l'historique. Pour annualiser, voir BarStore.periods_per_year.
+        
+        Args:
+            store: Stockage des barres
+            interval: Fréquence des rendements, rééchantillonnés à la volée (celle du
+                stockage par défaut)
+            tickers: Tickers à utiliser (tous par défaut)
+            min_periods: Nombre minimum d'observations communes d'une paire
+            memory_budget_mb: Mémoire de travail maximale par bloc de barres, en Mo
+            
+        Returns:
+            Tuple contenant (rendements moyens, matrice de covariance) par barre
+        """
+        try:
+            tickers = list(store.tickers if tickers is None else tickers)
+            moments = StreamingCovariance(tickers)
+            last = np.full(len(tickers), np.nan)
+            # Bloc de prix float32 + une dizaine de tableaux float64 temporaires par barre
+            # (prix, positions, prix reportés, rendements, copie décalée, masques)
+            chunk_rows = max(1, int(memory_budget_mb * 2 ** 20) // (max(1, len(tickers)) * 84))
+            for chunk in store.iter_chunks(chunk_rows, tickers, interval=interval):
+                returns, last = self._chunk_returns(chunk.to_numpy(dtype=float), last)
+                returns = returns[~np.isnan(returns).all(axis=1)]
+                if np.isinf(returns).any():
+                    raise ValueError("Des valeurs infinies ont été détectées dans les rendements")
+                moments.update(returns)
+            if not moments.n_periods:
+                raise ValueError("Aucun rendement n'a pu être calculé")
+            return moments.mean(), moments.model(min_periods).to_frame()
+        except Exception as e:
+            raise ValueError(f"Erreur lors du calcul des rendements: {str(e)}")
+
+    def calculate_returns(self, prices: pd.DataFrame, covariance: str = "sample",
+                          n_factors: int = 10) -> Tuple[pd.DataFrame, pd.Series, Union[pd.DataFrame, CovarianceModel]]:
         """
         Calcule les rendements, rendements moyens et matrice de covariance.
         
+        Les prix peuvent contenir des trous (calendriers de cotation différents): le
+        rendement d'un actif est calculé entre ses cotations successives, et vaut NaN aux
+        dates où il n'est pas coté. Moyennes et covariance "sample" utilisent alors toutes
+        les observations disponibles (covariance par paires projetée sur les matrices
+        semi-définies positives) ; "ledoit_wolf" et "factor" n'utilisent que les dates
+        communes à tous les actifs.
+        
         Args:
             prices: DataFrame des prix
+            covariance: Estimateur de covariance: "sample" (matrice dense), "ledoit_wolf"
+                (rétrécissement) ou "factor" (modèle à facteurs B·F·Bᵀ + D)
+            n_factors: Nombre de facteurs pour l'estimateur "factor"
             
         Returns:
-            Tuple contenant (rendements, rendements moyens, matrice de covariance)
+            Tuple contenant (rendements, rendements moyens, matrice de covariance) ; pour
+            "ledoit_wolf" et "factor", la covariance est un CovarianceModel accepté par
+            PortfolioOptimizer
         """
         try:
-            # Calcul des rendements
-            returns = prices.pct_change().dropna()
+            # Calcul des rendements, entre cotations successives de chaque actif
+            returns = (prices / prices.ffill().shift(1) - 1.0).iloc[1:].dropna(how='all')
             
             if returns.empty:
                 raise ValueError("Aucun rendement n'a pu être calculé")
@@ -62,12 +234,25 @@ class DataLoader:
                 
             # Calcul des statistiques
             mean_returns = returns.mean()
-            cov_matrix = returns.cov()
+            complete = not returns.isnull().values.any()
+            if covariance not in ("sample", "ledoit_wolf", "factor"):
+                raise ValueError(f"Estimateur de covariance inconnu: {covariance}")
+            if covariance == "sample":
+                model = CovarianceModel.sample(returns) if complete else CovarianceModel.pairwise(returns)
+            else:
+                common = returns if complete else returns.dropna()
+                if len(common) < 2:
+                    raise ValueError("Pas assez de dates communes à tous les actifs pour cet estimateur")
+                if covariance == "ledoit_wolf":
+                    model = CovarianceModel.ledoit_wolf(common)
+                else:
+                    model = FactorCovariance.from_returns(common, n_factors=n_factors)
             
             # Vérification de la matrice de covariance
-            if not np.all(np.linalg.eigvals(cov_matrix) >= -1e-10):
+            if not model.is_psd():
                 raise ValueError("La matrice de covariance n'est pas semi-définie positive")
                 
+            cov_matrix = model.to_frame() if covariance == "sample" else model
             return returns, mean_returns, cov_matrix
             
         except Exception as e:
@@ -106,4 +291,25 @@ class DataLoader:
             return prices_df, mean_returns, cov_matrix
             
         except Exception as e:
-            raise ValueError(f"Erreur lors de la génération des données aléatoires: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Erreur lors de la génération des données aléatoires: {str(e)}")
+
+    def generate_factor_data(self, n_assets: int, n_days: int, n_factors: int = 5,
+                             seed: int = 42) -> Tuple[pd.DataFrame, pd.Series, FactorCovariance]:
+        """
+        Génère des données simulées corrélées (structure factorielle).
+        
+        Contrairement à generate_random_data, la covariance renvoyée est la vraie
+        covariance du processus: aucune estimation n'est effectuée. Pour des tailles
+        ne tenant pas en mémoire, utiliser directement SyntheticMarket (blocs, memmap).
+        
+        Args:
+            n_assets: Nombre d'actifs
+            n_days: Nombre de jours
+            n_factors: Nombre de facteurs
+            seed: Seed pour la reproductibilité
+            
+        Returns:
+            Tuple contenant (prix, vrais rendements moyens, vraie covariance)
+        """
+        market = SyntheticMarket(n_assets, n_factors=n_factors, seed=seed)
+        return market.price_frame(n_days), market.mean_returns, market.true_covariance() 
\ No newline at end of file
@@ -0,0 +1,257 @@
+import numpy as np
+from typing import Iterator, Optional, Tuple
+from instrumentation import instrument
+
+
+@instrument
+class CriticalLineFrontier:
+    def __init__(self, mean_returns: np.ndarray, cov_matrix: np.ndarray,
+                 lower_bounds: Optional[np.ndarray] = None,
+                 upper_bounds: Optional[np.ndarray] = None,
+                 corners: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+        """
+        Frontière de variance minimale calculée par la méthode de la ligne critique (CLA).
+
+        Les portefeuilles "coins" sont calculés une seule fois ; entre deux coins consécutifs
+        les poids sont affines en fonction du rendement, ce qui permet d'évaluer n'importe
+        quel nombre de points par simple interpolation.
+
+        Args:
+            mean_returns: Vecteur des rendements moyens
+            cov_matrix: Matrice de covariance des rendements
+            lower_bounds: Poids minimum par actif (0 par défaut)
+            upper_bounds: Poids maximum par actif (1 par défaut)
+            corners: Portefeuilles coins déjà calculés (rendements, poids), ex: depuis un cache
+        """
+        self.mean_returns = np.asarray(mean_returns, dtype=float)
+        self.cov_matrix = np.asarray(cov_matrix, dtype=float)
+        self.n_assets = len(self.mean_returns)
+        self.lower_bounds = (np.zeros(self.n_assets) if lower_bounds is None
+                             else np.asarray(lower_bounds, dtype=float))
+        self.upper_bounds = (np.ones(self.n_assets) if upper_bounds is None
+                             else np.asarray(upper_bounds, dtype=float))
+
+        if self.lower_bounds.sum() > 1.0 + 1e-12 or self.upper_bounds.sum() < 1.0 - 1e-12:
+            raise ValueError("Les bornes sur les poids sont incompatibles avec un portefeuille investi à 100%")
+
+        self._corners: Optional[Tuple[np.ndarray, np.ndarray]] = corners
+
+    @property
+    def corner_returns(self) -> np.ndarray:
+        """Rendements croissants des portefeuilles coins."""
+        if self._corners is None:
+            self._corners = self._compute_corners()
+        return self._corners[0]
+
+    @property
+    def corner_weights(self) -> np.ndarray:
+        """Poids des portefeuilles coins (coins x actifs)."""
+        if self._corners is None:
+            self._corners = self._compute_corners()
+        return self._corners[1]
+
+    def _initial_portfolio(self, mu: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Portefeuille de rendement maximum pour `mu` (point de départ, lambda infini)."""
+        weights = self.lower_bounds.copy()
+        is_free = np.zeros(self.n_assets, dtype=bool)
+        budget = 1.0 - weights.sum()
+        for i in np.argsort(-mu, kind='stable'):
+            room = self.upper_bounds[i] - self.lower_bounds[i]
+            if room >= budget:
+                weights[i] += budget
+                is_free[i] = True
+                break
+            weights[i] = self.upper_bounds[i]
+            budget -= room
+        return weights, is_free
+
+    def _iter_corners(self, mu: np.ndarray) -> Iterator[np.ndarray]:
+        """
+        Parcourt la ligne critique pour `mu`, de lambda infini jusqu'à lambda = 0.
+
+        Returns:
+            Itérateur sur les poids des portefeuilles coins, dans l'ordre du parcours
+        """
+        cov = self.cov_matrix
+        lb, ub = self.lower_bounds, self.upper_bounds
+        weights, is_free = self._initial_portfolio(mu)
+        yield weights.copy()
+        lam = np.inf
+
+        for _ in range(10 * self.n_assets + 10):
+            free = np.flatnonzero(is_free)
+            bounded = np.flatnonzero(~is_free)
+            if free.size == 0:
+                raise ValueError("Ligne critique dégénérée: aucun actif libre")
+
+            # Sur l'ensemble libre, les poids et le multiplicateur du budget sont affines en lambda:
+            # w_F = alpha + lambda * beta, gamma = g0 + lambda * g1
+            w_bounded = weights[bounded]
+            cov_fb_w = cov[np.ix_(free, bounded)] @ w_bounded
+            rhs = np.column_stack((mu[free], np.ones(free.size), cov_fb_w))
+            inv_mu, inv_one, inv_fb = np.linalg.solve(cov[np.ix_(free, free)], rhs).T
+            denom = inv_one.sum()
+            g0 = (1.0 - w_bounded.sum() + inv_fb.sum()) / denom
+            g1 = -inv_mu.sum() / denom
+            alpha = g0 * inv_one - inv_fb
+            beta = inv_mu + g1 * inv_one
+
+            threshold = lam - 1e-9 * max(1.0, abs(lam)) if np.isfinite(lam) else np.inf
+            lam_next, event = 0.0, None
+
+            # Un actif libre atteint une de ses bornes
+            with np.errstate(divide='ignore', invalid='ignore'):
+                bound = np.where(beta > 0, lb[free], ub[free])
+                lam_out = (bound - alpha) / beta
+            lam_out[~np.isfinite(lam_out) | (np.abs(beta) < 1e-14)] = -np.inf
+            lam_out[lam_out >= threshold] = -np.inf
+            if lam_out.size and lam_out.max() > lam_next:
+                k = int(np.argmax(lam_out))
+                lam_next, event = lam_out[k], ('out', free[k], bound[k])
+
+            # Un actif borné devient libre quand son gradient change de signe
+            if bounded.size:
+                cov_bf = cov[np.ix_(bounded, free)]
+                c = cov_bf @ alpha + cov[np.ix_(bounded, bounded)] @ w_bounded - g0
+                d = cov_bf @ beta - mu[bounded] - g1
+                at_upper = np.isclose(w_bounded, ub[bounded]) & ~np.isclose(w_bounded, lb[bounded])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    lam_in = -c / d
+                entering = np.where(at_upper, d < 0, d > 0) & (np.abs(d) > 1e-14)
+                lam_in[~entering | ~np.isfinite(lam_in) | (lam_in >= threshold)] = -np.inf
+                if lam_in.max() > lam_next:
+                    k = int(np.argmax(lam_in))
+                    lam_next, event = lam_in[k], ('in', bounded[k], None)
+
+            weights[free] = alpha + lam_next * beta
+            if event is None:
+                yield weights.copy()
+                return
+
+            kind, asset, value = event
+            if kind == 'out':
+                weights[asset] = value
+                is_free[asset] = False
+            else:
+                is_free[asset] = True
+            yield weights.copy()
+            lam = lam_next
+
+        raise ValueError("La ligne critique n'a pas convergé")
+
+    def _compute_corners(self, upper: Optional[np.ndarray] = None,
+                         lower: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcule les portefeuilles coins des deux branches de la frontière.
+
+        La branche supérieure est tracée pour les rendements `mu`, la branche inférieure
+        pour `-mu` ; les deux se rejoignent au portefeuille de variance minimale.
+
+        Args:
+            upper: Coins déjà tracés de la branche supérieure
+            lower: Coins déjà tracés de la branche inférieure
+
+        Returns:
+            Tuple contenant (rendements des coins croissants, poids des coins)
+        """
+        if upper is None:
+            upper = np.array(list(self._iter_corners(self.mean_returns)))
+        if lower is None:
+            lower = np.array(list(self._iter_corners(-self.mean_returns)))
+        weights = np.vstack((lower, upper[::-1]))
+        returns = weights @ self.mean_returns
+        variances = np.einsum('ij,jk,ik->i', weights, self.cov_matrix, weights)
+
+        # Tri par rendement puis suppression des coins de même rendement (on garde le moins risqué)
+        order = np.lexsort((variances, returns))
+        returns, weights = returns[order], weights[order]
+        scale = max(1.0, np.abs(returns).max())
+        keep = np.concatenate(([True], np.diff(returns) > 1e-12 * scale))
+        return returns[keep], weights[keep]
+
+    def evaluate(self, target_returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Évalue la frontière pour des rendements cibles par interpolation entre les coins.
+
+        Args:
+            target_returns: Rendements cibles (ramenés dans l'intervalle couvert par les coins)
+
+        Returns:
+            Tuple contenant (rendements, risques, poids)
+        """
+        targets = np.clip(np.asarray(target_returns, dtype=float),
+                          self.corner_returns[0], self.corner_returns[-1])
+        if len(self.corner_returns) == 1:
+            weights = np.repeat(self.corner_weights, len(targets), axis=0)
+        else:
+            idx = np.searchsorted(self.corner_returns, targets, side='right') - 1
+            idx = np.clip(idx, 0, len(self.corner_returns) - 2)
+            left, right = self.corner_returns[idx], self.corner_returns[idx + 1]
+            t = ((targets - left) / (right - left))[:, None]
+            weights = (1.0 - t) * self.corner_weights[idx] + t * self.corner_weights[idx + 1]
+
+        returns = weights @ self.mean_returns
+        risks = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, self.cov_matrix, weights), 0.0))
+        return returns, risks, weights
+
+    def frontier(self, n_points: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcule `n_points` portefeuilles régulièrement espacés en rendement.
+
+        Args:
+            n_points: Nombre de points sur la frontière
+
+        Returns:
+            Tuple contenant (rendements, risques, poids)
+        """
+        targets = np.linspace(self.corner_returns[0], self.corner_returns[-1], n_points)
+        return self.evaluate(targets)
+
+    def iter_frontier(self, n_points: int = 100) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Calcule la frontière de façon progressive.
+
+        Les points situés entre deux coins consécutifs sont émis dès que le second coin
+        est tracé: d'abord la branche efficiente (du rendement maximum vers la variance
+        minimale), puis la branche inférieure. L'ensemble des points émis est identique
+        à `frontier(n_points)`.
+
+        Args:
+            n_points: Nombre de points sur la frontière
+
+        Returns:
+            Itérateur sur des lots (rendements, risques, poids)
+        """
+        if self._corners is not None:
+            yield self.frontier(n_points)
+            return
+
+        top = self._initial_portfolio(self.mean_returns)[0] @ self.mean_returns
+        bottom = self._initial_portfolio(-self.mean_returns)[0] @ self.mean_returns
+        targets = np.linspace(bottom, top, n_points)
+        pending = np.ones(n_points, dtype=bool)
+        branches = []
+
+        for sign in (1.0, -1.0):
+            corners = []
+            for weights in self._iter_corners(sign * self.mean_returns):
+                corners.append(weights)
+                if len(corners) < 2:
+                    continue
+                previous, current = corners[-2], corners[-1]
+                r_prev, r_cur = previous @ self.mean_returns, current @ self.mean_returns
+                low, high = min(r_prev, r_cur), max(r_prev, r_cur)
+                mask = pending & (targets >= low) & (targets <= high)
+                if high <= low or not mask.any():
+                    continue
+                t = ((targets[mask] - r_prev) / (r_cur - r_prev))[:, None]
+                batch = (1.0 - t) * previous + t * current
+                pending &= ~mask
+                risks = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', batch, self.cov_matrix, batch), 0.0))
+                yield batch @ self.mean_returns, risks, batch
+            branches.append(np.array(corners))
+
+        self._corners = self._compute_corners(upper=branches[0], lower=branches[1])
+        if pending.any():
+            # Points non couverts (coins dégénérés): évaluation sur les coins définitifs
+            yield self.evaluate(targets[pending])
@@ -0,0 +1,144 @@
+import numpy as np
+from typing import List, Tuple, Union
+from covariance import CovarianceModel, FactorCovariance
+from instrumentation import instrument
+
+
+@instrument
+class HierarchicalRiskParity:
+    def __init__(self, covariance: Union[np.ndarray, CovarianceModel]):
+        """
+        Allocation par parité de risque hiérarchique (López de Prado, 2016), sans QP.
+
+        Les actifs sont regroupés par liaison simple sur la distance de corrélation
+        d = √((1 - ρ) / 2): l'arbre couvrant minimal est construit par l'algorithme de Prim
+        (une ligne de distances par actif ajouté, O(n²) opérations), puis fusionné en
+        dendrogramme. Les actifs sont réordonnés selon ses feuilles, et le budget est
+        partagé par bissection récursive en proportion inverse de la variance de chaque
+        moitié (pondération par l'inverse des variances à l'intérieur d'une moitié).
+
+        Aucune matrice n'est inversée ni décomposée: une covariance singulière (plus
+        d'actifs que d'observations) ne pose pas de problème. Pour un FactorCovariance, les
+        lignes de covariance sont calculées à la demande, en O(n) mémoire.
+
+        Args:
+            covariance: Matrice de covariance (n x n) ou modèle de covariance
+        """
+        if isinstance(covariance, FactorCovariance):
+            self._factor = covariance
+            self._cov = None
+            variances = np.einsum('ij,jk,ik->i', covariance.loadings, covariance.factor_cov,
+                                  covariance.loadings) + covariance.specific_var
+        else:
+            self._factor = None
+            self._cov = covariance.dense() if isinstance(covariance, CovarianceModel) \
+                else np.asarray(covariance, dtype=float)
+            variances = np.diag(self._cov).copy()
+        if np.any(variances <= 0):
+            raise ValueError("Les variances des actifs doivent être strictement positives")
+        self.n_assets = len(variances)
+        self.variances = variances
+        self._std = np.sqrt(variances)
+
+    def _cov_row(self, i: int) -> np.ndarray:
+        if self._factor is None:
+            return self._cov[i]
+        factor = self._factor
+        row = factor.loadings @ (factor.factor_cov @ factor.loadings[i])
+        row[i] += factor.specific_var[i]
+        return row
+
+    def _cluster_variance(self, assets: np.ndarray) -> float:
+        """Variance du portefeuille de poids inversement proportionnels aux variances du groupe."""
+        weights = 1.0 / self.variances[assets]
+        weights /= weights.sum()
+        if self._factor is None:
+            return float(weights @ self._cov[np.ix_(assets, assets)] @ weights)
+        factor = self._factor
+        exposure = (weights @ factor.loadings[assets]) @ factor.factor_cholesky()
+        return float(exposure @ exposure + (weights ** 2) @ factor.specific_var[assets])
+
+    def minimum_spanning_tree(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arbre couvrant minimal du graphe complet des distances de corrélation (Prim).
+
+        Returns:
+            Tuple contenant (origines, destinations, distances) des n - 1 arêtes
+        """
+        n = self.n_assets
+        in_tree = np.zeros(n, dtype=bool)
+        best = np.full(n, np.inf)
+        parent = np.zeros(n, dtype=np.int64)
+        sources = np.empty(n - 1, dtype=np.int64)
+        targets = np.empty(n - 1, dtype=np.int64)
+        lengths = np.empty(n - 1)
+        current = 0
+        for k in range(n):
+            in_tree[current] = True
+            best[current] = np.inf
+            if k == n - 1:
+                break
+            corr = self._cov_row(current) / (self._std[current] * self._std)
+            distance = np.sqrt(np.clip(0.5 * (1.0 - corr), 0.0, None))
+            closer = (distance < best) & ~in_tree
+            best[closer] = distance[closer]
+            parent[closer] = current
+            current = int(np.argmin(best))
+            sources[k], targets[k], lengths[k] = parent[current], current, best[current]
+        return sources, targets, lengths
+
+    def order(self) -> np.ndarray:
+        """
+        Ordre des feuilles du dendrogramme de liaison simple (quasi-diagonalisation).
+
+        Returns:
+            Permutation des indices des actifs
+        """
+        if self.n_assets < 3:
+            return np.arange(self.n_assets)
+        sources, targets, lengths = self.minimum_spanning_tree()
+        # Fusion des arêtes de l'arbre par distance croissante (Kruskal sur l'arbre)
+        root = np.arange(self.n_assets)
+        members: List[List[int]] = [[i] for i in range(self.n_assets)]
+
+        def find(i: int) -> int:
+            while root[i] != i:
+                root[i] = root[root[i]]
+                i = root[i]
+            return i
+
+        for edge in np.argsort(lengths, kind='stable'):
+            a, b = find(sources[edge]), find(targets[edge])
+            # Chaque groupe reste contigu quel que soit le sens de la concaténation: le plus
+            # gros absorbe le plus petit, O(n log n) copies au total
+            if len(members[a]) < len(members[b]):
+                a, b = b, a
+            members[a].extend(members[b])
+            root[b] = a
+            members[b] = []
+        return np.array(members[find(0)], dtype=np.int64)
+
+    def weights(self) -> np.ndarray:
+        """
+        Poids par bissection récursive de l'ordre quasi-diagonal.
+
+        Returns:
+            Poids positifs de somme 1, dans l'ordre d'origine des actifs
+        """
+        order = self.order()
+        weights = np.ones(self.n_assets)
+        clusters = [order]
+        while clusters:
+            halves = []
+            for cluster in clusters:
+                if len(cluster) < 2:
+                    continue
+                middle = len(cluster) // 2
+                left, right = cluster[:middle], cluster[middle:]
+                left_var, right_var = self._cluster_variance(left), self._cluster_variance(right)
+                alpha = 1.0 - left_var / (left_var + right_var)
+                weights[left] *= alpha
+                weights[right] *= 1.0 - alpha
+                halves.extend((left, right))
+            clusters = halves
+        return weights / weights.sum()
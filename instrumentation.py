@@ -0,0 +1,191 @@
+"""
+Instrumentation légère: chronomètres et compteurs sur les méthodes publiques, télémétrie du solveur.
+
+Les classes décorées par `instrument` sont simplement enregistrées ; leurs méthodes ne sont
+remplacées par des versions chronométrées qu'entre `enable()` et `disable()`. Désactivée,
+l'instrumentation n'ajoute donc aucun coût aux appels.
+
+Usage:
+    import instrumentation
+    instrumentation.enable()
+    ...
+    instrumentation.export_chrome_trace('trace.json')   # chrome://tracing ou Perfetto
+    instrumentation.export_json('trace_events.json')
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+_ENABLED = False
+_REGISTRY: List[type] = []
+_ORIGINALS: Dict[Tuple[type, str], Any] = {}
+_EVENTS: List[Dict[str, Any]] = []
+_SOLVES: List[Dict[str, Any]] = []
+_ORIGIN_NS = time.perf_counter_ns()
+
+# Informations de convergence conservées pour chaque résolution cvxopt
+SOLVER_FIELDS = ['status', 'iterations', 'gap', 'relative gap', 'primal objective',
+                 'dual objective', 'primal infeasibility', 'dual infeasibility']
+
+
+def _record(name: str, start_ns: int, end_ns: int, args: Dict[str, Any] = None) -> None:
+    # list.append est atomique: pas de verrou sur le chemin chaud
+    _EVENTS.append({'name': name, 'start_ns': start_ns - _ORIGIN_NS, 'duration_ns': end_ns - start_ns,
+                    'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args or {}})
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, start, time.perf_counter_ns())
+    return wrapper
+
+
+def _patch(cls: type) -> None:
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') and attr != '__init__':
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, (classmethod, staticmethod)):
+            wrapped = type(value)(_timed(name, value.__func__))
+        elif callable(value) and not isinstance(value, type):
+            wrapped = _timed(name, value)
+        else:
+            continue  # propriétés et attributs de classe
+        _ORIGINALS[(cls, attr)] = value
+        setattr(cls, attr, wrapped)
+
+
+def _unpatch(cls: type) -> None:
+    for (owner, attr), value in list(_ORIGINALS.items()):
+        if owner is cls:
+            setattr(cls, attr, value)
+            del _ORIGINALS[(owner, attr)]
+
+
+def instrument(cls: type) -> type:
+    """Décorateur de classe: enregistre la classe pour l'instrumentation de ses méthodes publiques."""
+    _REGISTRY.append(cls)
+    if _ENABLED:
+        _patch(cls)
+    return cls
+
+
+def enable() -> None:
+    """Active l'instrumentation sur toutes les classes enregistrées (et celles importées ensuite)."""
+    global _ENABLED
+    if not _ENABLED:
+        _ENABLED = True
+        for cls in _REGISTRY:
+            _patch(cls)
+
+
+def disable() -> None:
+    """Désactive l'instrumentation et restaure les méthodes d'origine ; les traces sont conservées."""
+    global _ENABLED
+    if _ENABLED:
+        _ENABLED = False
+        for cls in _REGISTRY:
+            _unpatch(cls)
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    """Efface les traces collectées."""
+    _EVENTS.clear()
+    _SOLVES.clear()
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """Chronomètre un bloc de code (sans effet si l'instrumentation est désactivée)."""
+    if not _ENABLED:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter_ns(), args)
+
+
+def record_solver(solution: Dict[str, Any], problem: str = 'qp') -> None:
+    """
+    Enregistre la télémétrie d'une résolution cvxopt (statut, itérations, écarts).
+
+    Args:
+        solution: Dictionnaire renvoyé par cvxopt.solvers.qp
+        problem: Libellé du problème résolu
+    """
+    if not _ENABLED:
+        return
+    telemetry = {'problem': problem, 'ts_ns': time.perf_counter_ns() - _ORIGIN_NS,
+                 'pid': os.getpid(), 'tid': threading.get_ident()}
+    for field in SOLVER_FIELDS:
+        value = solution.get(field)
+        telemetry[field] = value if value is None or isinstance(value, (str, int)) else float(value)
+    _SOLVES.append(telemetry)
+
+
+def summary() -> Dict[str, Dict[str, float]]:
+    """
+    Agrège les traces par méthode.
+
+    Returns:
+        Dictionnaire nom -> (nombre d'appels, temps total, moyen et maximum en secondes),
+        trié par temps total décroissant ; la clé 'solver' résume les résolutions cvxopt
+    """
+    stats: Dict[str, Dict[str, float]] = {}
+    for event in list(_EVENTS):
+        entry = stats.setdefault(event['name'], {'calls': 0, 'total_s': 0.0, 'max_s': 0.0})
+        duration = event['duration_ns'] / 1e9
+        entry['calls'] += 1
+        entry['total_s'] += duration
+        entry['max_s'] = max(entry['max_s'], duration)
+    for entry in stats.values():
+        entry['mean_s'] = entry['total_s'] / entry['calls']
+    result = dict(sorted(stats.items(), key=lambda item: -item[1]['total_s']))
+    if _SOLVES:
+        iterations = [s['iterations'] for s in _SOLVES if s['iterations'] is not None]
+        result['solver'] = {
+            'calls': len(_SOLVES),
+            'not_optimal': sum(s['status'] != 'optimal' for s in _SOLVES),
+            'mean_iterations': sum(iterations) / len(iterations) if iterations else 0.0,
+            'max_iterations': max(iterations) if iterations else 0,
+        }
+    return result
+
+
+def export_json(path: str) -> None:
+    """Exporte les traces brutes, la télémétrie du solveur et le résumé en JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'events': list(_EVENTS), 'solves': list(_SOLVES), 'summary': summary()}, f, indent=2)
+
+
+def export_chrome_trace(path: str) -> None:
+    """
+    Exporte les traces au format Chrome Trace Event (chrome://tracing, Perfetto).
+
+    Chaque appel devient un événement complet ("X"), chaque résolution cvxopt un
+    événement instantané ("i") portant son statut, ses itérations et ses écarts.
+    """
+    trace = [{'name': e['name'], 'cat': e['name'].split('.')[0], 'ph': 'X',
+              'ts': e['start_ns'] / 1000, 'dur': e['duration_ns'] / 1000,
+              'pid': e['pid'], 'tid': e['tid'], 'args': e['args']} for e in list(_EVENTS)]
+    trace += [{'name': f"cvxopt.{s['problem']}", 'cat': 'solver', 'ph': 'i', 's': 't',
+               'ts': s['ts_ns'] / 1000, 'pid': s['pid'], 'tid': s['tid'],
+               'args': {k: v for k, v in s.items() if k not in ('ts_ns', 'pid', 'tid')}}
+              for s in list(_SOLVES)]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
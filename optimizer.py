@@ -1,91 +1,139 @@
 import numpy as np
 import pandas as pd
 from cvxopt import matrix, solvers
-from typing import Tuple, List, Optional
+from typing import Iterator, Tuple, Optional, Union
+from frontier import CriticalLineFrontier
+from hrp import HierarchicalRiskParity
+from covariance import CovarianceModel
+from instrumentation import instrument
+from result_cache import ResultCache
+from constraints import PortfolioConstraints
+from backends import SOLVER_OPTIONS, SolverBackend, get_backend
 
+@instrument
 class PortfolioOptimizer:
-    def __init__(self, mean_returns: pd.Series, cov_matrix: pd.DataFrame):
+    def __init__(self, mean_returns: pd.Series, cov_matrix: Union[pd.DataFrame, CovarianceModel],
+                 cache: Optional[ResultCache] = None,
+                 constraints: Optional[PortfolioConstraints] = None,
+                 backend: Union[str, SolverBackend] = 'cvxopt'):
         """
         Initialise l'optimiseur de portefeuille.
         
         Args:
             mean_returns: Série des rendements moyens
-            cov_matrix: Matrice de covariance des rendements
+            cov_matrix: Matrice de covariance des rendements, ou modèle de covariance
+                (un FactorCovariance n'est jamais densifié pour l'optimisation)
+            cache: Cache de résultats partagé entre optimiseurs construits sur les mêmes données
+            constraints: Contraintes sur les poids (par défaut: poids positifs uniquement)
+            backend: Solveur: 'cvxopt' (référence), 'numpy' (ADMM par lots, bornes par actif),
+                'analytic' (forme fermée, ventes à découvert autorisées, avec
+                PortfolioConstraints.unconstrained) ou une instance
         """
         # Vérification des données
         if mean_returns.isnull().any():
             raise ValueError("Les rendements moyens contiennent des valeurs manquantes")
-        if cov_matrix.isnull().any().any():
-            raise ValueError("La matrice de covariance contient des valeurs manquantes")
+        if isinstance(cov_matrix, CovarianceModel):
+            covariance = cov_matrix
+        else:
+            if cov_matrix.isnull().any().any():
+                raise ValueError("La matrice de covariance contient des valeurs manquantes")
+            covariance = CovarianceModel(cov_matrix)
             
-        # Vérification de la semi-définie positivité de la matrice de covariance
-        eigenvalues = np.linalg.eigvals(cov_matrix)
-        if not np.all(eigenvalues >= -1e-10):  # Tolérance pour les erreurs numériques
+        if constraints is None:
+            constraints = PortfolioConstraints(list(mean_returns.index))
+        elif constraints.n_assets != len(mean_returns):
+            raise ValueError("Les contraintes ne correspondent pas au nombre d'actifs")
+        self.constraints = constraints
+        self.backend = get_backend(backend)
+        self.backend.check(constraints)
+            
+        self.cache = cache
+        self._cache_key = None
+        if cache is not None:
+            # Les solveurs autres que la référence ont leurs propres entrées
+            signature = constraints.signature()
+            if self.backend.name != 'cvxopt':
+                signature += f'|{self.backend.name}'
+            self._cache_key = cache.key(mean_returns, covariance, signature)
+            if cache.get(self._cache_key) is not None:
+                # Données identiques à un univers déjà validé: pas de nouvelle décomposition
+                covariance._psd = True
+            
+        # Vérification de la semi-définie positivité (mise en cache par le modèle)
+        if not covariance.is_psd():
             raise ValueError("La matrice de covariance n'est pas semi-définie positive")
             
         self.mean_returns = mean_returns
-        self.cov_matrix = cov_matrix
+        self.covariance = covariance
         self.n_assets = len(mean_returns)
+        self._frontier = None
+        self._target_range: Optional[Tuple[float, float]] = None
+        if cache is not None:
+            cache.entry(self._cache_key)
+        
+    @property
+    def cov_matrix(self) -> pd.DataFrame:
+        """Matrice de covariance dense."""
+        return self.covariance.to_frame()
+        
+    def _solution(self, weights: np.ndarray) -> Tuple[np.ndarray, float, float]:
+        """
+        Normalise les poids renvoyés par le solveur et calcule rendement et risque.
+        
+        Returns:
+            Tuple contenant (poids optimaux, rendement espéré, risque)
+        """
+        # Vérification des poids
+        if not np.all(np.isfinite(weights)):
+            raise ValueError("Les poids calculés contiennent des valeurs infinies ou NaN")
+            
+        # Normalisation des poids
+        weights = weights / np.sum(weights)
+        
+        portfolio_return = np.sum(weights * self.mean_returns)
+        portfolio_risk = np.sqrt(max(self.covariance.portfolio_variance(weights), 0.0))
+        
+        return weights, portfolio_return, portfolio_risk
         
     def optimize_portfolio(self, target_return: Optional[float] = None, 
-                         risk_free_rate: float = 0.0) -> Tuple[np.ndarray, float, float]:
+                         risk_free_rate: float = 0.0,
+                         initial_weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, float]:
         """
         Optimise le portefeuille selon le critère de Markowitz.
         
         Args:
             target_return: Rendement cible (si None, maximise le ratio de Sharpe)
             risk_free_rate: Taux sans risque
+            initial_weights: Poids de départ du solveur (démarrage à chaud)
             
         Returns:
             Tuple contenant (poids optimaux, rendement espéré, risque)
         """
-        try:
-            # Conversion en matrices pour cvxopt
-            P = matrix(self.cov_matrix.values)
-            q = matrix(0.0, (self.n_assets, 1))
-            
-            # Contraintes
-            G = matrix(0.0, (self.n_assets, self.n_assets))
-            G[::self.n_assets+1] = -1.0
-            h = matrix(0.0, (self.n_assets, 1))
-            
-            A = matrix(1.0, (1, self.n_assets))
-            b = matrix(1.0)
-            
-            if target_return is not None:
-                # Vérification du rendement cible
-                if target_return < self.mean_returns.min() or target_return > self.mean_returns.max():
-                    raise ValueError(f"Le rendement cible doit être entre {self.mean_returns.min():.2%} et {self.mean_returns.max():.2%}")
-                    
-                # Ajout de la contrainte de rendement cible
-                A = matrix(np.vstack((A, self.mean_returns.values)))
-                b = matrix([1.0, target_return])
-            
-            # Configuration des options de résolution
-            solvers.options['show_progress'] = False
-            solvers.options['abstol'] = 1e-8
-            solvers.options['reltol'] = 1e-7
-            solvers.options['feastol'] = 1e-8
-            
-            # Résolution du problème quadratique
-            sol = solvers.qp(P, q, G, h, A, b)
+        if target_return is None:
+            return self.max_sharpe_ratio(risk_free_rate=risk_free_rate, initial_weights=initial_weights)
             
-            if sol['status'] != 'optimal':
-                raise ValueError(f"L'optimisation n'a pas convergé: {sol['status']}")
+        try:
+            # Vérification du rendement cible, atteignable sous les contraintes
+            min_ret, max_ret = self._feasible_returns()
+            slack = 1e-12 * max(1.0, abs(min_ret), abs(max_ret))
+            if target_return < min_ret - slack or target_return > max_ret + slack:
+                raise ValueError(f"Le rendement cible doit être entre {min_ret:.2%} et {max_ret:.2%}")
                 
-            weights = np.array(sol['x']).flatten()
-            
-            # Vérification des poids
-            if not np.all(np.isfinite(weights)):
-                raise ValueError("Les poids calculés contiennent des valeurs infinies ou NaN")
+            if self.cache is not None:
+                # Solution déjà calculée, ou interpolation exacte entre les coins de la frontière
+                query = ('target', float(target_return), 0.0)
+                cached = self.cache.lookup(self._cache_key, query)
+                if cached is not None:
+                    return cached
+                if self.cache.entry(self._cache_key).corners is not None:
+                    weights = self._critical_line().evaluate([target_return])[2][0]
+                    return (weights, float(weights @ self.mean_returns.values),
+                            float(np.sqrt(max(self.covariance.portfolio_variance(weights), 0.0))))
                 
-            # Normalisation des poids
-            weights = weights / np.sum(weights)
-            
-            portfolio_return = np.sum(weights * self.mean_returns)
-            portfolio_risk = np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
-            
-            return weights, portfolio_return, portfolio_risk
+            solution = self._solution(self.backend.solve_target(self, target_return, initial_weights))
+            if self.cache is not None:
+                self.cache.store_solution(self._cache_key, query, solution)
+            return solution
             
         except Exception as e:
             raise ValueError(f"Erreur lors de l'optimisation: {str(e)}")
@@ -93,6 +141,10 @@ class PortfolioOptimizer:
     def efficient_frontier(self, n_points: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Calcule la frontière efficiente.
+
+        Les portefeuilles coins sont calculés une seule fois par la méthode de la ligne
+        critique, puis les points sont obtenus par interpolation. En cas d'échec (matrice
+        de covariance singulière, cas dégénéré), on revient à une résolution QP par point.
         
         Args:
             n_points: Nombre de points sur la frontière
@@ -100,41 +152,200 @@ class PortfolioOptimizer:
         Returns:
             Tuple contenant (rendements, risques, poids)
         """
-        min_ret = self.mean_returns.min()
-        max_ret = self.mean_returns.max()
-        target_returns = np.linspace(min_ret, max_ret, n_points)
+        try:
+            frontier = self._critical_line().frontier(n_points)
+            self._remember_corners()
+            return frontier
+        except (ValueError, np.linalg.LinAlgError):
+            pass
+        if self.cache is not None:
+            cached = self.cache.entry(self._cache_key).frontiers.get(n_points)
+            if cached is not None:
+                return cached
+        frontier = self._efficient_frontier_qp(n_points)
+        if self.cache is not None:
+            self.cache.store_frontier(self._cache_key, n_points, frontier)
+        return frontier
+
+    def _critical_line(self) -> CriticalLineFrontier:
+        """Ligne critique de l'optimiseur, initialisée avec les coins du cache s'ils existent."""
+        if not self.backend.critical_line:
+            raise ValueError("Le solveur ne résout pas le problème de la ligne critique")
+        if not self.constraints.is_box_only:
+            raise ValueError("La ligne critique ne gère que des bornes par actif")
+        lower, upper = self.constraints.bounds()
+        if not (np.all(np.isfinite(lower)) and np.all(np.isfinite(upper))):
+            raise ValueError("La ligne critique nécessite des bornes finies sur les poids")
+        if self._frontier is None:
+            corners = None
+            if self.cache is not None:
+                corners = self.cache.entry(self._cache_key).corners
+            self._frontier = CriticalLineFrontier(self.mean_returns.values, self.covariance.dense(),
+                                                  lower_bounds=lower, upper_bounds=upper, corners=corners)
+        return self._frontier
+
+    def _remember_corners(self) -> None:
+        """Mémorise les coins de la ligne critique dans le cache (une seule fois par univers)."""
+        if self.cache is not None and self.cache.entry(self._cache_key).corners is None:
+            self.cache.store_corners(self._cache_key, self._frontier.corner_returns,
+                                     self._frontier.corner_weights)
+
+    def iter_efficient_frontier(self, n_points: int = 100) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Calcule la frontière efficiente de façon progressive.
         
-        returns = []
-        risks = []
-        weights_list = []
+        Les points sont émis par lots au fur et à mesure du parcours de la ligne critique,
+        en commençant par la branche efficiente. En cas d'échec, les points restants sont
+        résolus un par un par QP.
         
-        for target in target_returns:
+        Args:
+            n_points: Nombre de points sur la frontière
+            
+        Returns:
+            Itérateur sur des lots (rendements, risques, poids)
+        """
+        emitted = [np.empty(0)]
+        try:
+            for batch in self._critical_line().iter_frontier(n_points):
+                emitted.append(batch[0])
+                yield batch
+            self._remember_corners()
+            return
+        except (ValueError, np.linalg.LinAlgError):
+            pass
+            
+        done = np.concatenate(emitted)
+        try:
+            min_ret, max_ret = self._return_range()
+        except ValueError:
+            return
+        for target in np.linspace(min_ret, max_ret, n_points):
+            if np.any(np.isclose(done, target, rtol=1e-12, atol=0.0)):
+                continue
             try:
                 w, ret, risk = self.optimize_portfolio(target_return=target)
-                if np.all(np.isfinite([ret, risk])):
-                    returns.append(ret)
-                    risks.append(risk)
-                    weights_list.append(w)
             except ValueError:
                 continue
-                
-        if not returns:
+            if np.all(np.isfinite([ret, risk])):
+                yield np.array([ret]), np.array([risk]), w[None, :]
+    
+    def _efficient_frontier_qp(self, n_points: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcule la frontière efficiente en résolvant tous les rendements cibles par le solveur.
+        
+        Args:
+            n_points: Nombre de points sur la frontière
+            
+        Returns:
+            Tuple contenant (rendements, risques, poids)
+        """
+        min_ret, max_ret = self._return_range()
+        target_returns = np.linspace(min_ret, max_ret, n_points)
+        
+        weights = self.backend.solve_targets(self, target_returns)
+        weights = weights[np.all(np.isfinite(weights), axis=1)]
+        weights = weights / weights.sum(axis=1, keepdims=True)
+        
+        returns = weights @ self.mean_returns.values
+        risks = np.sqrt(np.maximum(self.covariance.portfolio_variance(weights), 0.0))
+        valid = np.isfinite(returns) & np.isfinite(risks)
+        if not valid.any():
             raise ValueError("Impossible de calculer la frontière efficiente")
                 
-        return np.array(returns), np.array(risks), np.array(weights_list)
+        return returns[valid], risks[valid], weights[valid]
     
-    def max_sharpe_ratio(self, risk_free_rate: float = 0.0) -> Tuple[np.ndarray, float, float]:
+    def _feasible_returns(self) -> Tuple[float, float]:
+        """Rendements extrêmes atteignables, tirés des coins en cache s'ils existent (calculés une fois)."""
+        if self._target_range is None:
+            corners = self.cache.entry(self._cache_key).corners if self.cache is not None else None
+            if self.constraints.is_unconstrained:
+                self._target_range = (-np.inf, np.inf)
+            elif corners is not None:
+                self._target_range = (float(corners[0][0]), float(corners[0][-1]))
+            else:
+                self._target_range = tuple(float(r) for r in self._return_range())
+        return self._target_range
+
+    def _return_range(self) -> Tuple[float, float]:
+        """
+        Rendements minimum et maximum atteignables sous les contraintes.
+        
+        Sans autre contrainte que w >= 0, ce sont les rendements extrêmes des actifs ;
+        sinon, ils sont obtenus par deux programmes linéaires sur les mêmes contraintes creuses.
+        Sans aucune borne, tout rendement est atteignable: la frontière est alors tracée
+        entre les rendements extrêmes des actifs.
+        """
+        mu = self.mean_returns.values
+        if self.constraints.is_long_only or self.constraints.is_unconstrained:
+            return mu.min(), mu.max()
+        n = self.n_assets
+        n_vars = n + self.constraints.n_auxiliary
+        G, h = self.constraints.build(n_vars, n)
+        A = matrix(np.concatenate((np.ones(n), np.zeros(n_vars - n)))[None, :])
+        extremes = []
+        for sign in (1.0, -1.0):
+            c = matrix(np.concatenate((sign * mu, np.zeros(n_vars - n))))
+            sol = solvers.lp(c, G, matrix(h), A, matrix([1.0]), options=SOLVER_OPTIONS)
+            if sol['status'] != 'optimal':
+                raise ValueError("Les contraintes n'admettent aucun portefeuille")
+            extremes.append(sign * sol['primal objective'])
+        return extremes[0], extremes[1]
+    
+    def max_sharpe_ratio(self, risk_free_rate: float = 0.0,
+                         initial_weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, float]:
         """
         Trouve le portefeuille avec le ratio de Sharpe maximum.
         
         Args:
             risk_free_rate: Taux sans risque
+            initial_weights: Poids de départ du solveur (démarrage à chaud)
             
         Returns:
             Tuple contenant (poids optimaux, rendement espéré, risque)
         """
         try:
-            weights, ret, risk = self.optimize_portfolio(risk_free_rate=risk_free_rate)
-            return weights, ret, risk
+            if self.cache is not None:
+                query = ('sharpe', None, float(risk_free_rate))
+                cached = self.cache.lookup(self._cache_key, query)
+                if cached is not None:
+                    return cached
+                
+            excess_returns = self.mean_returns.values - risk_free_rate
+            if not np.any(excess_returns > 0):
+                raise ValueError("Aucun actif n'a un rendement supérieur au taux sans risque")
+                
+            solution = self._solution(self.backend.max_sharpe(self, risk_free_rate, initial_weights))
+            if self.cache is not None:
+                self.cache.store_solution(self._cache_key, query, solution)
+            return solution
+        except Exception as e:
+            raise ValueError(f"Erreur lors du calcul du ratio de Sharpe maximum: {str(e)}")
+
+    def hierarchical_risk_parity(self) -> Tuple[np.ndarray, float, float]:
+        """
+        Allocation par parité de risque hiérarchique, sans programme quadratique.
+        
+        Regroupement des actifs par corrélation puis bissection récursive (voir
+        HierarchicalRiskParity): O(n²) opérations et mémoire, aucune inversion de matrice.
+        Reste stable quand la covariance est quasi singulière (plus d'actifs que
+        d'observations), là où le QP devient coûteux et fragile. Les rendements moyens
+        ne sont pas utilisés.
+        
+        Returns:
+            Tuple contenant (poids, rendement espéré, risque)
+        """
+        try:
+            if not self.constraints.is_long_only:
+                raise ValueError("La parité de risque hiérarchique ne gère que des poids positifs sans autre contrainte")
+            if self.cache is not None:
+                query = ('hrp', None, 0.0)
+                cached = self.cache.lookup(self._cache_key, query)
+                if cached is not None:
+                    return cached
+                
+            solution = self._solution(HierarchicalRiskParity(self.covariance).weights())
+            if self.cache is not None:
+                self.cache.store_solution(self._cache_key, query, solution)
+            return solution
         except Exception as e:
-            raise ValueError(f"Erreur lors du calcul du ratio de Sharpe maximum: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Erreur lors de l'allocation par parité de risque hiérarchique: {str(e)}") 
\ No newline at end of file
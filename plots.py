@@ -1,16 +1,125 @@
+import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from typing import List, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from typing import Any, Dict, List, Optional, Tuple, Union
+from instrumentation import instrument
 
+# Visualiseur propre à chaque processus d'export (ses figures sont réutilisées)
+_WORKER_VISUALIZER = None
+
+# Titres par défaut des figures du rapport, remplaçables via export_report(titles=...)
+REPORT_TITLES = {
+    'frontier': "Frontière Efficiente",
+    'weights': "Répartition du Portefeuille",
+    'correlation': "Matrice de Corrélation",
+    'distributions': "Distribution des Rendements",
+    'risk_contributions': "Contributions au Risque",
+    'frontier_risk': "Risque de Perte le long de la Frontière",
+}
+
+
+def cluster_order(corr_matrix: np.ndarray, max_iterations: int = 100, tol: float = 1e-6) -> np.ndarray:
+    """
+    Ordonne les actifs pour regrouper les blocs corrélés.
+
+    Les actifs sont triés selon leur angle dans le plan des deux premiers vecteurs
+    propres de la matrice de corrélation (ordre angulaire). Ces vecteurs sont obtenus
+    par itération orthogonale (produits matrice-vecteurs, O(n²) par itération) plutôt
+    que par une décomposition propre complète en O(n³).
+
+    Args:
+        corr_matrix: Matrice de corrélation (n x n)
+        max_iterations: Nombre maximum d'itérations
+        tol: Tolérance sur l'écart entre deux sous-espaces successifs
+
+    Returns:
+        Permutation des indices des actifs
+    """
+    corr_matrix = np.nan_to_num(np.asarray(corr_matrix, dtype=float))
+    n = len(corr_matrix)
+    if n < 3:
+        return np.arange(n)
+    basis, _ = np.linalg.qr(np.column_stack((np.ones(n), np.linspace(-1.0, 1.0, n))))
+    for _ in range(max_iterations):
+        next_basis, _ = np.linalg.qr(corr_matrix @ basis)
+        # Écart entre sous-espaces: composante de la nouvelle base hors de l'ancienne
+        converged = np.abs(next_basis - basis @ (basis.T @ next_basis)).max() < tol
+        basis = next_basis
+        if converged:
+            break
+    # Vecteurs propres dans le sous-espace obtenu (Rayleigh-Ritz, 2 x 2)
+    _, rotation = np.linalg.eigh(basis.T @ corr_matrix @ basis)
+    vectors = basis @ rotation
+    return np.argsort(np.arctan2(vectors[:, -2], vectors[:, -1]), kind='stable')
+
+
+def decimate_matrix(matrix: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Réduit une matrice carrée à au plus `size` x `size` cellules par moyenne de blocs.
+
+    Args:
+        matrix: Matrice carrée (n x n)
+        size: Nombre maximum de lignes et de colonnes
+
+    Returns:
+        Tuple contenant (matrice réduite, indice du premier actif de chaque bloc)
+    """
+    n = len(matrix)
+    if n <= size:
+        return np.asarray(matrix, dtype=float), np.arange(n)
+    starts = np.linspace(0, n, size + 1).astype(int)[:-1]
+    rows = np.add.reduceat(np.asarray(matrix, dtype=float), starts, axis=0)
+    sums = np.add.reduceat(rows, starts, axis=1)
+    counts = np.diff(np.append(starts, n))
+    return sums / np.outer(counts, counts), starts
+
+
+def top_weights(weights: np.ndarray, labels: List[str], k: int) -> Tuple[np.ndarray, List[str]]:
+    """
+    Conserve les `k` plus grands poids et regroupe les autres en une seule part.
+
+    Args:
+        weights: Poids du portefeuille
+        labels: Libellés des actifs
+        k: Nombre de poids conservés
+
+    Returns:
+        Tuple contenant (poids, libellés), par poids décroissant
+    """
+    weights = np.asarray(weights, dtype=float)
+    order = np.argsort(-weights, kind='stable')
+    kept = order[:k]
+    values, names = list(weights[kept]), [labels[i] for i in kept]
+    if len(order) > k:
+        values.append(weights[order[k:]].sum())
+        names.append(f"Autres ({len(order) - k})")
+    return np.array(values), names
+
+
+@instrument
 class PortfolioVisualizer:
-    def __init__(self):
-        """Initialise le visualiseur de portefeuille."""
+    def __init__(self, block: bool = True):
+        """
+        Initialise le visualiseur de portefeuille.
+        
+        Args:
+            block: Si False, les fenêtres s'ouvrent sans bloquer l'appelant
+                   (utile depuis une boucle d'événements Tk déjà active)
+        """
         plt.style.use('default')
+        self.block = block
+        # Figures hors écran (Agg) réutilisées d'un export à l'autre
+        self._figures: Dict[str, Figure] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
         
     def plot_efficient_frontier(self, returns: np.ndarray, risks: np.ndarray, 
                               optimal_point: Tuple[float, float] = None,
-                              title: str = "Frontière Efficiente") -> None:
+                              title: str = "Frontière Efficiente",
+                              random_portfolios: Tuple[np.ndarray, np.ndarray] = None) -> None:
         """
         Trace la frontière efficiente.
         
@@ -19,8 +128,14 @@ class PortfolioVisualizer:
             risks: Tableau des risques
             optimal_point: Point optimal (rendement, risque)
             title: Titre du graphique
+            random_portfolios: Nuage de portefeuilles aléatoires (rendements, risques),
+                               par exemple issu de RandomPortfolioSimulator.simulate
         """
         plt.figure(figsize=(10, 6))
+        if random_portfolios is not None:
+            # Nuage rastérisé: le coût d'affichage ne dépend pas du nombre de points
+            plt.scatter(random_portfolios[1], random_portfolios[0], s=1, c='grey', alpha=0.3,
+                        rasterized=True, label='Portefeuilles aléatoires')
         plt.plot(risks, returns, 'b-', label='Frontière Efficiente')
         
         if optimal_point is not None:
@@ -32,9 +147,10 @@ class PortfolioVisualizer:
         plt.title(title)
         plt.legend()
         plt.grid(True)
-        plt.show()
+        plt.show(block=self.block)
         
-    def plot_weights(self, weights: np.ndarray, asset_names: list, title: str = "Répartition du Portefeuille", name_map: dict = None) -> None:
+    def plot_weights(self, weights: np.ndarray, asset_names: list, title: str = "Répartition du Portefeuille", name_map: dict = None,
+                     max_assets: int = 30) -> None:
         """
         Trace la répartition des poids du portefeuille.
         Args:
@@ -42,23 +158,16 @@ class PortfolioVisualizer:
             asset_names: Liste des noms d'actifs (tickers)
             title: Titre du graphique
             name_map: Dictionnaire ticker -> nom complet
+            max_assets: Nombre maximum d'actifs affichés individuellement (les autres
+                        sont regroupés en une seule part)
         """
         if name_map:
             labels = [f"{t} ({name_map.get(t, t)})" for t in asset_names]
         else:
-            labels = asset_names
-        plt.figure(figsize=(10, 6))
-        plt.pie(weights, labels=labels, autopct='%1.1f%%')
-        plt.title(title)
-        plt.axis('equal')
-        plt.show()
-        plt.figure(figsize=(12, 6))
-        plt.bar(labels, weights)
-        plt.xticks(rotation=45)
-        plt.title(title)
-        plt.ylabel('Poids')
-        plt.tight_layout()
-        plt.show()
+            labels = list(asset_names)
+        figure = plt.figure(figsize=(14, 6))
+        self._draw_weights(figure, weights, labels, max_assets, title)
+        plt.show(block=self.block)
         
     def plot_returns_distribution(self, returns: pd.DataFrame,
                                 title: str = "Distribution des Rendements") -> None:
@@ -73,22 +182,301 @@ class PortfolioVisualizer:
         returns.hist(bins=50, figsize=(12, 6))
         plt.title(title)
         plt.tight_layout()
-        plt.show()
+        plt.show(block=self.block)
         
     def plot_correlation_matrix(self, corr_matrix: pd.DataFrame,
-                              title: str = "Matrice de Corrélation") -> None:
+                              title: str = "Matrice de Corrélation", max_assets: int = 60) -> None:
         """
         Trace la matrice de corrélation.
         
         Args:
             corr_matrix: DataFrame de la matrice de corrélation
             title: Titre du graphique
+            max_assets: Taille maximale affichée ; au-delà, les actifs sont regroupés par
+                        blocs corrélés (voir export_report)
         """
-        plt.figure(figsize=(10, 8))
-        plt.imshow(corr_matrix, cmap='RdYlBu')
-        plt.colorbar()
-        plt.xticks(range(len(corr_matrix.columns)), corr_matrix.columns, rotation=45)
-        plt.yticks(range(len(corr_matrix.index)), corr_matrix.index)
-        plt.title(title)
-        plt.tight_layout()
-        plt.show() 
\ No newline at end of file
+        figure = plt.figure(figsize=(10, 8))
+        self._draw_correlation(figure, corr_matrix, max_assets, title)
+        plt.show(block=self.block)
+
+    def plot_risk_contributions(self, contributions: np.ndarray, asset_names: list,
+                                title: str = "Contributions au Risque", name_map: dict = None,
+                                max_assets: int = 30) -> None:
+        """
+        Trace la part de chaque actif dans la volatilité du portefeuille.
+        
+        Args:
+            contributions: Contributions au risque (RiskAnalyzer.risk_contributions)
+            asset_names: Liste des noms d'actifs (tickers)
+            title: Titre du graphique
+            name_map: Dictionnaire ticker -> nom complet
+            max_assets: Nombre maximum d'actifs affichés individuellement
+        """
+        if name_map:
+            labels = [f"{t} ({name_map.get(t, t)})" for t in asset_names]
+        else:
+            labels = list(asset_names)
+        figure = plt.figure(figsize=(12, 6))
+        self._draw_risk_contributions(figure, contributions, labels, max_assets, title)
+        plt.show(block=self.block)
+
+    def plot_frontier_risk(self, risk_summary: pd.DataFrame,
+                           title: str = "Risque de Perte le long de la Frontière") -> None:
+        """
+        Trace VaR, CVaR et perte maximale des portefeuilles de la frontière.
+        
+        Args:
+            risk_summary: Mesures de risque par portefeuille (RiskAnalyzer.summary)
+            title: Titre du graphique
+        """
+        figure = plt.figure(figsize=(12, 5))
+        self._draw_frontier_risk(figure, risk_summary, title)
+        plt.show(block=self.block)
+
+    def _figure(self, key: str, figsize: Tuple[float, float]) -> Figure:
+        """Figure Agg hors écran, créée une fois puis vidée à chaque réutilisation."""
+        figure = self._figures.get(key)
+        if figure is None:
+            figure = Figure(figsize=figsize)
+            FigureCanvasAgg(figure)
+            self._figures[key] = figure
+        else:
+            figure.clear()
+            figure.set_size_inches(figsize)
+        return figure
+
+    def _draw_frontier(self, figure: Figure, returns: np.ndarray, risks: np.ndarray,
+                       optimal_point: Optional[Tuple[float, float]],
+                       random_portfolios: Optional[Tuple[np.ndarray, np.ndarray]],
+                       title: str = "Frontière Efficiente") -> None:
+        ax = figure.add_subplot(111)
+        if random_portfolios is not None:
+            ax.scatter(random_portfolios[1], random_portfolios[0], s=1, c='grey', alpha=0.3,
+                       rasterized=True, label='Portefeuilles aléatoires')
+        ax.plot(risks, returns, 'b-', label='Frontière Efficiente')
+        if optimal_point is not None:
+            ax.plot(optimal_point[1], optimal_point[0], 'ro', label='Portefeuille Optimal')
+        ax.set_xlabel('Risque (Écart-type)')
+        ax.set_ylabel('Rendement Espéré')
+        ax.set_title(title)
+        ax.legend()
+        ax.grid(True)
+
+    def _draw_weights(self, figure: Figure, weights: np.ndarray, labels: List[str], max_assets: int,
+                      title: str = "Répartition du Portefeuille") -> None:
+        values, names = top_weights(weights, labels, max_assets)
+        pie_values, pie_names = top_weights(weights, labels, min(max_assets, 10))
+        pie_ax, bar_ax = figure.subplots(1, 2, gridspec_kw={'width_ratios': [1, 2]})
+        pie_ax.pie(pie_values, labels=pie_names, autopct='%1.1f%%')
+        pie_ax.axis('equal')
+        bar_ax.bar(np.arange(len(values)), values)
+        bar_ax.set_xticks(np.arange(len(values)))
+        bar_ax.set_xticklabels(names, rotation=90, fontsize=7)
+        bar_ax.set_ylabel('Poids')
+        figure.suptitle(title)
+        figure.tight_layout()
+
+    def _draw_correlation(self, figure: Figure, corr_matrix: pd.DataFrame, max_assets: int,
+                          title: str = "Matrice de Corrélation") -> None:
+        order = cluster_order(corr_matrix.to_numpy())
+        matrix = corr_matrix.to_numpy()[np.ix_(order, order)]
+        reduced, starts = decimate_matrix(matrix, max_assets)
+        labels = [str(corr_matrix.columns[order[i]]) for i in starts]
+        ax = figure.add_subplot(111)
+        image = ax.imshow(reduced, cmap='RdYlBu', vmin=-1, vmax=1, interpolation='nearest')
+        figure.colorbar(image, ax=ax)
+        # Au plus une trentaine d'étiquettes, quelle que soit la taille de l'univers
+        step = max(1, len(labels) // 30)
+        ticks = np.arange(0, len(labels), step)
+        ax.set_xticks(ticks)
+        ax.set_xticklabels([labels[i] for i in ticks], rotation=90, fontsize=6)
+        ax.set_yticks(ticks)
+        ax.set_yticklabels([labels[i] for i in ticks], fontsize=6)
+        if len(reduced) < len(matrix):
+            title += f" ({len(matrix)} actifs regroupés en {len(reduced)} blocs)"
+        ax.set_title(title)
+        figure.tight_layout()
+
+    def _draw_distributions(self, figure: Figure, returns: pd.DataFrame, max_assets: int,
+                            weights: Optional[np.ndarray], title: str = "Distribution des Rendements") -> None:
+        # Actifs les plus pondérés (ou les premiers) en histogrammes superposés
+        if weights is not None:
+            columns = np.argsort(-np.asarray(weights, dtype=float), kind='stable')[:max_assets]
+        else:
+            columns = np.arange(min(max_assets, returns.shape[1]))
+        values = returns.to_numpy()[:, columns]
+        edges = np.histogram_bin_edges(values[np.isfinite(values)], bins=50)
+        ax = figure.add_subplot(111)
+        for j, column in enumerate(columns):
+            counts, _ = np.histogram(values[:, j], bins=edges)
+            ax.stairs(counts, edges, alpha=0.6, label=str(returns.columns[column]))
+        if len(columns) <= 10:
+            ax.legend(fontsize=7)
+        if len(columns) < returns.shape[1]:
+            title += f" ({len(columns)} actifs sur {returns.shape[1]})"
+        ax.set_title(title)
+        figure.tight_layout()
+
+    def _draw_risk_contributions(self, figure: Figure, contributions: np.ndarray, labels: List[str],
+                                 max_assets: int, title: str = "Contributions au Risque") -> None:
+        contributions = np.asarray(contributions, dtype=float)
+        total = contributions.sum()
+        shares = contributions / total if total > 0 else contributions
+        values, names = top_weights(shares, labels, max_assets)
+        ax = figure.add_subplot(111)
+        ax.bar(np.arange(len(values)), values, color=np.where(values < 0, 'tab:green', 'tab:red'))
+        ax.set_xticks(np.arange(len(values)))
+        ax.set_xticklabels(names, rotation=90, fontsize=7)
+        ax.set_ylabel('Part de la volatilité')
+        ax.set_title(title)
+        ax.grid(True, axis='y')
+        figure.tight_layout()
+
+    def _draw_frontier_risk(self, figure: Figure, risk_summary: pd.DataFrame,
+                            title: str = "Risque de Perte le long de la Frontière") -> None:
+        # Abscisse: rendement espéré, monotone le long des deux branches de la frontière
+        summary = risk_summary.sort_values('mean')
+        loss_ax, drawdown_ax = figure.subplots(1, 2)
+        for column, style, label in (('var', 'b-', 'VaR historique'), ('cvar', 'r-', 'CVaR historique'),
+                                     ('var_parametric', 'b--', 'VaR gaussienne'),
+                                     ('cvar_parametric', 'r--', 'CVaR gaussienne')):
+            loss_ax.plot(summary['mean'], summary[column], style, label=label)
+        loss_ax.set_xlabel('Rendement Espéré')
+        loss_ax.set_ylabel('Perte sur une période')
+        loss_ax.legend(fontsize=7)
+        loss_ax.grid(True)
+        drawdown_ax.plot(summary['mean'], summary['max_drawdown'], 'k-')
+        drawdown_ax.set_xlabel('Rendement Espéré')
+        drawdown_ax.set_ylabel('Perte maximale')
+        drawdown_ax.grid(True)
+        figure.suptitle(title)
+        figure.tight_layout()
+
+    def export_report(self, directory: str, frontier: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                      optimal_point: Optional[Tuple[float, float]] = None,
+                      weights: Optional[np.ndarray] = None, asset_names: Optional[List[str]] = None,
+                      corr_matrix: Optional[pd.DataFrame] = None, returns: Optional[pd.DataFrame] = None,
+                      random_portfolios: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                      risk_summary: Optional[pd.DataFrame] = None,
+                      risk_contributions: Optional[np.ndarray] = None,
+                      fmt: str = "png", max_assets: int = 60, dpi: int = 100,
+                      titles: Optional[Dict[str, str]] = None,
+                      background: bool = False) -> Union[List[str], Future]:
+        """
+        Génère le rapport complet hors écran (backend Agg), sans ouvrir de fenêtre.
+
+        Les figures sont réutilisées d'un appel à l'autre. Au-delà de `max_assets` actifs,
+        la matrice de corrélation est réordonnée par blocs corrélés puis réduite par moyenne,
+        et les graphiques de poids et de distributions ne gardent que les plus grands poids:
+        le temps de rendu ne croît plus avec la taille de l'univers.
+
+        Args:
+            directory: Répertoire de sortie
+            frontier: Frontière efficiente (rendements, risques)
+            optimal_point: Point optimal (rendement, risque)
+            weights: Poids du portefeuille
+            asset_names: Noms des actifs correspondant aux poids
+            corr_matrix: Matrice de corrélation
+            returns: DataFrame des rendements par actif
+            random_portfolios: Nuage de portefeuilles aléatoires (rendements, risques)
+            risk_summary: Mesures de risque des portefeuilles de la frontière (RiskAnalyzer.summary)
+            risk_contributions: Contributions au risque de chaque actif (mêmes actifs que `weights`)
+            fmt: "png" ou "svg"
+            max_assets: Nombre maximum d'actifs affichés individuellement
+            dpi: Résolution des images matricielles
+            titles: Titres des figures par nom de fichier (ex: {'frontier': "..."}), les
+                    titres de REPORT_TITLES étant utilisés pour les figures absentes
+            background: Si True, le rendu a lieu dans un processus séparé et un Future
+                        renvoyant la liste des fichiers est retourné immédiatement
+
+        Returns:
+            Liste des fichiers écrits (ou Future si `background`)
+        """
+        if fmt not in ("png", "svg"):
+            raise ValueError(f"Format d'export non supporté: {fmt}")
+        unknown = sorted(set(titles or {}) - set(REPORT_TITLES))
+        if unknown:
+            raise ValueError(f"Figures inconnues pour les titres: {', '.join(unknown)}")
+        report = {
+            'directory': directory, 'frontier': frontier, 'optimal_point': optimal_point,
+            'weights': None if weights is None else np.asarray(weights, dtype=float),
+            'asset_names': None if asset_names is None else list(asset_names),
+            'corr_matrix': corr_matrix, 'returns': returns, 'random_portfolios': random_portfolios,
+            'risk_summary': risk_summary,
+            'risk_contributions': None if risk_contributions is None else np.asarray(risk_contributions, dtype=float),
+            'fmt': fmt, 'max_assets': max_assets, 'dpi': dpi,
+            'titles': {**REPORT_TITLES, **(titles or {})},
+        }
+        if background:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            return self._executor.submit(_export_in_worker, report)
+        return self._render_report(**report)
+
+    def _render_report(self, directory: str, frontier, optimal_point, weights, asset_names,
+                       corr_matrix, returns, random_portfolios, risk_summary, risk_contributions,
+                       fmt: str, max_assets: int, dpi: int, titles: Dict[str, str]) -> List[str]:
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+
+        def save(key: str, figure: Figure) -> None:
+            path = os.path.join(directory, f"{key}.{fmt}")
+            figure.savefig(path, format=fmt, dpi=dpi)
+            paths.append(path)
+
+        if frontier is not None:
+            figure = self._figure('frontier', (10, 6))
+            self._draw_frontier(figure, frontier[0], frontier[1], optimal_point, random_portfolios,
+                                titles['frontier'])
+            save('frontier', figure)
+        if weights is not None:
+            labels = asset_names if asset_names is not None else [str(i) for i in range(len(weights))]
+            figure = self._figure('weights', (14, 6))
+            self._draw_weights(figure, weights, labels, max_assets, titles['weights'])
+            save('weights', figure)
+        if corr_matrix is not None:
+            figure = self._figure('correlation', (10, 8))
+            self._draw_correlation(figure, corr_matrix, max_assets, titles['correlation'])
+            save('correlation', figure)
+        if returns is not None:
+            figure = self._figure('distributions', (12, 6))
+            self._draw_distributions(figure, returns, min(max_assets, 20), weights, titles['distributions'])
+            save('distributions', figure)
+        if risk_contributions is not None:
+            labels = asset_names if asset_names is not None else [str(i) for i in range(len(risk_contributions))]
+            figure = self._figure('risk_contributions', (14, 6))
+            self._draw_risk_contributions(figure, risk_contributions, labels, max_assets,
+                                          titles['risk_contributions'])
+            save('risk_contributions', figure)
+        if risk_summary is not None:
+            figure = self._figure('frontier_risk', (12, 5))
+            self._draw_frontier_risk(figure, risk_summary, titles['frontier_risk'])
+            save('frontier_risk', figure)
+        return paths
+
+    def close(self) -> None:
+        """Libère les figures hors écran et le processus d'export éventuel."""
+        for figure in self._figures.values():
+            figure.clear()
+        self._figures.clear()
+        if self._executor is not None:
+            # Les exports en attente se terminent avant la libération des figures du processus
+            self._executor.submit(_close_worker).result()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _export_in_worker(report: Dict[str, Any]) -> List[str]:
+    """Rendu d'un rapport dans un processus d'export."""
+    global _WORKER_VISUALIZER
+    if _WORKER_VISUALIZER is None:
+        _WORKER_VISUALIZER = PortfolioVisualizer()
+    return _WORKER_VISUALIZER._render_report(**report)
+
+
+def _close_worker() -> None:
+    """Libère les figures du processus d'export."""
+    global _WORKER_VISUALIZER
+    if _WORKER_VISUALIZER is not None:
+        _WORKER_VISUALIZER.close()
+        _WORKER_VISUALIZER = None
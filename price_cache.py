@@ -0,0 +1,327 @@
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+from urllib.parse import quote
+from typing import Callable, Dict, List, Optional, Tuple
+
+_DURATION_PATTERN = re.compile(r'^(\d+)(m|h|d|wk|mo|y)$')
+_NS_PER_DAY = 86_400 * 10 ** 9
+
+# Séances par an et durée d'une séance (NYSE), pour l'annualisation
+TRADING_DAYS = 252
+SESSION_MINUTES = 390
+
+# Signature d'une source de prix: (tickers, début, fin exclue ou None, intervalle) -> DataFrame des clôtures
+FetchFunction = Callable[[List[str], pd.Timestamp, Optional[pd.Timestamp], str], pd.DataFrame]
+
+
+def period_start(period: str, now: pd.Timestamp) -> pd.Timestamp:
+    """
+    Convertit une période yfinance en date de début.
+
+    Args:
+        period: Période (ex: "1mo", "6mo", "1y", "5y", "ytd", "max")
+        now: Date de référence
+
+    Returns:
+        Date de début de la période
+    """
+    if period == 'max':
+        return pd.Timestamp('1900-01-01')
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    match = _DURATION_PATTERN.match(period)
+    if match is None:
+        raise ValueError(f"Période non reconnue: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        'm': pd.DateOffset(minutes=count), 'h': pd.DateOffset(hours=count),
+        'd': pd.DateOffset(days=count), 'wk': pd.DateOffset(weeks=count),
+        'mo': pd.DateOffset(months=count), 'y': pd.DateOffset(years=count),
+    }
+    return (now - offsets[unit]).normalize()
+
+
+def bar_duration(interval: str) -> pd.Timedelta:
+    """
+    Durée approximative d'une barre pour un intervalle yfinance.
+
+    Args:
+        interval: Intervalle (ex: "1m", "1h", "1d", "1wk", "1mo")
+
+    Returns:
+        Durée d'une barre
+    """
+    match = _DURATION_PATTERN.match(interval)
+    if match is None:
+        raise ValueError(f"Intervalle non reconnu: {interval}")
+    count, unit = int(match.group(1)), match.group(2)
+    days = {'m': 1 / 1440, 'h': 1 / 24, 'd': 1, 'wk': 7, 'mo': 30, 'y': 365}[unit]
+    return pd.Timedelta(days=count * days)
+
+
+def bar_start(dates: np.ndarray, interval: str) -> np.ndarray:
+    """
+    Début de la barre `interval` contenant chaque date, pour rééchantillonner.
+
+    Les barres infra-journalières et journalières sont alignées sur minuit UTC, les
+    semaines commencent le lundi, les mois et années le premier jour.
+
+    Args:
+        dates: Dates en nanosecondes (int64, UTC sans fuseau)
+        interval: Intervalle cible (ex: "5m", "1h", "1d", "1wk", "1mo")
+
+    Returns:
+        Débuts des barres, en nanosecondes (croissants si les dates le sont)
+    """
+    match = _DURATION_PATTERN.match(interval)
+    if match is None:
+        raise ValueError(f"Intervalle non reconnu: {interval}")
+    count, unit = int(match.group(1)), match.group(2)
+    dates = np.asarray(dates).view(np.int64)
+    if unit in ('m', 'h', 'd'):
+        step = count * {'m': 60 * 10 ** 9, 'h': 3600 * 10 ** 9, 'd': _NS_PER_DAY}[unit]
+        return dates // step * step
+    if unit == 'wk':
+        # Le 1er janvier 1970 est un jeudi: semaines comptées à partir du lundi 29 décembre 1969
+        weeks = (dates // _NS_PER_DAY + 3) // (7 * count) * count
+        return (weeks * 7 - 3) * _NS_PER_DAY
+    calendar = 'datetime64[M]' if unit == 'mo' else 'datetime64[Y]'
+    periods = dates.view('datetime64[ns]').astype(calendar).view(np.int64) // count * count
+    return periods.view(calendar).astype('datetime64[ns]').view(np.int64)
+
+
+def bars_per_year(interval: str, dates: Optional[np.ndarray] = None) -> float:
+    """
+    Nombre de barres par an, pour annualiser rendements et volatilités.
+
+    Au-delà de la journée, la convention boursière est utilisée (252 séances, 52
+    semaines, 12 mois). En infra-journalier, le nombre de barres par séance est mesuré
+    sur les dates fournies (heures d'ouverture réelles, barre partielle de fin de
+    séance, cotation étendue) ; sans dates, une séance de 6 h 30 est supposée.
+
+    Args:
+        interval: Intervalle (ex: "1m", "5m", "1h", "1d", "1wk", "1mo")
+        dates: Dates des barres (DatetimeIndex, ou entiers en ns triés)
+
+    Returns:
+        Nombre de barres par an
+    """
+    match = _DURATION_PATTERN.match(interval)
+    if match is None:
+        raise ValueError(f"Intervalle non reconnu: {interval}")
+    count, unit = int(match.group(1)), match.group(2)
+    if unit not in ('m', 'h'):
+        return {'d': TRADING_DAYS, 'wk': 52, 'mo': 12, 'y': 1}[unit] / count
+    if dates is not None and len(dates) > 1:
+        if isinstance(dates, np.ndarray):
+            nanoseconds = dates.view(np.int64)
+        else:
+            # Heure locale de la place de cotation: une séance ne chevauche pas minuit
+            index = pd.DatetimeIndex(dates)
+            index = index.tz_localize(None) if index.tz is not None else index
+            nanoseconds = index.values.astype('datetime64[ns]').view(np.int64)
+        sessions = np.count_nonzero(np.diff(nanoseconds // _NS_PER_DAY)) + 1
+        return len(nanoseconds) / sessions * TRADING_DAYS
+    minutes = count * (60 if unit == 'h' else 1)
+    return float(np.ceil(SESSION_MINUTES / minutes) * TRADING_DAYS)
+
+
+def _to_naive_utc(index: pd.Index) -> pd.DatetimeIndex:
+    """Ramène un index de dates en UTC sans fuseau horaire."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index
+
+
+class PriceCache:
+    def __init__(self, cache_dir: str, max_age: Optional[pd.Timedelta] = None):
+        """
+        Cache disque des prix de clôture, un fichier par ticker et par intervalle.
+
+        Chaque série est stockée dans deux fichiers binaires bruts (dates int64 en ns et
+        clôtures float64) auxquels on ajoute les nouvelles barres en fin de fichier ;
+        la lecture se fait par projection mémoire (np.memmap), sans copie. Un fichier n'est
+        jamais modifié sur place: toute correction de barres déjà stockées passe par une
+        réécriture (nouveau fichier), si bien que les séries déjà lues restent inchangées.
+
+        Args:
+            cache_dir: Répertoire du cache
+            max_age: Délai au-delà duquel une série est rafraîchie (une barre par défaut)
+        """
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _interval_dir(self, interval: str) -> str:
+        path = os.path.join(self.cache_dir, interval)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _paths(self, ticker: str, interval: str) -> Tuple[str, str]:
+        base = os.path.join(self._interval_dir(interval), quote(ticker, safe=''))
+        return base + '.dates', base + '.close'
+
+    def _load_index(self, interval: str) -> Dict[str, dict]:
+        path = os.path.join(self._interval_dir(interval), 'index.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, interval: str, index: Dict[str, dict]) -> None:
+        path = os.path.join(self._interval_dir(interval), 'index.json')
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp, path)
+
+    def _arrays(self, ticker: str, interval: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Projette en mémoire les dates et clôtures stockées (tableaux vides si absents)."""
+        dates_path, close_path = self._paths(ticker, interval)
+        if not os.path.exists(dates_path) or os.path.getsize(dates_path) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        dates = np.memmap(dates_path, dtype=np.int64, mode='r')
+        closes = np.memmap(close_path, dtype=np.float64, mode='r')
+        n = min(len(dates), len(closes))
+        return dates[:n], closes[:n]
+
+    @staticmethod
+    def _rewrite(path: str, values: np.ndarray) -> None:
+        """Réécrit un fichier via un fichier temporaire (les projections existantes restent valides)."""
+        tmp = path + '.tmp'
+        values.tofile(tmp)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _write_at(path: str, position: int, values: np.ndarray) -> None:
+        """Écrit des valeurs à partir de la position donnée, le fichier ne pouvant que grandir."""
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(position * values.itemsize)
+            values.tofile(f)
+
+    def read(self, ticker: str, interval: str, start: Optional[pd.Timestamp] = None) -> pd.Series:
+        """
+        Lit la série de clôtures d'un ticker.
+
+        Args:
+            ticker: Symbole boursier
+            interval: Fréquence des données
+            start: Date de début (incluse)
+
+        Returns:
+            Série des clôtures indexée par date
+        """
+        dates, closes = self._arrays(ticker, interval)
+        if start is not None:
+            first = np.searchsorted(dates, pd.Timestamp(start).value, side='left')
+            dates, closes = dates[first:], closes[first:]
+        return pd.Series(closes, index=pd.DatetimeIndex(dates.view('datetime64[ns]')), name=ticker, copy=False)
+
+    def write(self, prices: pd.DataFrame, interval: str,
+              covered_from: Optional[pd.Timestamp] = None) -> None:
+        """
+        Enregistre des clôtures dans le cache.
+
+        Les barres postérieures à la dernière date stockée sont ajoutées en fin de fichier
+        (la dernière barre, potentiellement incomplète, est remplacée) ; sinon la série est
+        fusionnée puis réécrite.
+
+        Args:
+            prices: DataFrame des clôtures (une colonne par ticker)
+            interval: Fréquence des données
+            covered_from: Début de la plage demandée à la source, même sans données
+        """
+        index = self._load_index(interval)
+        now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+        dates_all = _to_naive_utc(prices.index)
+        for ticker in prices.columns:
+            column = pd.Series(prices[ticker].to_numpy(dtype=np.float64), index=dates_all)
+            column = column[column.notna()].sort_index()
+            column = column[~column.index.duplicated(keep='last')]
+            new_dates = column.index.values.astype('datetime64[ns]').view(np.int64)
+            new_closes = column.to_numpy()
+            dates_path, close_path = self._paths(ticker, interval)
+            old_dates, old_closes = self._arrays(ticker, interval)
+
+            keep = int(np.searchsorted(old_dates, new_dates[0], side='left')) if len(new_dates) else 0
+            overlap = len(old_dates) - keep
+            # Barres déjà stockées renvoyées à l'identique (ex: dernière barre redemandée)
+            unchanged = (overlap <= len(new_dates) and np.array_equal(old_dates[keep:], new_dates[:overlap])
+                         and np.array_equal(old_closes[keep:], new_closes[:overlap]))
+            if len(new_dates) and not unchanged:
+                # Historique antérieur, barre corrigée ou absente de la réponse: fusion (les
+                # barres stockées non renvoyées sont conservées) puis réécriture complète
+                merged = pd.Series(np.array(old_closes), index=np.array(old_dates))
+                merged = pd.Series(new_closes, index=new_dates).combine_first(merged).sort_index()
+                self._rewrite(dates_path, merged.index.to_numpy(dtype=np.int64))
+                self._rewrite(close_path, merged.to_numpy(dtype=np.float64))
+            elif len(new_dates) > overlap:
+                # Ajout des seules nouvelles barres en fin de fichier
+                self._write_at(dates_path, len(old_dates), new_dates[overlap:].astype(np.int64))
+                self._write_at(close_path, len(old_dates), new_closes[overlap:].astype(np.float64))
+
+            meta = index.get(ticker, {})
+            starts = [pd.Timestamp(v) for v in (meta.get('covered_from'), covered_from) if v is not None]
+            if len(new_dates):
+                starts.append(pd.Timestamp(new_dates[0]))
+            if starts:
+                meta['covered_from'] = min(starts).isoformat()
+            meta['checked_until'] = now.isoformat()
+            index[ticker] = meta
+        self._save_index(interval, index)
+
+    def get(self, tickers: List[str], period: str, interval: str,
+            fetch: Optional[FetchFunction] = None) -> pd.DataFrame:
+        """
+        Renvoie les clôtures demandées en ne téléchargeant que les plages manquantes.
+
+        Args:
+            tickers: Liste des symboles boursiers
+            period: Période d'analyse (ex: "1mo", "1y", "5y")
+            interval: Fréquence des données
+            fetch: Source de prix ; si None (mode hors ligne), seul le cache est lu
+
+        Returns:
+            DataFrame des clôtures alignées sur les dates (une colonne par ticker) ; si tous
+            les tickers partagent le même calendrier, les colonnes sont des projections
+            mémoire du cache (sans copie), sinon l'alignement recopie les clôtures
+        """
+        now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+        start = period_start(period, now)
+        max_age = self.max_age if self.max_age is not None else bar_duration(interval)
+        index = self._load_index(interval)
+
+        requests: Dict[Tuple[pd.Timestamp, Optional[pd.Timestamp]], List[str]] = {}
+        for ticker in tickers:
+            meta = index.get(ticker)
+            if meta is None:
+                requests.setdefault((start, None), []).append(ticker)
+                continue
+            covered_from = pd.Timestamp(meta['covered_from'])
+            if covered_from > start:
+                requests.setdefault((start, covered_from), []).append(ticker)
+            if now - pd.Timestamp(meta['checked_until']) > max_age:
+                dates, _ = self._arrays(ticker, interval)
+                last = pd.Timestamp(int(dates[-1]), unit='ns') if len(dates) else start
+                requests.setdefault((last.normalize(), None), []).append(ticker)
+
+        if fetch is None:
+            missing = [t for t in tickers if t not in index]
+            if missing:
+                raise ValueError(f"Mode hors ligne: aucune donnée en cache pour {', '.join(missing)}")
+        else:
+            for (fetch_start, fetch_end), group in requests.items():
+                prices = fetch(group, fetch_start, fetch_end, interval)
+                self.write(prices.reindex(columns=group), interval, covered_from=fetch_start)
+
+        columns = [self.read(ticker, interval, start) for ticker in tickers]
+        if len(set(tickers)) == len(tickers) and all(c.index.equals(columns[0].index) for c in columns[1:]):
+            # Calendrier commun: chaque colonne reste une projection mémoire, sans copie
+            return pd.DataFrame({ticker: c.to_numpy() for ticker, c in zip(tickers, columns)},
+                                index=columns[0].index, copy=False)
+        # Calendriers différents: l'alignement sur l'union des dates copie les clôtures
+        return pd.concat(columns, axis=1)
@@ -0,0 +1,298 @@
+import os
+import random
+import threading
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from typing import Dict, List, Optional, Tuple
+from instrumentation import instrument, span
+
+REPORT_COLUMNS = ['status', 'rows', 'attempts', 'seconds', 'error']
+
+
+class PriceProvider:
+    """
+    Source de prix de clôture.
+
+    `fetch` renvoie un DataFrame (dates x tickers) ; un ticker sans donnée peut être
+    absent ou entièrement NaN, et une erreur de la source est levée comme exception.
+    """
+    name = ''
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: Optional[pd.Timestamp],
+              interval: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    name = 'yfinance'
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: Optional[pd.Timestamp],
+              interval: str) -> pd.DataFrame:
+        """Télécharge les prix de clôture ajustés via yfinance (un appel par lot)."""
+        import yfinance as yf  # import différé: coûteux et inutile hors ligne
+        with span('yfinance.download', tickers=len(tickers), interval=interval):
+            # Parallélisme interne désactivé: c'est le pipeline qui borne les requêtes simultanées
+            data = yf.download(tickers, start=start, end=end, interval=interval,
+                               auto_adjust=True, progress=False, threads=False)
+        # On prend 'Close' si auto_adjust=True, sinon 'Adj Close'
+        if isinstance(data, pd.DataFrame) and 'Close' in data:
+            close = data['Close']
+        elif isinstance(data, pd.DataFrame) and 'Adj Close' in data:
+            close = data['Adj Close']
+        else:
+            raise ValueError("Aucune colonne de prix ('Close' ou 'Adj Close') trouvée dans les données téléchargées.")
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        return close
+
+
+class FileProvider(PriceProvider):
+    name = 'file'
+
+    def __init__(self, directory: str, fmt: str = 'csv'):
+        """
+        Prix lus dans des fichiers locaux, un par ticker (`<répertoire>/<ticker>.csv`).
+
+        Chaque fichier est indexé par date ; la colonne 'Close' (ou 'Adj Close', sinon la
+        première) est utilisée. Un répertoire contient une seule fréquence de données.
+
+        Args:
+            directory: Répertoire des fichiers
+            fmt: 'csv' ou 'parquet'
+        """
+        if fmt not in ('csv', 'parquet'):
+            raise ValueError(f"Format de fichier non géré: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{quote(ticker, safe='')}.{self.fmt}")
+
+    def save(self, prices: pd.DataFrame) -> None:
+        """Écrit un fichier par colonne de `prices` (ex: pour préparer un jeu de données hors ligne)."""
+        os.makedirs(self.directory, exist_ok=True)
+        for ticker in prices.columns:
+            frame = prices[[ticker]].rename(columns={ticker: 'Close'})
+            if self.fmt == 'csv':
+                frame.to_csv(self._path(ticker))
+            else:
+                frame.to_parquet(self._path(ticker))
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: Optional[pd.Timestamp],
+              interval: str) -> pd.DataFrame:
+        columns = {}
+        for ticker in tickers:
+            path = self._path(ticker)
+            if not os.path.exists(path):
+                continue
+            if self.fmt == 'csv':
+                frame = pd.read_csv(path, index_col=0, parse_dates=True)
+            else:
+                frame = pd.read_parquet(path)
+            column = next((c for c in ('Close', 'Adj Close') if c in frame), frame.columns[0])
+            series = frame[column]
+            mask = series.index >= start
+            if end is not None:
+                mask &= series.index < end
+            columns[ticker] = series[mask]
+        return pd.DataFrame(columns)
+
+
+class MemoryProvider(PriceProvider):
+    name = 'memory'
+
+    def __init__(self, prices: pd.DataFrame, latency: float = 0.0, latency_per_ticker: float = 0.0,
+                 failure_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Source en mémoire, pour les tests et les mesures hors ligne.
+
+        Simule une source distante: délai fixe par appel et par ticker, et échecs aléatoires
+        (ConnectionError) avec la probabilité `failure_rate`.
+
+        Args:
+            prices: Clôtures disponibles (une colonne par ticker)
+            latency: Délai par appel, en secondes
+            latency_per_ticker: Délai supplémentaire par ticker demandé, en secondes
+            failure_rate: Probabilité d'échec d'un appel
+            seed: Graine des échecs simulés
+        """
+        self.prices = prices
+        self.latency = latency
+        self.latency_per_ticker = latency_per_ticker
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: Optional[pd.Timestamp],
+              interval: str) -> pd.DataFrame:
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.failure_rate
+        time.sleep(self.latency + self.latency_per_ticker * len(tickers))
+        if failed:
+            raise ConnectionError("Échec simulé de la source de prix")
+        available = [t for t in tickers if t in self.prices.columns]
+        index = self.prices.index
+        mask = index >= start
+        if end is not None:
+            mask &= index < end
+        return self.prices.loc[mask, available]
+
+
+@instrument
+class FetchPipeline:
+    def __init__(self, provider: Optional[PriceProvider] = None, chunk_size: int = 50,
+                 max_workers: int = 4, retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 8.0):
+        """
+        Téléchargement de grands univers par lots, en parallèle et avec reprises.
+
+        Les tickers sont découpés en lots de `chunk_size`, téléchargés par au plus
+        `max_workers` threads. Un lot en échec est redemandé après une attente
+        exponentielle (avec gigue) ; les tickers absents d'une réponse valide ne sont
+        redemandés qu'une fois. Les lots sont fusionnés en une seule allocation, alignés
+        sur l'union des dates.
+
+        Args:
+            provider: Source de prix (yfinance par défaut)
+            chunk_size: Nombre de tickers par requête
+            max_workers: Nombre maximum de requêtes simultanées
+            retries: Nombre de reprises par lot
+            backoff: Attente avant la première reprise, en secondes (doublée ensuite)
+            max_backoff: Attente maximale entre deux reprises, en secondes
+        """
+        if chunk_size < 1 or max_workers < 1 or retries < 0:
+            raise ValueError("Paramètres de téléchargement invalides")
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _fetch_chunk(self, chunk: List[str], start: pd.Timestamp, end: Optional[pd.Timestamp],
+                     interval: str) -> Tuple[List[pd.DataFrame], Dict[str, dict]]:
+        """
+        Télécharge un lot avec reprises.
+
+        Returns:
+            Tuple (morceaux de prix reçus, statut par ticker)
+        """
+        began = time.perf_counter()
+        pieces: List[pd.DataFrame] = []
+        report = {t: {'status': 'missing', 'rows': 0, 'attempts': 0, 'seconds': 0.0, 'error': None}
+                  for t in chunk}
+        pending = list(chunk)
+        error = None
+        answered = 0
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+            for ticker in pending:
+                report[ticker]['attempts'] += 1
+            try:
+                frame = self.provider.fetch(pending, start, end, interval)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            received = [t for t in pending if t in frame.columns and frame[t].notna().any()]
+            if received:
+                pieces.append(frame[received])
+            elapsed = time.perf_counter() - began
+            for ticker in received:
+                report[ticker].update(status='ok', rows=int(frame[ticker].notna().sum()), seconds=elapsed)
+            pending = [t for t in pending if t not in set(received)]
+            # Un ticker absent d'une réponse valide n'est redemandé qu'une fois (symbole inconnu)
+            answered += 1
+            if not pending or answered > 1:
+                break
+        elapsed = time.perf_counter() - began
+        for ticker in pending:
+            report[ticker].update(status='failed' if error else 'missing', seconds=elapsed, error=error)
+        return pieces, report
+
+    @staticmethod
+    def _dates(index: pd.Index) -> np.ndarray:
+        """Dates d'un morceau en nanosecondes (UTC naïf si l'index a un fuseau)."""
+        index = index if isinstance(index, pd.DatetimeIndex) else pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        return index.values.astype('datetime64[ns]', copy=False).view(np.int64)
+
+    @staticmethod
+    def _merge(pieces: List[pd.DataFrame], tickers: List[str]) -> pd.DataFrame:
+        """Aligne les morceaux sur l'union des dates, dans l'ordre des tickers demandés."""
+        if not pieces:
+            return pd.DataFrame(columns=tickers, dtype=float)
+        # Les lots d'une même source partagent presque toujours le même calendrier:
+        # l'union et les positions ne sont calculées qu'une fois par index distinct
+        calendars: List[np.ndarray] = []
+        owners = []
+        for piece in pieces:
+            dates = FetchPipeline._dates(piece.index)
+            k = next((i for i, c in enumerate(calendars) if len(c) == len(dates) and np.array_equal(c, dates)),
+                     None)
+            if k is None:
+                k = len(calendars)
+                calendars.append(dates)
+            owners.append(k)
+        dates = calendars[0] if len(calendars) == 1 else np.concatenate(calendars)
+        if len(calendars) > 1 or np.any(np.diff(dates) <= 0):
+            dates = np.unique(dates)
+        rows = []
+        for calendar in calendars:
+            positions = np.searchsorted(dates, calendar)
+            # Écriture par tranche seulement si les dates du morceau sont triées et sans trou
+            contiguous = len(positions) and positions[-1] - positions[0] + 1 == len(positions) \
+                and np.all(np.diff(positions) == 1)
+            rows.append(slice(positions[0], positions[-1] + 1) if contiguous else positions)
+
+        # Ordre colonne (Fortran): c'est la disposition interne du bloc pandas, sans copie
+        values = np.full((len(dates), len(tickers)), np.nan, order='F')
+        position = {t: i for i, t in enumerate(tickers)}
+        for piece, k in zip(pieces, owners):
+            cols = np.array([position[c] for c in piece.columns])
+            if cols[-1] - cols[0] + 1 == len(cols) and np.all(np.diff(cols) == 1):
+                cols = slice(cols[0], cols[-1] + 1)
+            piece_rows = rows[k]
+            if not isinstance(piece_rows, slice) and not isinstance(cols, slice):
+                piece_rows = piece_rows[:, None]
+            # En cas de dates dupliquées dans un morceau, la dernière valeur l'emporte
+            values[piece_rows, cols] = piece.to_numpy(dtype=np.float64)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates.view('datetime64[ns]')),
+                            columns=list(tickers), copy=False)
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: Optional[pd.Timestamp] = None,
+              interval: str = '1d') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Télécharge les clôtures de tous les tickers.
+
+        Args:
+            tickers: Liste des symboles boursiers
+            start: Date de début
+            end: Date de fin exclue (None pour aujourd'hui)
+            interval: Fréquence des données
+
+        Returns:
+            Tuple contenant (clôtures alignées, une colonne par ticker demandé ; rapport par
+            ticker: status 'ok', 'missing' ou 'failed', rows, attempts, seconds, error)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        chunks = [tickers[i:i + self.chunk_size] for i in range(0, len(tickers), self.chunk_size)]
+        with span('fetch.pipeline', tickers=len(tickers), chunks=len(chunks), provider=self.provider.name):
+            if len(chunks) <= 1 or self.max_workers == 1:
+                results = [self._fetch_chunk(chunk, start, end, interval) for chunk in chunks]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                    results = list(executor.map(lambda c: self._fetch_chunk(c, start, end, interval), chunks))
+
+        pieces = [piece for chunk_pieces, _ in results for piece in chunk_pieces]
+        report = {ticker: status for _, chunk_report in results for ticker, status in chunk_report.items()}
+        report = pd.DataFrame.from_dict(report, orient='index', columns=REPORT_COLUMNS).reindex(tickers)
+        return self._merge(pieces, tickers), report
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from covariance import CovarianceModel, FactorCovariance
+
+# (poids, rendement, risque), comme renvoyé par PortfolioOptimizer
+Solution = Tuple[np.ndarray, float, float]
+
+
+class CacheEntry:
+    def __init__(self):
+        """
+        Résultats mémorisés pour un univers (rendements, covariance, contraintes).
+
+        Attributes:
+            corners: Portefeuilles coins de la ligne critique (rendements, poids) ; toute
+                     la frontière, et tout rendement cible, s'en déduit par interpolation
+            solutions: Solutions exactes par requête, ex: ('target', 0.001, 0.0) ou ('sharpe', None, 0.0)
+            frontiers: Frontières calculées point par point (repli QP), par nombre de points
+        """
+        self.corners: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.solutions: Dict[Tuple[str, Optional[float], float], Solution] = {}
+        self.frontiers: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 32, cache_dir: Optional[str] = None,
+                 max_disk_entries: int = 256):
+        """
+        Cache des résultats d'optimisation, adressé par le contenu des données.
+
+        La clé est une empreinte (BLAKE2b) des rendements moyens, de la covariance et
+        des contraintes: deux optimiseurs construits sur les mêmes données partagent
+        leurs résultats. Les entrées sont gardées en mémoire (LRU) et, si `cache_dir`
+        est fourni, écrites sur disque pour survivre au redémarrage.
+
+        Args:
+            max_entries: Nombre maximum d'univers gardés en mémoire
+            cache_dir: Répertoire du cache disque (mémoire seule si None)
+            max_disk_entries: Nombre maximum de fichiers gardés sur disque
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(mean_returns: pd.Series, covariance: CovarianceModel, constraints: str = 'long_only') -> str:
+        """
+        Empreinte du problème.
+
+        Un modèle à facteurs est haché par ses composantes (O(n·k)), sans densification.
+
+        Args:
+            mean_returns: Série des rendements moyens
+            covariance: Modèle de covariance
+            constraints: Description des contraintes
+
+        Returns:
+            Empreinte hexadécimale
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(constraints.encode())
+        digest.update(json.dumps([str(name) for name in mean_returns.index]).encode())
+        digest.update(np.ascontiguousarray(mean_returns.to_numpy(dtype=float)).data)
+        if isinstance(covariance, FactorCovariance):
+            arrays = (covariance.loadings, covariance.factor_cov, covariance.specific_var)
+        else:
+            arrays = (covariance.dense(),)
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array, dtype=float).data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Renvoie l'entrée d'un univers (mémoire puis disque), ou None.
+
+        Args:
+            key: Empreinte du problème
+
+        Returns:
+            Entrée du cache ou None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.cache_dir is None:
+            return None
+        entry = self._load(key)
+        if entry is not None:
+            self._insert(key, entry)
+        return entry
+
+    def entry(self, key: str) -> CacheEntry:
+        """Renvoie l'entrée d'un univers, créée vide si besoin."""
+        entry = self.get(key)
+        if entry is None:
+            entry = CacheEntry()
+            self._insert(key, entry)
+        return entry
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, key: str, query: Tuple[str, Optional[float], float]) -> Optional[Solution]:
+        """
+        Cherche une solution exacte déjà calculée.
+
+        Args:
+            key: Empreinte du problème
+            query: Requête, ex: ('target', rendement cible, taux sans risque)
+
+        Returns:
+            Solution (poids, rendement, risque) ou None
+        """
+        entry = self.get(key)
+        solution = None if entry is None else entry.solutions.get(query)
+        if solution is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return solution[0].copy(), solution[1], solution[2]
+
+    def store_solution(self, key: str, query: Tuple[str, Optional[float], float], solution: Solution) -> None:
+        """Mémorise une solution exacte."""
+        weights, ret, risk = solution
+        self.entry(key).solutions[query] = (np.array(weights, dtype=float), float(ret), float(risk))
+        self._save(key)
+
+    def store_corners(self, key: str, corner_returns: np.ndarray, corner_weights: np.ndarray) -> None:
+        """Mémorise les portefeuilles coins de la frontière."""
+        self.entry(key).corners = (np.array(corner_returns, dtype=float), np.array(corner_weights, dtype=float))
+        self._save(key)
+
+    def store_frontier(self, key: str, n_points: int,
+                       frontier: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+        """Mémorise une frontière calculée point par point."""
+        self.entry(key).frontiers[n_points] = tuple(np.array(a, dtype=float) for a in frontier)
+        self._save(key)
+
+    def clear(self) -> None:
+        """Vide le cache mémoire (le cache disque est conservé)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _save(self, key: str) -> None:
+        if self.cache_dir is None:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        arrays: Dict[str, np.ndarray] = {}
+        if entry.corners is not None:
+            arrays['corner_returns'], arrays['corner_weights'] = entry.corners
+        solutions = list(entry.solutions.items())
+        if solutions:
+            arrays['solution_kinds'] = np.array([query[0] for query, _ in solutions])
+            arrays['solution_params'] = np.array([[np.nan if query[1] is None else query[1], query[2]]
+                                                  for query, _ in solutions])
+            arrays['solution_weights'] = np.vstack([solution[0] for _, solution in solutions])
+            arrays['solution_stats'] = np.array([solution[1:] for _, solution in solutions])
+        for n_points, frontier in entry.frontiers.items():
+            for name, array in zip(('returns', 'risks', 'weights'), frontier):
+                arrays[f'frontier_{n_points}_{name}'] = array
+
+        # Écriture atomique: fichier temporaire puis renommage
+        tmp = self._path(key) + f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, self._path(key))
+        self._evict_disk()
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                entry = CacheEntry()
+                if 'corner_returns' in data:
+                    entry.corners = (data['corner_returns'], data['corner_weights'])
+                if 'solution_kinds' in data:
+                    for kind, (param, rate), weights, (ret, risk) in zip(
+                            data['solution_kinds'], data['solution_params'],
+                            data['solution_weights'], data['solution_stats']):
+                        query = (str(kind), None if np.isnan(param) else float(param), float(rate))
+                        entry.solutions[query] = (weights, float(ret), float(risk))
+                for name in data.files:
+                    if name.startswith('frontier_') and name.endswith('_returns'):
+                        n_points = int(name.split('_')[1])
+                        entry.frontiers[n_points] = tuple(data[f'frontier_{n_points}_{part}']
+                                                          for part in ('returns', 'risks', 'weights'))
+            os.utime(self._path(key))
+            return entry
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _evict_disk(self) -> None:
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                 if name.endswith('.npz')]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda path: os.path.getmtime(path))
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
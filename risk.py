@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Optional, Tuple, Union
+from covariance import CovarianceModel, FactorCovariance
+from instrumentation import instrument
+
+RISK_COLUMNS = ['mean', 'volatility', 'var', 'cvar', 'var_parametric', 'cvar_parametric',
+                'max_drawdown', 'drawdown_duration']
+
+
+@instrument
+class RiskAnalyzer:
+    def __init__(self, returns: pd.DataFrame,
+                 cov_matrix: Optional[Union[pd.DataFrame, CovarianceModel]] = None,
+                 confidence: float = 0.95, memory_budget_mb: float = 64.0):
+        """
+        Mesures de risque de nombreux portefeuilles à la fois (ex: toute la frontière).
+
+        Les poids sont une matrice portefeuilles x actifs: contributions au risque,
+        VaR/CVaR paramétriques et historiques et pertes maximales sont calculées par
+        produits matriciels sur tous les portefeuilles. L'historique est parcouru par blocs
+        de dates dont la taille est déduite du budget mémoire ; seules les pires pertes
+        (la queue de distribution) sont conservées d'un bloc à l'autre.
+
+        Un actif non coté à une date (rendement NaN) y a un rendement nul: son
+        rendement suivant couvre toute la période depuis sa dernière cotation.
+
+        Args:
+            returns: Rendements par période (issus de DataLoader.calculate_returns)
+            cov_matrix: Covariance des rendements (DataFrame ou CovarianceModel) ; estimée
+                        à partir de `returns` si None
+            confidence: Niveau de confiance des VaR et CVaR (ex: 0.95)
+            memory_budget_mb: Mémoire de travail maximale par bloc de dates, en Mo
+        """
+        if not 0.0 < confidence < 1.0:
+            raise ValueError("Le niveau de confiance doit être compris entre 0 et 1")
+        if len(returns) < 2:
+            raise ValueError("Pas assez de rendements pour mesurer le risque")
+        self.asset_names = list(returns.columns)
+        self.n_assets = len(self.asset_names)
+        self.confidence = confidence
+        self.memory_budget_mb = memory_budget_mb
+        self._returns = returns.to_numpy(dtype=float)
+        self._complete = not np.isnan(self._returns).any()
+        self.mean_returns = returns.mean().to_numpy()
+
+        if cov_matrix is None:
+            cov_matrix = CovarianceModel.sample(returns) if self._complete else CovarianceModel.pairwise(returns)
+        elif isinstance(cov_matrix, pd.DataFrame):
+            cov_matrix = CovarianceModel(cov_matrix)
+        if list(cov_matrix.asset_names) != self.asset_names:
+            raise ValueError("Les actifs de la covariance ne correspondent pas à ceux des rendements")
+        self.covariance = cov_matrix
+
+    def _weights(self, weights: np.ndarray) -> np.ndarray:
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        if weights.ndim != 2 or weights.shape[1] != self.n_assets:
+            raise ValueError(f"Les poids doivent avoir {self.n_assets} colonnes (une par actif)")
+        return weights
+
+    def _cov_product(self, weights: np.ndarray) -> np.ndarray:
+        """Σ·w pour chaque portefeuille (lignes de `weights`), en O(n·k) pour un modèle à facteurs."""
+        covariance = self.covariance
+        if isinstance(covariance, FactorCovariance):
+            return ((weights @ covariance.loadings) @ covariance.factor_cov) @ covariance.loadings.T \
+                + weights * covariance.specific_var
+        return weights @ covariance.dense()
+
+    def _chunk_rows(self, n_portfolios: int) -> int:
+        """Nombre de dates par bloc respectant le budget mémoire."""
+        # Bloc de rendements des actifs + une dizaine de tableaux temporaires par portefeuille
+        # (rendements, queue fusionnée, valeur, plus haut, positions et durées sous le plus haut)
+        per_row = (self.n_assets + 10 * n_portfolios) * 8
+        return max(1, int(self.memory_budget_mb * 2 ** 20) // per_row)
+
+    def risk_contributions(self, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Décomposition de la volatilité de chaque portefeuille.
+
+        La contribution marginale d'un actif est ∂σ/∂wᵢ = (Σw)ᵢ / σ ; les contributions
+        (wᵢ · ∂σ/∂wᵢ) ont pour somme la volatilité du portefeuille.
+
+        Args:
+            weights: Poids (vecteur, ou matrice portefeuilles x actifs)
+
+        Returns:
+            Tuple contenant (volatilités, contributions marginales, contributions) ; les
+            contributions ont la forme des poids
+        """
+        W = self._weights(weights)
+        product = self._cov_product(W)
+        volatility = np.sqrt(np.maximum(np.einsum('ij,ij->i', W, product), 0.0))
+        marginal = np.divide(product, volatility[:, None], out=np.zeros_like(product),
+                             where=volatility[:, None] > 0)
+        component = W * marginal
+        if np.ndim(weights) == 1:
+            return volatility[0], marginal[0], component[0]
+        return volatility, marginal, component
+
+    def parametric_var(self, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        VaR et CVaR gaussiennes sur une période, exprimées en pertes positives.
+
+        Args:
+            weights: Poids (vecteur, ou matrice portefeuilles x actifs)
+
+        Returns:
+            Tuple contenant (VaR, CVaR)
+        """
+        W = self._weights(weights)
+        mean = W @ self.mean_returns
+        volatility = np.sqrt(np.maximum(np.einsum('ij,ij->i', W, self._cov_product(W)), 0.0))
+        normal = NormalDist()
+        z = normal.inv_cdf(1.0 - self.confidence)
+        var = -(mean + z * volatility)
+        cvar = -(mean - volatility * normal.pdf(z) / (1.0 - self.confidence))
+        if np.ndim(weights) == 1:
+            return var[0], cvar[0]
+        return var, cvar
+
+    def historical_risk(self, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        VaR et CVaR historiques et pertes maximales, en un seul parcours de l'historique.
+
+        Les portefeuilles sont rebalancés à chaque période (poids constants). Sur T
+        rendements, la queue contient les k = ⌈(1 - confiance)·T⌉ pires: la VaR est la
+        k-ième pire perte et la CVaR la perte moyenne de la queue. La perte maximale est
+        mesurée depuis le plus haut précédent de la valeur du portefeuille, et sa durée
+        est la plus longue période passée sous un plus haut.
+
+        Args:
+            weights: Poids (vecteur, ou matrice portefeuilles x actifs)
+
+        Returns:
+            Tuple contenant (VaR, CVaR, perte maximale, durée de la plus longue perte en
+            nombre de périodes)
+        """
+        W = self._weights(weights)
+        n_portfolios = len(W)
+        n_periods = len(self._returns)
+        tail = max(1, int(np.ceil((1.0 - self.confidence) * n_periods - 1e-9)))
+        rows = self._chunk_rows(n_portfolios)
+
+        worst = np.empty((0, n_portfolios))
+        wealth = np.ones(n_portfolios)
+        peak = np.ones(n_portfolios)
+        max_drawdown = np.zeros(n_portfolios)
+        duration = np.zeros(n_portfolios, dtype=np.int64)
+        max_duration = np.zeros(n_portfolios, dtype=np.int64)
+        for start in range(0, n_periods, rows):
+            block = self._returns[start:start + rows]
+            if not self._complete:
+                block = np.where(np.isnan(block), 0.0, block)
+            portfolio = block @ W.T
+
+            # Queue de distribution: les `tail` pires rendements vus jusqu'ici
+            worst = np.concatenate((worst, portfolio))
+            if len(worst) > tail:
+                worst = np.partition(worst, tail - 1, axis=0)[:tail]
+
+            # Valeur, plus haut courant et durée sous le plus haut, reportés entre blocs
+            values = wealth * np.cumprod(1.0 + portfolio, axis=0)
+            peaks = np.maximum(np.maximum.accumulate(values, axis=0), peak)
+            max_drawdown = np.maximum(max_drawdown, 1.0 - np.min(values / peaks, axis=0))
+            position = np.arange(len(values))[:, None]
+            last_high = np.maximum.accumulate(np.where(values < peaks, -1, position), axis=0)
+            lengths = np.where(last_high < 0, duration + position + 1, position - last_high)
+            max_duration = np.maximum(max_duration, lengths.max(axis=0))
+            wealth, peak, duration = values[-1], peaks[-1], lengths[-1]
+
+        var = -worst.max(axis=0)
+        cvar = -worst.mean(axis=0)
+        if np.ndim(weights) == 1:
+            return var[0], cvar[0], max_drawdown[0], max_duration[0]
+        return var, cvar, max_drawdown, max_duration
+
+    def summary(self, weights: np.ndarray) -> pd.DataFrame:
+        """
+        Tableau des mesures de risque, une ligne par portefeuille.
+
+        Args:
+            weights: Poids (vecteur, ou matrice portefeuilles x actifs)
+
+        Returns:
+            DataFrame de colonnes mean, volatility, var, cvar (historiques), var_parametric,
+            cvar_parametric, max_drawdown et drawdown_duration ; VaR, CVaR et pertes sont
+            des pertes positives sur une période
+        """
+        W = self._weights(weights)
+        volatility, _, _ = self.risk_contributions(W)
+        var_parametric, cvar_parametric = self.parametric_var(W)
+        var, cvar, max_drawdown, duration = self.historical_risk(W)
+        return pd.DataFrame({
+            'mean': W @ self.mean_returns, 'volatility': volatility, 'var': var, 'cvar': cvar,
+            'var_parametric': var_parametric, 'cvar_parametric': cvar_parametric,
+            'max_drawdown': max_drawdown, 'drawdown_duration': duration,
+        }, columns=RISK_COLUMNS)
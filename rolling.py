@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple, Union
+
+
+class RollingCovariance:
+    def __init__(self, asset_names: List[str], window: Optional[int] = None,
+                 decay: Optional[float] = None):
+        """
+        Estimateur incrémental des rendements moyens et de la covariance.
+
+        Chaque nouvelle barre de prix coûte O(n²). Trois modes sont disponibles:
+        fenêtre croissante (par défaut), fenêtre glissante de `window` rendements,
+        ou moyenne mobile exponentielle (EWMA) de facteur `decay`.
+
+        Args:
+            asset_names: Noms des actifs (colonnes des prix)
+            window: Taille de la fenêtre glissante en nombre de rendements
+            decay: Facteur de décroissance λ de l'EWMA (ex: 0.94)
+        """
+        if window is not None and decay is not None:
+            raise ValueError("Choisir soit une fenêtre glissante, soit une décroissance exponentielle")
+        if window is not None and window < 2:
+            raise ValueError("La fenêtre glissante doit contenir au moins 2 rendements")
+        if decay is not None and not 0.0 < decay < 1.0:
+            raise ValueError("Le facteur de décroissance doit être strictement entre 0 et 1")
+
+        self.asset_names = list(asset_names)
+        self.n_assets = len(self.asset_names)
+        self.window = window
+        self.decay = decay
+        self.n_observations = 0
+        self._last_prices: Optional[np.ndarray] = None
+
+        n = self.n_assets
+        # Fenêtre glissante: tampon circulaire, sommes et produits croisés courants
+        self._buffer = np.zeros((window, n)) if window is not None else None
+        self._position = 0
+        self._updates_since_refresh = 0
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        # Fenêtre croissante (Welford) et EWMA: moyenne et co-moments centrés
+        self._mean = np.zeros(n)
+        self._comoment = np.zeros((n, n))
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame, window: Optional[int] = None,
+                    decay: Optional[float] = None) -> 'RollingCovariance':
+        """
+        Construit un estimateur initialisé sur un historique de prix.
+
+        Args:
+            prices: DataFrame des prix
+            window: Taille de la fenêtre glissante en nombre de rendements
+            decay: Facteur de décroissance λ de l'EWMA
+
+        Returns:
+            Estimateur prêt à recevoir les barres suivantes
+        """
+        estimator = cls(list(prices.columns), window=window, decay=decay)
+        estimator.update(prices)
+        return estimator
+
+    def update(self, prices: Union[pd.Series, pd.DataFrame, np.ndarray]) -> None:
+        """
+        Intègre une ou plusieurs nouvelles barres de prix.
+
+        Args:
+            prices: Une barre (Series ou vecteur) ou plusieurs barres (DataFrame ou matrice)
+        """
+        if isinstance(prices, pd.DataFrame):
+            rows = prices[self.asset_names].to_numpy(dtype=float)
+        elif isinstance(prices, pd.Series):
+            rows = prices[self.asset_names].to_numpy(dtype=float)[None, :]
+        else:
+            rows = np.atleast_2d(np.asarray(prices, dtype=float))
+        if rows.shape[1] != self.n_assets:
+            raise ValueError(f"Chaque barre doit contenir {self.n_assets} prix")
+
+        for row in rows:
+            if not np.all(np.isfinite(row)):
+                raise ValueError("La barre de prix contient des valeurs manquantes ou infinies")
+            if self._last_prices is not None:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ret = row / self._last_prices - 1.0
+                if not np.all(np.isfinite(ret)):
+                    raise ValueError("Des valeurs infinies ont été détectées dans les rendements")
+                self._add_return(ret)
+            self._last_prices = row
+
+    def _add_return(self, ret: np.ndarray) -> None:
+        """Met à jour les statistiques avec un rendement (O(n²))."""
+        self.n_observations += 1
+        if self.decay is not None:
+            if self.n_observations == 1:
+                self._mean = ret.copy()
+                return
+            alpha = 1.0 - self.decay
+            diff = ret - self._mean
+            self._mean += alpha * diff
+            self._comoment = self.decay * (self._comoment + alpha * np.outer(diff, diff))
+        elif self.window is not None:
+            if self.n_observations > self.window:
+                oldest = self._buffer[self._position]
+                self._sum -= oldest
+                self._cross -= np.outer(oldest, oldest)
+                self.n_observations = self.window
+            self._buffer[self._position] = ret
+            self._position = (self._position + 1) % self.window
+            self._sum += ret
+            self._cross += np.outer(ret, ret)
+            # Recalcul exact périodique pour borner la dérive numérique (coût amorti O(n²))
+            self._updates_since_refresh += 1
+            if self._updates_since_refresh >= self.window:
+                filled = self._buffer[:self.n_observations]
+                self._sum = filled.sum(axis=0)
+                self._cross = filled.T @ filled
+                self._updates_since_refresh = 0
+        else:
+            diff = ret - self._mean
+            self._mean += diff / self.n_observations
+            self._comoment += np.outer(diff, ret - self._mean)
+
+    @property
+    def mean_returns(self) -> pd.Series:
+        """Rendements moyens courants."""
+        if self.window is not None and self.decay is None:
+            mean = self._sum / max(self.n_observations, 1)
+        else:
+            mean = self._mean
+        return pd.Series(mean, index=self.asset_names)
+
+    @property
+    def cov_matrix(self) -> pd.DataFrame:
+        """Matrice de covariance courante (non biaisée, ou EWMA)."""
+        if self.n_observations < 2:
+            raise ValueError("Au moins deux rendements sont nécessaires pour estimer la covariance")
+        k = self.n_observations
+        if self.decay is not None:
+            cov = self._comoment
+        elif self.window is not None:
+            cov = (self._cross - np.outer(self._sum, self._sum) / k) / (k - 1)
+        else:
+            cov = self._comoment / (k - 1)
+        cov = (cov + cov.T) / 2
+        return pd.DataFrame(cov, index=self.asset_names, columns=self.asset_names)
+
+    def statistics(self) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Statistiques courantes, directement utilisables par PortfolioOptimizer.
+
+        Returns:
+            Tuple contenant (rendements moyens, matrice de covariance)
+        """
+        return self.mean_returns, self.cov_matrix
@@ -0,0 +1,367 @@
+"""
+Service local d'optimisation: asyncio, HTTP/1.1 sur TCP ou sur socket Unix.
+
+Les prix, rendements, covariances et optimiseurs sont gardés en mémoire et partagés entre
+les requêtes: seule la première requête sur un univers lit les prix. Les résolutions
+s'exécutent dans un pool de threads borné ; au-delà de `workers + queue` requêtes en cours,
+le service répond immédiatement 503 (contre-pression) au lieu d'accumuler du retard.
+
+Routes:
+    POST /optimize  {"tickers": ["AAPL", "MSFT"], "period": "1y", "interval": "1d",
+                     "covariance": "sample", "target_return": 0.001, "risk_free_rate": 0.0,
+                     "backend": "cvxopt"}   (sans target_return: ratio de Sharpe maximum)
+    POST /frontier  {"tickers": [...], "n_points": 50, "weights": false}
+    GET  /stats     latences (p50, p90, p99), attente, rejets, univers en mémoire
+    GET  /health
+
+Usage:
+    python service.py --port 8765 --offline
+    python service.py --unix /tmp/risk_return.sock --cache-dir prix/ --offline
+    curl -s localhost:8765/optimize -d '{"tickers": ["AAPL", "MSFT", "NVDA"]}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from cli import PRICE_CACHE_DIR, SPEC_DEFAULTS
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from result_cache import ResultCache
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 422: 'Unprocessable Entity', 503: 'Service Unavailable'}
+MAX_BODY_BYTES = 1 << 20
+
+# (tickers, période, fréquence, estimateur de covariance)
+UniverseKey = Tuple[Tuple[str, ...], str, str, str]
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        """Erreur renvoyée au client avec le code HTTP donné."""
+        super().__init__(message)
+        self.status = status
+
+
+class MarketState:
+    def __init__(self, loader: DataLoader, max_universes: int = 64):
+        """
+        Univers gardés en mémoire: prix, rendements, statistiques et optimiseurs.
+
+        Thread-safe: un univers demandé simultanément par plusieurs requêtes n'est chargé
+        qu'une fois, les autres attendent le résultat. Les chargements d'univers différents
+        passent l'un après l'autre par le DataLoader, qui n'est pas thread-safe (rapport de
+        téléchargement, index du cache disque). Les optimiseurs sont partagés entre les
+        threads de résolution: leurs solveurs gardent leurs factorisations par thread.
+        Au-delà de `max_universes`, les moins récemment utilisés sont oubliés.
+
+        Args:
+            loader: Source des prix (DataLoader hors ligne pour un fonctionnement sans réseau)
+            max_universes: Nombre maximum d'univers gardés en mémoire
+        """
+        self.loader = loader
+        self.max_universes = max_universes
+        self.result_cache = ResultCache(max_entries=max_universes)
+        self.loads = 0
+        self._universes: 'OrderedDict[UniverseKey, Dict[str, Any]]' = OrderedDict()
+        self._loading: Dict[UniverseKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._loader_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._universes)
+
+    def universe(self, key: UniverseKey) -> Dict[str, Any]:
+        """
+        Renvoie un univers, chargé depuis la source de prix à la première demande.
+
+        Args:
+            key: Tuple (tickers, période, fréquence, estimateur de covariance)
+
+        Returns:
+            Dictionnaire (prices, returns, mean_returns, cov_matrix, fetch_report, optimizers)
+        """
+        with self._lock:
+            universe = self._universes.get(key)
+            if universe is not None:
+                self._universes.move_to_end(key)
+                return universe
+            loading = self._loading.setdefault(key, threading.Lock())
+        try:
+            with loading:
+                with self._lock:
+                    universe = self._universes.get(key)
+                if universe is None:
+                    tickers, period, interval, covariance = key
+                    with self._loader_lock:
+                        prices = self.loader.get_market_data(list(tickers), period, interval)
+                        fetch_report = self.loader.fetch_report
+                        returns, mean_returns, cov_matrix = self.loader.calculate_returns(prices, covariance=covariance)
+                    universe = {'prices': prices, 'returns': returns, 'mean_returns': mean_returns,
+                                'cov_matrix': cov_matrix, 'fetch_report': fetch_report, 'optimizers': {},
+                                'loaded_at': time.time()}
+                    with self._lock:
+                        self.loads += 1
+                        self._universes[key] = universe
+                        while len(self._universes) > self.max_universes:
+                            self._universes.popitem(last=False)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        return universe
+
+    def optimizer(self, key: UniverseKey, backend: str = 'cvxopt') -> PortfolioOptimizer:
+        """Optimiseur d'un univers pour un solveur donné, construit une seule fois."""
+        universe = self.universe(key)
+        with self._lock:
+            optimizer = universe['optimizers'].get(backend)
+        if optimizer is None:
+            optimizer = PortfolioOptimizer(universe['mean_returns'], universe['cov_matrix'],
+                                           cache=self.result_cache, backend=backend)
+            with self._lock:
+                optimizer = universe['optimizers'].setdefault(backend, optimizer)
+        return optimizer
+
+    def clear(self) -> None:
+        """Oublie tous les univers (les prix seront relus à la prochaine requête)."""
+        with self._lock:
+            self._universes.clear()
+        self.result_cache.clear()
+
+
+def _percentiles(samples) -> Dict[str, float]:
+    values = np.asarray(samples, dtype=float) * 1e3
+    if not values.size:
+        return {'count': 0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'count': int(values.size), 'p50': float(p50), 'p90': float(p90),
+            'p99': float(p99), 'max': float(values.max())}
+
+
+class OptimizationService:
+    def __init__(self, state: MarketState, workers: int = 4, queue_size: int = 16,
+                 latency_window: int = 10000):
+        """
+        Service asynchrone d'optimisation sur un état de marché partagé.
+
+        Args:
+            state: Univers en mémoire
+            workers: Nombre de threads de résolution
+            queue_size: Nombre de requêtes pouvant attendre un thread ; au-delà, 503
+            latency_window: Nombre de latences conservées par route pour les percentiles
+        """
+        self.state = state
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='solve')
+        self.in_flight = 0
+        self.rejected = 0
+        self.started = time.time()
+        self.latencies: Dict[str, deque] = {route: deque(maxlen=latency_window)
+                                            for route in ('/optimize', '/frontier')}
+        self.queue_waits: deque = deque(maxlen=latency_window)
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _submit(self, func: Callable, *args: Any) -> Any:
+        """Exécute `func` dans le pool, ou lève 503 si le pool et sa file sont pleins."""
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HttpError(503, "Service saturé, réessayer plus tard")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        self.in_flight += 1
+        queued = time.perf_counter()
+        try:
+            async with self._slots:
+                self.queue_waits.append(time.perf_counter() - queued)
+                return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _universe_key(request: Dict[str, Any]) -> UniverseKey:
+        tickers = request.get('tickers')
+        if not isinstance(tickers, list) or not tickers or not all(isinstance(t, str) for t in tickers):
+            raise HttpError(400, "Le champ 'tickers' doit être une liste non vide de symboles")
+        return (tuple(tickers), str(request.get('period', SPEC_DEFAULTS['period'])),
+                str(request.get('interval', SPEC_DEFAULTS['interval'])),
+                str(request.get('covariance', SPEC_DEFAULTS['covariance'])))
+
+    def _optimize(self, key: UniverseKey, request: Dict[str, Any]) -> Dict[str, Any]:
+        optimizer = self.state.optimizer(key, request.get('backend', 'cvxopt'))
+        target_return = request.get('target_return')
+        risk_free_rate = float(request.get('risk_free_rate', SPEC_DEFAULTS['risk_free_rate']))
+        if target_return is None:
+            weights, ret, risk = optimizer.max_sharpe_ratio(risk_free_rate=risk_free_rate)
+        else:
+            weights, ret, risk = optimizer.optimize_portfolio(target_return=float(target_return),
+                                                              risk_free_rate=risk_free_rate)
+        return {'weights': dict(zip(optimizer.mean_returns.index, map(float, weights))),
+                'expected_return': float(ret), 'risk': float(risk),
+                'sharpe': float((ret - risk_free_rate) / risk) if risk > 0 else None}
+
+    def _frontier(self, key: UniverseKey, request: Dict[str, Any]) -> Dict[str, Any]:
+        optimizer = self.state.optimizer(key, request.get('backend', 'cvxopt'))
+        returns, risks, weights = optimizer.efficient_frontier(int(request.get('n_points', 50)))
+        response = {'tickers': list(optimizer.mean_returns.index),
+                    'returns': returns.tolist(), 'risks': risks.tolist()}
+        if request.get('weights'):
+            response['weights'] = weights.tolist()
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Latences par route (ms), attente d'un thread, saturation et état partagé."""
+        return {
+            'uptime_s': time.time() - self.started,
+            'workers': self.workers, 'queue_size': self.queue_size,
+            'in_flight': self.in_flight, 'rejected': self.rejected,
+            'universes': len(self.state), 'universe_loads': self.state.loads,
+            'result_cache': {'hits': self.state.result_cache.hits, 'misses': self.state.result_cache.misses},
+            'latency_ms': {route: _percentiles(list(samples)) for route, samples in self.latencies.items()},
+            'queue_wait_ms': _percentiles(list(self.queue_waits)),
+        }
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        if path == '/health':
+            return {'status': 'ok'}
+        if path == '/stats':
+            return self.stats()
+        handlers = {'/optimize': self._optimize, '/frontier': self._frontier}
+        if path not in handlers:
+            raise HttpError(404, f"Route inconnue: {path}")
+        if method != 'POST':
+            raise HttpError(405, f"{path} n'accepte que POST")
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise HttpError(400, "Corps de requête JSON invalide")
+        if not isinstance(request, dict):
+            raise HttpError(400, "Le corps de la requête doit être un objet JSON")
+
+        start = time.perf_counter()
+        try:
+            response = await self._submit(handlers[path], self._universe_key(request), request)
+        except (ValueError, TypeError) as e:
+            raise HttpError(422, str(e))
+        self.latencies[path].append(time.perf_counter() - start)
+        return response
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Sert les requêtes d'une connexion (keep-alive HTTP/1.1)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                close = headers.get('connection', '').lower() == 'close'
+
+                try:
+                    parts = request_line.decode('latin-1').split()
+                    if len(parts) != 3:
+                        raise HttpError(400, "Ligne de requête invalide")
+                    method, target, _ = parts
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_BYTES:
+                        close = True
+                        raise HttpError(413, "Corps de requête trop volumineux")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = 200, await self._dispatch(method, target.split('?')[0], body)
+                except HttpError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ValueError:
+                    status, payload, close = 400, {'error': "En-têtes invalides"}, True
+
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(data)}"]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                if close:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # Attendre la fermeture du transport: sans quoi les connexions s'accumulent sous charge
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765,
+                    unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+        """
+        Démarre l'écoute (TCP, ou socket Unix si `unix_path` est fourni).
+
+        Returns:
+            Serveur asyncio (port effectif dans `server.sockets[0].getsockname()`)
+        """
+        if unix_path is not None:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            return await asyncio.start_unix_server(self.handle, path=unix_path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    loader = DataLoader(cache_dir=None if args.no_cache else args.cache_dir, offline=args.offline)
+    service = OptimizationService(MarketState(loader, max_universes=args.max_universes),
+                                  workers=args.workers, queue_size=args.queue)
+    server = await service.start(args.host, args.port, args.unix)
+    address = args.unix or "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+    print(f"Service d'optimisation à l'écoute sur {address} "
+          f"({args.workers} threads, file de {args.queue})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="Écoute sur ce socket Unix plutôt qu'en TCP")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--queue', type=int, default=16, help="Requêtes en attente avant de répondre 503")
+    parser.add_argument('--max-universes', type=int, default=64)
+    parser.add_argument('--cache-dir', default=PRICE_CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="Télécharge sans cache disque")
+    parser.add_argument('--offline', action='store_true', help="Lit les prix uniquement dans le cache")
+    args = parser.parse_args(argv)
+    if args.no_cache and args.offline:
+        print("Erreur: --offline nécessite le cache", file=sys.stderr)
+        return 2
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
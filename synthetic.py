@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional, Tuple
+from covariance import FactorCovariance
+
+
+class SyntheticMarket:
+    def __init__(self, n_assets: int, n_factors: int = 5, seed: Optional[int] = None,
+                 market_vol: float = 0.01, factor_vol: float = 0.005,
+                 specific_vol: Tuple[float, float] = (0.01, 0.025),
+                 market_premium: float = 0.0003):
+        """
+        Marché synthétique à structure factorielle, pour les tests à grande échelle.
+
+        Les rendements journaliers suivent r = μ + B·f + ε, avec f ~ N(0, F) et
+        ε ~ N(0, D). Le premier facteur est un facteur de marché (expositions autour de 1),
+        les suivants sont des facteurs sectoriels/de style centrés. La vraie covariance
+        B·F·Bᵀ + D est connue et renvoyée sans aucune estimation.
+
+        Args:
+            n_assets: Nombre d'actifs
+            n_factors: Nombre de facteurs (marché inclus)
+            seed: Graine du générateur
+            market_vol: Volatilité journalière du facteur de marché
+            factor_vol: Volatilité journalière des autres facteurs
+            specific_vol: Bornes de la volatilité spécifique journalière
+            market_premium: Prime journalière du facteur de marché
+        """
+        if n_assets < 1 or n_factors < 1:
+            raise ValueError("Le nombre d'actifs et le nombre de facteurs doivent être positifs")
+        self.n_assets = n_assets
+        self.n_factors = n_factors
+        self.asset_names = [f'ASSET_{i+1}' for i in range(n_assets)]
+
+        # Trois flux indépendants: paramètres, facteurs, bruit spécifique ; les tirages
+        # ne dépendent donc pas du découpage en blocs
+        param_seq, factor_seq, noise_seq = np.random.SeedSequence(seed).spawn(3)
+        self._factor_seq, self._noise_seq = factor_seq, noise_seq
+        rng = np.random.default_rng(param_seq)
+
+        self.loadings = np.column_stack((
+            rng.normal(1.0, 0.3, n_assets),
+            rng.normal(0.0, 0.5, (n_assets, n_factors - 1)),
+        ))
+        self.factor_vols = np.full(n_factors, factor_vol)
+        self.factor_vols[0] = market_vol
+        self.specific_vols = rng.uniform(specific_vol[0], specific_vol[1], n_assets)
+        self.expected_returns = self.loadings[:, 0] * market_premium + rng.normal(0.0, 1e-4, n_assets)
+
+    @property
+    def mean_returns(self) -> pd.Series:
+        """Vrais rendements moyens journaliers."""
+        return pd.Series(self.expected_returns, index=self.asset_names)
+
+    def true_covariance(self) -> FactorCovariance:
+        """Vraie covariance des rendements, directement utilisable par PortfolioOptimizer."""
+        return FactorCovariance(self.loadings, np.diag(self.factor_vols ** 2),
+                                self.specific_vols ** 2, self.asset_names)
+
+    def _chunk_days(self, dtype: np.dtype, memory_budget_mb: float) -> int:
+        # Rendements du bloc + bruit spécifique temporaire
+        per_day = 2 * self.n_assets * dtype.itemsize
+        return max(1, int(memory_budget_mb * 2 ** 20) // per_day)
+
+    def iter_returns(self, n_days: int, dtype: type = np.float64,
+                     memory_budget_mb: float = 64.0) -> Iterator[np.ndarray]:
+        """
+        Génère les rendements par blocs de jours.
+
+        Pour une graine donnée, la série obtenue ne dépend pas du budget mémoire.
+
+        Args:
+            n_days: Nombre de jours
+            dtype: np.float64 ou np.float32
+            memory_budget_mb: Mémoire de travail maximale par bloc, en Mo
+
+        Returns:
+            Itérateur sur des blocs de rendements (jours x actifs)
+        """
+        dtype = np.dtype(dtype)
+        factor_rng = np.random.default_rng(self._factor_seq)
+        noise_rng = np.random.default_rng(self._noise_seq)
+        exposures = (self.loadings * self.factor_vols).T.astype(dtype)
+        mu = self.expected_returns.astype(dtype)
+        specific = self.specific_vols.astype(dtype)
+        chunk = self._chunk_days(dtype, memory_budget_mb)
+
+        remaining = n_days
+        while remaining > 0:
+            size = min(chunk, remaining)
+            returns = noise_rng.standard_normal((size, self.n_assets), dtype=dtype)
+            returns *= specific
+            returns += factor_rng.standard_normal((size, self.n_factors), dtype=dtype) @ exposures
+            returns += mu
+            yield returns
+            remaining -= size
+
+    def _fill(self, n_days: int, dtype: np.dtype, path: Optional[str],
+              as_prices: bool, memory_budget_mb: float) -> np.ndarray:
+        if path is not None:
+            # Fichier .npy: relisible avec np.load(path, mmap_mode='r')
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n_days, self.n_assets))
+        else:
+            out = np.empty((n_days, self.n_assets), dtype=dtype)
+        level = np.ones(self.n_assets, dtype=dtype)
+        position = 0
+        for block in self.iter_returns(n_days, dtype, memory_budget_mb):
+            if as_prices:
+                block += 1.0
+                np.cumprod(block, axis=0, out=block)
+                block *= level
+                level = block[-1].copy()
+            out[position:position + len(block)] = block
+            position += len(block)
+        if path is not None:
+            out.flush()
+        return out
+
+    def returns(self, n_days: int, dtype: type = np.float64, path: Optional[str] = None,
+                memory_budget_mb: float = 64.0) -> np.ndarray:
+        """
+        Génère la matrice complète des rendements.
+
+        Args:
+            n_days: Nombre de jours
+            dtype: np.float64 ou np.float32
+            path: Fichier .npy de sortie ; si fourni, le résultat est un memmap et seul
+                  un bloc à la fois réside en mémoire
+            memory_budget_mb: Mémoire de travail maximale par bloc, en Mo
+
+        Returns:
+            Rendements (jours x actifs), en mémoire ou en memmap
+        """
+        return self._fill(n_days, np.dtype(dtype), path, False, memory_budget_mb)
+
+    def prices(self, n_days: int, dtype: type = np.float64, path: Optional[str] = None,
+               memory_budget_mb: float = 64.0) -> np.ndarray:
+        """
+        Génère les prix (base 1) à partir des mêmes rendements que `returns`.
+
+        Args:
+            n_days: Nombre de jours
+            dtype: np.float64 ou np.float32
+            path: Fichier .npy de sortie (memmap)
+            memory_budget_mb: Mémoire de travail maximale par bloc, en Mo
+
+        Returns:
+            Prix (jours x actifs), en mémoire ou en memmap
+        """
+        return self._fill(n_days, np.dtype(dtype), path, True, memory_budget_mb)
+
+    def price_frame(self, n_days: int, dtype: type = np.float64) -> pd.DataFrame:
+        """Prix sous forme de DataFrame indexé par jours ouvrés, pour DataLoader et l'optimiseur."""
+        dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_days)
+        return pd.DataFrame(self.prices(n_days, dtype), index=dates, columns=self.asset_names)
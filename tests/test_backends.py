@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backends import SolverBackend, get_backend
+from constraints import PortfolioConstraints
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+def test_analytic_requires_explicit_unconstrained():
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(8, seed=1).price_frame(400))
+    with pytest.raises(ValueError, match="ventes à découvert"):
+        PortfolioOptimizer(mean_returns, cov_matrix, backend='analytic')
+
+    constraints = PortfolioConstraints.unconstrained(list(mean_returns.index))
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix, backend='analytic', constraints=constraints)
+    # Au-delà du rendement maximum d'un actif, atteignable avec des ventes à découvert
+    target = float(mean_returns.max()) * 1.5
+    weights, ret, _ = optimizer.optimize_portfolio(target_return=target)
+    assert ret == pytest.approx(target)
+    assert weights.sum() == pytest.approx(1.0)
+    assert np.any(weights < 0)
+
+
+@pytest.mark.parametrize('backend', ['cvxopt', 'numpy'])
+def test_iterative_backends_reject_infinite_bounds(backend):
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(8, seed=1).price_frame(400))
+    constraints = PortfolioConstraints.unconstrained(list(mean_returns.index))
+    with pytest.raises(ValueError, match="bornes finies"):
+        PortfolioOptimizer(mean_returns, cov_matrix, backend=backend, constraints=constraints)
+
+
+def test_incomplete_backend_fails_at_creation():
+    class TargetsOnly(SolverBackend):
+        name = 'partiel'
+
+        def solve_targets(self, optimizer, target_returns, initial_weights=None):
+            return np.zeros((len(target_returns), optimizer.n_assets))
+
+    with pytest.raises(TypeError):
+        TargetsOnly()
+
+
+def test_numpy_sharpe_grid_matches_cvxopt():
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(8, seed=1).price_frame(400))
+    constraints = PortfolioConstraints(list(mean_returns.index), lower=-0.2, upper=0.4)
+    sharpe = {}
+    for backend in ('cvxopt', 'numpy'):
+        optimizer = PortfolioOptimizer(mean_returns, cov_matrix, backend=backend, constraints=constraints)
+        _, ret, risk = optimizer.max_sharpe_ratio()
+        sharpe[backend] = ret / risk
+    # Recherche par grille: approchée, au second ordre du pas près
+    assert sharpe['numpy'] <= sharpe['cvxopt'] * (1 + 1e-6)
+    assert sharpe['numpy'] == pytest.approx(sharpe['cvxopt'], rel=1e-5)
+
+
+def test_shared_backend_across_threads():
+    backend = get_backend('numpy')
+    optimizers = []
+    for seed in range(4):
+        _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(8, seed=seed).price_frame(400))
+        optimizers.append(PortfolioOptimizer(mean_returns, cov_matrix, backend=backend))
+    expected = [optimizer.efficient_frontier(10)[2] for optimizer in optimizers]
+
+    # Chaque thread alterne entre univers: les factorisations ne doivent pas se mélanger
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda i: [optimizers[(i + k) % 4]._efficient_frontier_qp(10)[2]
+                                           for k in range(4)], range(4)))
+    for i, frontiers in enumerate(results):
+        for k, weights in enumerate(frontiers):
+            np.testing.assert_allclose(weights, expected[(i + k) % 4], atol=1e-6)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import WalkForwardBacktester, summarize
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture(scope='module')
+def prices():
+    return SyntheticMarket(4, seed=5).price_frame(160)
+
+
+def _loop_returns(prices, weights, cost):
+    """Référence barre par barre: poids dérivant avec les prix entre deux rebalancements."""
+    values = prices.to_numpy()
+    rebalances = dict(zip(prices.index.get_indexer(weights.index), weights.to_numpy()))
+    holdings, returns = None, []
+    for t in range(min(rebalances) + 1, len(values)):
+        growth = values[t] / values[t - 1]
+        if t - 1 in rebalances:
+            target = rebalances[t - 1]
+            drifted = np.zeros_like(target) if holdings is None else holdings / holdings.sum()
+            holdings = target.copy()
+            ret = holdings @ growth - 1.0 - cost * np.abs(target - drifted).sum()
+        else:
+            ret = (holdings @ growth) / holdings.sum() - 1.0
+        holdings = holdings * growth
+        returns.append(ret)
+    return np.array(returns)
+
+
+@pytest.mark.parametrize('cost', [0.0, 0.002])
+def test_vectorised_returns_match_loop(prices, cost):
+    backtester = WalkForwardBacktester(prices, lookback=60, rebalance_every=15, transaction_cost=cost)
+    rng = np.random.default_rng(0)
+    dates = prices.index[backtester.rebalance_positions()]
+    weights = pd.DataFrame(rng.dirichlet(np.ones(4), len(dates)), index=dates, columns=prices.columns)
+    returns = backtester.portfolio_returns(weights)
+    assert returns.index[0] == prices.index[61]
+    np.testing.assert_allclose(returns.to_numpy(), _loop_returns(prices, weights, cost), atol=1e-12)
+
+
+def test_parallel_weights_match_sequential(prices):
+    # Taux sans risque négatif: un actif au moins le dépasse à chaque date
+    backtester = WalkForwardBacktester(prices, lookback=60, rebalance_every=20, risk_free_rate=-0.01)
+    sequential = backtester.compute_weights(max_workers=1)
+    parallel = backtester.compute_weights(max_workers=2)
+    assert not backtester.errors
+    np.testing.assert_allclose(parallel.to_numpy(), sequential.to_numpy(), atol=1e-6)
+    np.testing.assert_allclose(sequential.sum(axis=1), 1.0)
+
+
+def test_summarize_hand_computed():
+    stats = summarize(pd.Series([0.1, -0.2, 0.1]), periods_per_year=3)
+    # Richesse 1.1, 0.88, 0.968: perte maximale 0.88 / 1.1 - 1
+    assert stats['annual_return'] == pytest.approx(0.968 - 1.0)
+    assert stats['max_drawdown'] == pytest.approx(-0.2)
+    assert stats['annual_volatility'] == pytest.approx(np.std([0.1, -0.2, 0.1], ddof=1) * np.sqrt(3))
+
+
+def test_rejects_short_or_missing_history(prices):
+    with pytest.raises(ValueError, match="trop court"):
+        WalkForwardBacktester(prices, lookback=len(prices))
+    gapped = prices.copy()
+    gapped.iloc[3, 0] = np.nan
+    with pytest.raises(ValueError, match="manquantes"):
+        WalkForwardBacktester(gapped, lookback=60)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bar_store import BarStore
+
+
+def _prices(start, periods, level):
+    index = pd.date_range(start, periods=periods, freq='1min')
+    return pd.DataFrame({'A': level + np.arange(periods), 'B': -level - np.arange(periods)}, index=index)
+
+
+def test_interrupted_replacement_is_rolled_back(tmp_path, monkeypatch):
+    store = BarStore(str(tmp_path), '1m')
+    store.append(_prices('2024-01-02 14:30', 5, 100.0))
+    expected = store.to_frame()
+
+    # Bloc qui remplace la dernière barre puis en ajoute deux ; interruption avant meta.json
+    def interrupted():
+        raise OSError("interruption simulée")
+    monkeypatch.setattr(store, '_save_meta', interrupted)
+    with pytest.raises(OSError):
+        store.append(_prices('2024-01-02 14:34', 3, 500.0))
+
+    reopened = BarStore(str(tmp_path), '1m')
+    pd.testing.assert_frame_equal(reopened.to_frame(), expected)
+
+    # Un nouvel ajout après la reprise remplace bien la dernière barre
+    reopened.append(_prices('2024-01-02 14:34', 3, 500.0))
+    final = BarStore(str(tmp_path), '1m').to_frame()
+    assert len(final) == 7
+    assert final['A'].tolist() == [100.0, 101.0, 102.0, 103.0, 500.0, 501.0, 502.0]
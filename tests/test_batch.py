@@ -0,0 +1,35 @@
+from batch import _universe_key, optimize_many
+from data_loader import DataLoader
+from synthetic import SyntheticMarket
+
+
+def _stats(seed):
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(6, seed=seed).price_frame(300))
+    return mean_returns, cov_matrix
+
+
+def test_universe_key_by_content():
+    mean_returns, cov_matrix = _stats(0)
+    other_mean, other_cov = _stats(1)
+    digests = {}
+    same = _universe_key({'mean_returns': mean_returns, 'cov_matrix': cov_matrix}, digests)
+    copy = _universe_key({'mean_returns': mean_returns.copy(), 'cov_matrix': cov_matrix.copy()}, digests)
+    other = _universe_key({'mean_returns': other_mean, 'cov_matrix': other_cov}, digests)
+    assert same == copy
+    assert same != other
+
+
+def test_optimize_many_distinct_universes():
+    specs = [{'mean_returns': m, 'cov_matrix': c, 'target_return': None} for m, c in (_stats(0), _stats(1))]
+    results = optimize_many(specs, max_workers=1)
+    assert list(results['status']) == ['ok', 'ok']
+    assert results['risk'][0] != results['risk'][1]
+
+
+def test_malformed_spec_is_reported_per_problem():
+    mean_returns, cov_matrix = _stats(0)
+    specs = [{'period': '1y'}, {'mean_returns': mean_returns, 'cov_matrix': cov_matrix},
+             {'mean_returns': mean_returns}]
+    results = optimize_many(specs, max_workers=1)
+    assert list(results['status']) == ['error', 'ok', 'error']
+    assert results['error'][0].startswith('KeyError') and results['error'][2].startswith('KeyError')
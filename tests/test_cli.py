@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import cli
+from price_cache import PriceCache
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    prices = SyntheticMarket(4, seed=6).price_frame(300)
+    PriceCache(str(tmp_path / 'prix')).write(prices, '1d', covered_from=prices.index[0] - pd.Timedelta(days=400))
+    return str(tmp_path / 'prix')
+
+
+def _spec(tmp_path, portfolios):
+    path = tmp_path / 'lots.json'
+    path.write_text(json.dumps({'defaults': {'period': '1y'}, 'portfolios': portfolios}), encoding='utf-8')
+    return str(path)
+
+
+def test_load_spec_applies_defaults(tmp_path):
+    portfolios = cli.load_spec(_spec(tmp_path, [{'tickers': ['ASSET_1']}, {'name': 'b', 'tickers': ['ASSET_2'],
+                                                                          'interval': '1wk'}]))
+    assert portfolios[0]['name'] == 'portfolio_0' and portfolios[0]['interval'] == '1d'
+    assert portfolios[1]['interval'] == '1wk' and portfolios[1]['covariance'] == 'sample'
+    with pytest.raises(ValueError, match="aucun ticker"):
+        cli.load_spec(_spec(tmp_path, [{'name': 'vide'}]))
+
+
+def test_main_offline_writes_results(tmp_path, cache_dir):
+    tickers = ['ASSET_1', 'ASSET_2', 'ASSET_3', 'ASSET_4']
+    spec = _spec(tmp_path, [{'name': 'sharpe', 'tickers': tickers, 'risk_free_rate': -0.01},
+                            {'name': 'meme-univers', 'tickers': tickers, 'risk_free_rate': -0.005},
+                            {'name': 'absent', 'tickers': ['INCONNU']}])
+    output = tmp_path / 'resultats.json'
+    code = cli.main([spec, '--output', str(output), '--offline', '--cache-dir', cache_dir,
+                     '--workers', '1', '--frontier-points', '10'])
+    assert code == 1
+
+    report = json.loads(output.read_text(encoding='utf-8'))
+    by_name = {p['name']: p for p in report['portfolios']}
+    assert by_name['sharpe']['status'] == 'ok'
+    assert sum(by_name['sharpe']['weights'].values()) == pytest.approx(1.0)
+    assert by_name['sharpe']['universe'] == by_name['meme-univers']['universe']
+    assert by_name['absent']['status'] == 'error' and 'hors ligne' in by_name['absent']['error']
+    assert len(report['frontiers']) == 2
+    assert len(report['frontiers'][by_name['sharpe']['universe']]['returns']) == 10
+
+
+def test_main_rejects_invalid_spec(tmp_path):
+    path = tmp_path / 'lots.json'
+    path.write_text('{', encoding='utf-8')
+    assert cli.main([str(path), '--output', str(tmp_path / 'out.json')]) == 2
+
+
+def test_import_is_light():
+    code = "import sys, cli; print(any(m in sys.modules for m in ('pandas', 'cvxopt', 'matplotlib', 'tkinter')))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(cli.__file__)))
+    assert out.stdout.strip() == 'False'
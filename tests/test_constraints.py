@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from constraints import PortfolioConstraints
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture(scope='module')
+def market():
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(8, seed=1).price_frame(400))
+    return mean_returns, cov_matrix
+
+
+def test_short_selling_keeps_upper_bound(market):
+    mean_returns, cov_matrix = market
+    constraints = PortfolioConstraints(list(mean_returns.index), lower=-0.5)
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix, constraints=constraints)
+    returns, risks, _ = optimizer.efficient_frontier(30)
+
+    # Le programme linéaire et la ligne critique voient les mêmes bornes w <= 1
+    assert optimizer._return_range() == pytest.approx((returns.min(), returns.max()), abs=1e-8)
+    for target in np.linspace(returns.min(), returns.max(), 7)[1:-1]:
+        weights, ret, risk = PortfolioOptimizer(mean_returns, cov_matrix, constraints=constraints) \
+            .optimize_portfolio(target_return=target)
+        expected = optimizer._critical_line().evaluate([target])
+        assert weights.max() <= 1.0 + 1e-6
+        assert risk == pytest.approx(expected[1][0], rel=1e-5)
+        np.testing.assert_allclose(weights, expected[2][0], atol=1e-4)
+
+    weights, _, _ = optimizer.max_sharpe_ratio()
+    assert weights.max() <= 1.0 + 1e-6 and weights.min() >= -0.5 - 1e-6
+
+
+def test_infinite_bounds_emit_no_rows():
+    names = ['A', 'B', 'C']
+    constraints = PortfolioConstraints(names, lower=[-np.inf, 0.0, 0.0], upper=[np.inf, 0.6, 0.6],
+                                       sectors={'A': 'x', 'B': 'x', 'C': 'y'}, sector_bounds={'x': (0.2, 0.8)})
+    G, h = constraints.build(3, 3)
+    assert np.all(np.isfinite(h))
+    # Deux minimum finis, deux maximum (B, C) et deux bornes du secteur x
+    assert G.size == (6, 3)
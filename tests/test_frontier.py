@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from constraints import PortfolioConstraints
+from data_loader import DataLoader
+from frontier import CriticalLineFrontier
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+BOUNDS = {
+    'long_only': {},
+    'plafond': {'upper': 0.3},
+    'ventes_a_decouvert': {'lower': -0.3},
+    'par_actif': {'lower': [0.0, 0.05, 0.0, -0.1, 0.0, 0.0, 0.02, 0.0, 0.0, 0.0],
+                  'upper': [0.5, 0.4, 0.3, 0.3, 0.6, 1.0, 0.25, 0.4, 0.35, 0.5]},
+}
+
+
+@pytest.fixture(scope='module')
+def market():
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(10, seed=4).price_frame(500))
+    return mean_returns, cov_matrix
+
+
+@pytest.mark.parametrize('bounds', BOUNDS.values(), ids=BOUNDS.keys())
+def test_critical_line_matches_qp(market, bounds):
+    mean_returns, cov_matrix = market
+    constraints = PortfolioConstraints(list(mean_returns.index), **bounds)
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix, constraints=constraints)
+    lower, upper = constraints.bounds()
+    cla = CriticalLineFrontier(mean_returns.values, cov_matrix.values, lower_bounds=lower, upper_bounds=upper)
+
+    # Mêmes extrémités que les programmes linéaires
+    assert (cla.corner_returns[0], cla.corner_returns[-1]) == pytest.approx(optimizer._return_range(), abs=1e-8)
+
+    targets = np.linspace(cla.corner_returns[0], cla.corner_returns[-1], 12)[1:-1]
+    returns, risks, weights = cla.evaluate(targets)
+    qp_weights = optimizer.backend.solve_targets(optimizer, targets)
+    qp_risks = np.sqrt(optimizer.covariance.portfolio_variance(qp_weights))
+    np.testing.assert_allclose(returns, targets, atol=1e-12)
+    # Solution exacte: jamais plus risquée que le QP, qui converge à sa tolérance près
+    assert np.all(risks <= qp_risks * (1 + 1e-7))
+    np.testing.assert_allclose(risks, qp_risks, rtol=1e-4)
+    # Les poids du QP ne sont précis qu'à sa tolérance près (objectif plat autour de l'optimum)
+    np.testing.assert_allclose(weights, qp_weights, atol=1e-2)
+    assert np.all(weights >= lower - 1e-12) and np.all(weights <= upper + 1e-12)
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+
+
+def test_progressive_frontier_matches_full(market):
+    mean_returns, cov_matrix = market
+    full = CriticalLineFrontier(mean_returns.values, cov_matrix.values).frontier(40)
+    batches = list(CriticalLineFrontier(mean_returns.values, cov_matrix.values).iter_frontier(40))
+    returns = np.concatenate([batch[0] for batch in batches])
+    order = np.argsort(returns)
+    np.testing.assert_allclose(returns[order], full[0], atol=1e-12)
+    np.testing.assert_allclose(np.concatenate([batch[1] for batch in batches])[order], full[1], atol=1e-12)
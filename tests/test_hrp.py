@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from constraints import PortfolioConstraints
+from covariance import FactorCovariance
+from data_loader import DataLoader
+from hrp import HierarchicalRiskParity
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+def test_three_assets_hand_computed():
+    std = np.array([0.2, 0.3, 0.1])
+    corr = np.array([[1.0, 0.9, 0.1],
+                     [0.9, 1.0, 0.2],
+                     [0.1, 0.2, 1.0]])
+    hrp = HierarchicalRiskParity(corr * np.outer(std, std))
+    # Distances √((1 - ρ) / 2): 0-1 (0.22) puis 1-2 (0.63) ; ordre des feuilles 0, 1, 2
+    np.testing.assert_array_equal(hrp.order(), [0, 1, 2])
+
+    # Première bissection [0] | [1, 2], pondération 1/σ² dans [1, 2]: (0.1, 0.9)
+    right_var = 0.1 ** 2 * 0.09 + 0.9 ** 2 * 0.01 + 2 * 0.1 * 0.9 * (0.2 * 0.3 * 0.1)
+    alpha = 1.0 - 0.04 / (0.04 + right_var)
+    # Seconde bissection [1] | [2]: 1 - 0.09 / (0.09 + 0.01) = 0.1
+    expected = [alpha, (1.0 - alpha) * 0.1, (1.0 - alpha) * 0.9]
+    np.testing.assert_allclose(hrp.weights(), expected, rtol=1e-12)
+
+
+@pytest.fixture(scope='module')
+def returns():
+    return DataLoader().calculate_returns(SyntheticMarket(40, seed=10).price_frame(300))[0]
+
+
+def test_weights_sum_and_minimum_spanning_tree(returns):
+    cov = returns.cov().to_numpy()
+    hrp = HierarchicalRiskParity(cov)
+    weights = hrp.weights()
+    assert weights.sum() == pytest.approx(1.0) and np.all(weights > 0)
+    assert sorted(hrp.order()) == list(range(40))
+
+    # Poids total de l'arbre égal à celui d'un Kruskal sur toutes les paires
+    std = np.sqrt(np.diag(cov))
+    distance = np.sqrt(np.clip(0.5 * (1.0 - cov / np.outer(std, std)), 0.0, None))
+    pairs = sorted((distance[i, j], i, j) for i in range(40) for j in range(i + 1, 40))
+    root, total = list(range(40)), 0.0
+    for length, i, j in pairs:
+        while root[i] != i:
+            i = root[i]
+        while root[j] != j:
+            j = root[j]
+        if i != j:
+            root[j] = i
+            total += length
+    assert hrp.minimum_spanning_tree()[2].sum() == pytest.approx(total)
+
+
+def test_factor_covariance_matches_dense(returns):
+    factor = FactorCovariance.from_returns(returns, n_factors=3)
+    np.testing.assert_allclose(HierarchicalRiskParity(factor).weights(),
+                               HierarchicalRiskParity(factor.dense()).weights(), rtol=1e-10)
+
+
+def test_optimizer_hrp_long_only(returns):
+    weights, ret, risk = PortfolioOptimizer(returns.mean(), returns.cov()).hierarchical_risk_parity()
+    assert weights.sum() == pytest.approx(1.0) and ret == pytest.approx(weights @ returns.mean())
+    capped = PortfolioConstraints(list(returns.columns), upper=0.1)
+    with pytest.raises(ValueError, match="poids positifs"):
+        PortfolioOptimizer(returns.mean(), returns.cov(), constraints=capped).hierarchical_risk_parity()
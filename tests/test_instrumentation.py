@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import instrumentation
+from backends import SolverBackend
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture
+def traced():
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        yield
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+@pytest.fixture(scope='module')
+def market():
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(6, seed=8).price_frame(300))
+    return mean_returns, cov_matrix
+
+
+def test_calls_and_solves_are_traced(traced, market, tmp_path):
+    PortfolioOptimizer(*market).max_sharpe_ratio(risk_free_rate=-0.01)
+    summary = instrumentation.summary()
+    assert summary['PortfolioOptimizer.max_sharpe_ratio']['calls'] == 1
+    assert summary['solver']['calls'] == 1 and summary['solver']['not_optimal'] == 0
+    assert summary['solver']['mean_iterations'] > 0
+
+    path = tmp_path / 'trace.json'
+    instrumentation.export_chrome_trace(str(path))
+    events = json.loads(path.read_text(encoding='utf-8'))['traceEvents']
+    assert {'X', 'i'} <= {event['ph'] for event in events}
+    assert any(event['ph'] == 'i' and event['args']['status'] == 'optimal' for event in events)
+
+
+def test_disable_restores_methods(market):
+    original = PortfolioOptimizer.max_sharpe_ratio
+    instrumentation.enable()
+    assert PortfolioOptimizer.max_sharpe_ratio is not original
+    instrumentation.disable()
+    assert PortfolioOptimizer.max_sharpe_ratio is original
+
+    instrumentation.reset()
+    PortfolioOptimizer(*market).max_sharpe_ratio(risk_free_rate=-0.01)
+    assert instrumentation.summary() == {}
+
+
+def test_abstract_backends_stay_abstract(traced):
+    with pytest.raises(TypeError):
+        SolverBackend()
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from covariance import FactorCovariance
+from data_loader import DataLoader
+from montecarlo import RandomPortfolioSimulator
+from optimizer import PortfolioOptimizer
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture(scope='module')
+def returns():
+    return DataLoader().calculate_returns(SyntheticMarket(12, seed=7).price_frame(400))[0]
+
+
+def test_chunks_respect_budget_and_simplex(returns):
+    optimizer = PortfolioOptimizer(returns.mean(), returns.cov())
+    simulator = RandomPortfolioSimulator(optimizer, memory_budget_mb=0.01, seed=0)
+    sizes = []
+    for chunk_returns, risks, weights in simulator.iter_chunks(1000):
+        sizes.append(len(weights))
+        assert np.all(weights >= 0)
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        np.testing.assert_allclose(chunk_returns, weights @ returns.mean().to_numpy())
+        np.testing.assert_allclose(risks, np.sqrt(optimizer.covariance.portfolio_variance(weights)))
+    assert sum(sizes) == 1000 and max(sizes) == simulator.chunk_size < 1000
+
+
+def test_best_sharpe_below_optimum_and_reproducible(returns):
+    optimizer = PortfolioOptimizer(returns.mean(), returns.cov())
+    sim_returns, sim_risks, best = RandomPortfolioSimulator(optimizer, seed=1).simulate(5000, risk_free_rate=-0.01)
+    again = RandomPortfolioSimulator(optimizer, seed=1).simulate(5000, risk_free_rate=-0.01)
+    np.testing.assert_array_equal(sim_returns, again[0])
+
+    _, ret, risk = optimizer.max_sharpe_ratio(risk_free_rate=-0.01)
+    best_sharpe = (best @ returns.mean().to_numpy() + 0.01) / np.sqrt(optimizer.covariance.portfolio_variance(best))
+    assert best_sharpe == pytest.approx(((sim_returns + 0.01) / sim_risks).max())
+    assert best_sharpe <= (ret + 0.01) / risk * (1 + 1e-9)
+
+
+def test_factor_covariance_matches_dense(returns):
+    factor = FactorCovariance.from_returns(returns, n_factors=3)
+    dense = RandomPortfolioSimulator(PortfolioOptimizer(returns.mean(), factor.to_frame()), seed=2)
+    factored = RandomPortfolioSimulator(PortfolioOptimizer(returns.mean(), factor), seed=2)
+    np.testing.assert_allclose(factored.simulate(500)[1], dense.simulate(500)[1], rtol=1e-10)
+
+
+def test_float32_and_validation(returns):
+    optimizer = PortfolioOptimizer(returns.mean(), returns.cov())
+    sim_returns, sim_risks, _ = RandomPortfolioSimulator(optimizer, dtype=np.float32, seed=3).simulate(200)
+    assert sim_returns.dtype == np.float32 and sim_risks.dtype == np.float32
+    with pytest.raises(ValueError):
+        RandomPortfolioSimulator(optimizer, concentration=0.0)
+    with pytest.raises(ValueError):
+        RandomPortfolioSimulator(optimizer, dtype=np.int64)
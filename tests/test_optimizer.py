@@ -0,0 +1,23 @@
+import pytest
+
+from constraints import PortfolioConstraints
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from result_cache import ResultCache
+from synthetic import SyntheticMarket
+
+
+@pytest.mark.parametrize('cache', [None, ResultCache(max_entries=4)])
+def test_target_outside_constrained_range(cache):
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(10, seed=3).price_frame(500))
+    constraints = PortfolioConstraints(list(mean_returns.index), upper=0.2)
+    optimizer = PortfolioOptimizer(mean_returns, cov_matrix, constraints=constraints, cache=cache)
+    optimizer.efficient_frontier(20)
+
+    # Atteignable par l'actif seul, pas avec des poids plafonnés à 20%
+    with pytest.raises(ValueError, match="Le rendement cible doit être entre"):
+        optimizer.optimize_portfolio(target_return=float(mean_returns.max()) * 0.999)
+
+    min_ret, max_ret = optimizer._feasible_returns()
+    _, ret, _ = optimizer.optimize_portfolio(target_return=(min_ret + max_ret) / 2)
+    assert ret == pytest.approx((min_ret + max_ret) / 2, abs=1e-8)
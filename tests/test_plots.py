@@ -0,0 +1,67 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from plots import REPORT_TITLES, PortfolioVisualizer, cluster_order
+
+
+def test_export_report_uses_caller_titles(tmp_path):
+    visualizer = PortfolioVisualizer(block=False)
+    frontier = (np.linspace(0.01, 0.05, 10), np.linspace(0.1, 0.3, 10))
+    weights = np.array([0.5, 0.3, 0.2])
+    visualizer.export_report(str(tmp_path), frontier=frontier, weights=weights, asset_names=['A', 'B', 'C'],
+                             titles={'frontier': "Frontière du fonds"})
+
+    figures = dict(visualizer._figures)
+    assert figures['frontier'].axes[0].get_title() == "Frontière du fonds"
+    assert figures['weights']._suptitle.get_text() == REPORT_TITLES['weights']
+    with pytest.raises(ValueError):
+        visualizer.export_report(str(tmp_path), frontier=frontier, titles={'frontiere': "x"})
+
+    visualizer.close()
+    assert visualizer._figures == {}
+    assert all(not figure.axes for figure in figures.values())
+
+
+def test_close_releases_background_worker(tmp_path):
+    visualizer = PortfolioVisualizer(block=False)
+    returns = pd.DataFrame(np.random.default_rng(0).normal(0, 0.01, (50, 3)), columns=['A', 'B', 'C'])
+    paths = visualizer.export_report(str(tmp_path), corr_matrix=returns.corr(), background=True).result()
+    assert len(paths) == 1
+    visualizer.close()
+    assert visualizer._executor is None
+
+
+def test_cluster_order_groups_correlated_blocks():
+    rng = np.random.default_rng(0)
+    groups = rng.integers(0, 6, 300)
+    samples = rng.normal(size=(400, 6))[:, groups] + rng.normal(size=(400, 300))
+    corr = np.corrcoef(samples.T)
+    order = cluster_order(corr)
+    assert sorted(order) == list(range(300))
+    # Aussi bien groupé que par la décomposition propre complète, bien mieux que l'ordre initial
+    _, vectors = np.linalg.eigh(corr)
+    reference = np.argsort(np.arctan2(vectors[:, -2], vectors[:, -1]))
+    cuts = np.count_nonzero(np.diff(groups[order]))
+    assert cuts <= 1.1 * np.count_nonzero(np.diff(groups[reference])) + 5
+    assert cuts < np.count_nonzero(np.diff(groups)) / 3
+
+
+def test_interactive_plots_reduce_large_universes():
+    names = [f'A{i}' for i in range(200)]
+    rng = np.random.default_rng(1)
+    returns = pd.DataFrame(rng.normal(size=(300, 200)), columns=names)
+    visualizer = PortfolioVisualizer(block=False)
+
+    visualizer.plot_correlation_matrix(returns.corr(), max_assets=40)
+    ax = plt.gcf().axes[0]
+    assert ax.images[0].get_array().shape == (40, 40)
+    assert len(ax.get_xticks()) <= 40
+
+    visualizer.plot_weights(rng.dirichlet(np.ones(200)), names, max_assets=25)
+    bars = plt.gcf().axes[1].patches
+    assert len(bars) == 26
+    plt.close('all')
@@ -0,0 +1,58 @@
+import mmap
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import DataLoader
+from price_cache import PriceCache
+
+
+def _fetcher(calls):
+    def fetch(tickers, start, end, interval):
+        calls.append(list(tickers))
+        today = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+        index = pd.date_range(end=today - pd.Timedelta(days=1), periods=10, freq='D')
+        return pd.DataFrame({t: 100.0 + i + np.arange(10) for i, t in enumerate(tickers)}, index=index)
+    return fetch
+
+
+def test_cache_hit_reads_memmap_without_fetch(tmp_path):
+    cache = PriceCache(str(tmp_path), max_age=pd.Timedelta(days=1))
+    calls = []
+    first = cache.get(['A', 'B'], '1mo', '1d', fetch=_fetcher(calls))
+    assert calls == [['A', 'B']]
+
+    second = cache.get(['A', 'B'], '1mo', '1d', fetch=_fetcher(calls))
+    assert calls == [['A', 'B']]
+    pd.testing.assert_frame_equal(second, first)
+    # Calendrier commun: les colonnes restent des projections mémoire du cache
+    for ticker in ('A', 'B'):
+        base = second[ticker].to_numpy()
+        while not isinstance(base, mmap.mmap):
+            assert base is not None, ticker
+            base = base.base
+
+
+def test_offline_mode_reads_cache_only(tmp_path):
+    PriceCache(str(tmp_path)).get(['A', 'B'], '1mo', '1d', fetch=_fetcher([]))
+
+    loader = DataLoader(cache_dir=str(tmp_path), offline=True)
+    prices = loader.get_market_data(['A', 'B'], period='1mo', interval='1d')
+    assert list(prices.columns) == ['A', 'B'] and len(prices) == 10
+    with pytest.raises(ValueError, match="hors ligne"):
+        loader.get_market_data(['C'], period='1mo', interval='1d')
+
+
+def test_refetch_with_gap_keeps_stored_dates(tmp_path):
+    cache = PriceCache(str(tmp_path))
+    index = pd.date_range('2024-01-01', periods=5, freq='D')
+    cache.write(pd.DataFrame({'A': np.arange(5.0)}, index=index), '1d', covered_from=index[0])
+
+    # La nouvelle réponse omet la barre du 2024-01-04 et en ajoute une
+    refetch = pd.DataFrame({'A': [20.0, 40.0, 50.0]}, index=index[[2, 4]].append(pd.DatetimeIndex(['2024-01-06'])))
+    cache.write(refetch, '1d', covered_from=index[2])
+
+    stored = cache.read('A', '1d')
+    assert list(stored.index) == list(index) + [pd.Timestamp('2024-01-06')]
+    np.testing.assert_array_equal(stored.to_numpy(), [0.0, 1.0, 20.0, 3.0, 40.0, 50.0])
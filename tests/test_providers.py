@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from providers import FetchPipeline, FileProvider, MemoryProvider
+
+
+def test_merge_unsorted_piece(tmp_path):
+    dates = pd.date_range('2024-01-01', periods=5)
+    prices = pd.DataFrame({'A': [1.0, 2.0, 3.0, 4.0, 5.0], 'B': [10.0, 20.0, 30.0, 40.0, 50.0]}, index=dates)
+    # Fichier dont les lignes ne sont pas triées (lignes 0, 2, 1, 3, 4)
+    provider = FileProvider(str(tmp_path))
+    provider.save(prices.iloc[[0, 2, 1, 3, 4]])
+
+    merged, report = FetchPipeline(provider, chunk_size=1).fetch(['A', 'B'], dates[0])
+
+    pd.testing.assert_frame_equal(merged, prices, check_freq=False, check_index_type=False)
+    assert list(report['status']) == ['ok', 'ok']
+
+
+def test_merge_unsorted_memory_frame():
+    dates = pd.date_range('2024-01-01', periods=4)
+    prices = pd.DataFrame({'A': [1.0, 2.0, 3.0, 4.0]}, index=dates).iloc[[0, 2, 1, 3]]
+
+    merged, _ = FetchPipeline(MemoryProvider(prices)).fetch(['A'], dates[0])
+
+    assert np.array_equal(merged['A'].to_numpy(), [1.0, 2.0, 3.0, 4.0])
+    assert merged.index.is_monotonic_increasing
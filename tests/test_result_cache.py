@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from constraints import PortfolioConstraints
+from covariance import CovarianceModel
+from data_loader import DataLoader
+from optimizer import PortfolioOptimizer
+from result_cache import ResultCache
+from synthetic import SyntheticMarket
+
+
+def _stats(seed):
+    _, mean_returns, cov_matrix = DataLoader().calculate_returns(SyntheticMarket(6, seed=seed).price_frame(300))
+    return mean_returns, cov_matrix
+
+
+def test_key_by_content_and_constraints():
+    mean_returns, cov_matrix = _stats(0)
+    key = ResultCache.key(mean_returns, CovarianceModel(cov_matrix))
+    assert key == ResultCache.key(mean_returns.copy(), CovarianceModel(cov_matrix.copy()))
+    assert key != ResultCache.key(mean_returns * 1.01, CovarianceModel(cov_matrix))
+    capped = PortfolioConstraints(list(mean_returns.index), upper=0.4).signature()
+    assert key != ResultCache.key(mean_returns, CovarianceModel(cov_matrix), capped)
+
+
+def test_cached_results_match_and_are_copies():
+    mean_returns, cov_matrix = _stats(1)
+    cache = ResultCache()
+    reference = PortfolioOptimizer(mean_returns, cov_matrix)
+    first = PortfolioOptimizer(mean_returns, cov_matrix, cache=cache)
+    first.efficient_frontier(20)
+    weights, ret, risk = first.max_sharpe_ratio(risk_free_rate=-0.01)
+
+    # Nouvel optimiseur sur des données égales: frontière interpolée et Sharpe sans résolution
+    second = PortfolioOptimizer(mean_returns.copy(), cov_matrix.copy(), cache=cache)
+    cached = second.max_sharpe_ratio(risk_free_rate=-0.01)
+    assert cache.hits == 1
+    np.testing.assert_array_equal(cached[0], weights)
+    cached[0][:] = 0.0
+    np.testing.assert_array_equal(second.max_sharpe_ratio(risk_free_rate=-0.01)[0], weights)
+
+    target = float(np.mean(first._feasible_returns()))
+    _, _, expected_risk = reference.optimize_portfolio(target_return=target)
+    _, cached_ret, cached_risk = second.optimize_portfolio(target_return=target)
+    assert cached_ret == pytest.approx(target)
+    assert cached_risk == pytest.approx(expected_risk, rel=1e-5)
+
+
+def test_disk_round_trip_and_memory_eviction(tmp_path):
+    universes = [_stats(seed) for seed in (2, 3, 4)]
+    cache = ResultCache(max_entries=2, cache_dir=str(tmp_path))
+    solutions = [PortfolioOptimizer(m, c, cache=cache).max_sharpe_ratio(risk_free_rate=-0.01) for m, c in universes]
+    keys = [ResultCache.key(m, CovarianceModel(c)) for m, c in universes]
+    assert len(cache._entries) == 2 and keys[0] not in cache._entries
+
+    # Redémarrage: les solutions sont relues depuis le disque
+    restarted = ResultCache(cache_dir=str(tmp_path))
+    for (mean_returns, cov_matrix), (weights, ret, risk) in zip(universes, solutions):
+        cached = PortfolioOptimizer(mean_returns, cov_matrix, cache=restarted).max_sharpe_ratio(risk_free_rate=-0.01)
+        np.testing.assert_array_equal(cached[0], weights)
+        assert cached[1:] == (ret, risk)
+    assert restarted.hits == 3 and restarted.misses == 0
@@ -0,0 +1,74 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from covariance import FactorCovariance
+from data_loader import DataLoader
+from risk import RiskAnalyzer
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture(scope='module')
+def returns():
+    return DataLoader().calculate_returns(SyntheticMarket(6, seed=9).price_frame(400))[0]
+
+
+@pytest.fixture(scope='module')
+def weights():
+    return np.random.default_rng(0).dirichlet(np.ones(6), 15)
+
+
+def _reference(portfolio, confidence):
+    """Mesures historiques d'un seul portefeuille, par tri et boucle explicite."""
+    tail = int(np.ceil((1.0 - confidence) * len(portfolio) - 1e-9))
+    worst = np.sort(portfolio)[:tail]
+    wealth = np.cumprod(1.0 + portfolio)
+    peak, drawdown, duration, longest = 1.0, 0.0, 0, 0
+    for value in wealth:
+        peak = max(peak, value)
+        drawdown = max(drawdown, 1.0 - value / peak)
+        duration = duration + 1 if value < peak else 0
+        longest = max(longest, duration)
+    return -worst[-1], -worst.mean(), drawdown, longest
+
+
+def test_historical_risk_matches_reference_across_chunks(returns, weights):
+    expected = np.array([_reference(returns.to_numpy() @ w, 0.95) for w in weights])
+    for budget in (64.0, 0.01):
+        analyzer = RiskAnalyzer(returns, memory_budget_mb=budget)
+        if budget < 1:
+            assert analyzer._chunk_rows(len(weights)) < len(returns)
+        var, cvar, drawdown, duration = analyzer.historical_risk(weights)
+        np.testing.assert_allclose(np.column_stack((var, cvar, drawdown)), expected[:, :3], atol=1e-12)
+        np.testing.assert_array_equal(duration, expected[:, 3])
+
+
+def test_drawdown_hand_computed():
+    returns = pd.DataFrame({'A': [0.1, -0.5, 0.2, 0.5, 0.1]})
+    var, cvar, drawdown, duration = RiskAnalyzer(returns, confidence=0.6).historical_risk(np.array([1.0]))
+    # Valeurs 1.1, 0.55, 0.66, 0.99, 1.089: perte maximale 50 %, quatre périodes sous 1.1
+    assert drawdown == pytest.approx(0.5) and duration == 4
+    # Deux pires rendements sur cinq: -0.5 et 0.1
+    assert var == pytest.approx(-0.1) and cvar == pytest.approx(0.2)
+
+
+def test_contributions_and_parametric_var(returns, weights):
+    analyzer = RiskAnalyzer(returns)
+    volatility, _, component = analyzer.risk_contributions(weights)
+    np.testing.assert_allclose(component.sum(axis=1), volatility)
+    np.testing.assert_allclose(volatility, np.sqrt(np.einsum('ij,jk,ik->i', weights, returns.cov(), weights)))
+
+    var, cvar = analyzer.parametric_var(weights[0])
+    mean, sigma = returns.mean() @ weights[0], volatility[0]
+    normal = NormalDist(mean, sigma)
+    assert var == pytest.approx(-normal.inv_cdf(0.05))
+    assert cvar >= var
+
+
+def test_factor_covariance_matches_dense(returns, weights):
+    factor = FactorCovariance.from_returns(returns, n_factors=2)
+    dense = RiskAnalyzer(returns, cov_matrix=factor.to_frame()).summary(weights)
+    factored = RiskAnalyzer(returns, cov_matrix=factor).summary(weights)
+    pd.testing.assert_frame_equal(factored, dense, rtol=1e-10)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling import RollingCovariance
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture(scope='module')
+def prices():
+    return SyntheticMarket(5, seed=1).price_frame(250)
+
+
+def test_ewma_matches_pandas(prices):
+    returns = prices.pct_change().dropna()
+    estimator = RollingCovariance.from_prices(prices, decay=0.94)
+    ewm = returns.ewm(alpha=0.06, adjust=False)
+    pd.testing.assert_series_equal(estimator.mean_returns, ewm.mean().iloc[-1], check_names=False,
+                                   rtol=1e-10, atol=1e-15)
+    expected = ewm.cov(bias=True).loc[returns.index[-1]]
+    np.testing.assert_allclose(estimator.cov_matrix.to_numpy(), expected.to_numpy(), rtol=1e-10, atol=1e-15)
+
+
+def test_sliding_window_matches_pandas_bar_by_bar(prices):
+    returns = prices.pct_change().dropna()
+    estimator = RollingCovariance(list(prices.columns), window=30)
+    estimator.update(prices.iloc[:40])
+    # Barre par barre, au-delà de plusieurs recalculs exacts de la fenêtre
+    for end in range(40, len(prices)):
+        estimator.update(prices.iloc[end])
+        window = returns.iloc[end - 30:end]
+        np.testing.assert_allclose(estimator.mean_returns.to_numpy(), window.mean().to_numpy(), atol=1e-15)
+        np.testing.assert_allclose(estimator.cov_matrix.to_numpy(), window.cov().to_numpy(), rtol=1e-9, atol=1e-15)
+    assert estimator.n_observations == 30
+
+
+def test_expanding_window_matches_pandas(prices):
+    returns = prices.pct_change().dropna()
+    estimator = RollingCovariance.from_prices(prices.iloc[:100])
+    estimator.update(prices.iloc[100:].to_numpy())
+    mean_returns, cov_matrix = estimator.statistics()
+    np.testing.assert_allclose(mean_returns.to_numpy(), returns.mean().to_numpy(), atol=1e-15)
+    np.testing.assert_allclose(cov_matrix.to_numpy(), returns.cov().to_numpy(), rtol=1e-10, atol=1e-15)
+
+
+def test_invalid_settings_and_bars(prices):
+    with pytest.raises(ValueError):
+        RollingCovariance(list(prices.columns), window=10, decay=0.9)
+    with pytest.raises(ValueError):
+        RollingCovariance(list(prices.columns), decay=1.0)
+    estimator = RollingCovariance(list(prices.columns))
+    with pytest.raises(ValueError, match="valeurs manquantes"):
+        estimator.update(np.full(5, np.nan))
+    with pytest.raises(ValueError, match="deux rendements"):
+        estimator.cov_matrix
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from data_loader import DataLoader
+from price_cache import PriceCache
+from service import MarketState, OptimizationService
+from synthetic import SyntheticMarket
+
+
+@pytest.fixture
+def loader(tmp_path):
+    prices = SyntheticMarket(5, seed=2).price_frame(300)
+    PriceCache(str(tmp_path)).write(prices, '1d', covered_from=prices.index[0] - pd.Timedelta(days=400))
+    return DataLoader(cache_dir=str(tmp_path), offline=True)
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = b'' if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_concurrent_requests_and_backpressure(loader):
+    request = {'tickers': [f'ASSET_{i}' for i in range(1, 6)], 'period': '1y'}
+
+    async def scenario():
+        service = OptimizationService(MarketState(loader), workers=2, queue_size=6)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            responses = await asyncio.gather(*(_request(port, 'POST', '/optimize', request) for _ in range(8)))
+            assert [status for status, _ in responses] == [200] * 8
+            assert all(payload['weights'] == responses[0][1]['weights'] for _, payload in responses)
+
+            # Threads et file occupés: réponse 503 immédiate
+            release = threading.Event()
+            blocked = [asyncio.ensure_future(service._submit(release.wait)) for _ in range(8)]
+            while service.in_flight < 8:
+                await asyncio.sleep(0.01)
+            status, payload = await _request(port, 'POST', '/optimize', request)
+            release.set()
+            await asyncio.gather(*blocked)
+            assert status == 503 and 'saturé' in payload['error']
+
+            status, stats = await _request(port, 'GET', '/stats')
+            return status, stats
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    status, stats = asyncio.run(scenario())
+    assert status == 200
+    assert stats['rejected'] == 1 and stats['in_flight'] == 0
+    assert stats['universe_loads'] == 1
+    assert stats['latency_ms']['/optimize']['count'] == 8
+    latency = stats['latency_ms']['/optimize']
+    assert 0 < latency['p50'] <= latency['p90'] <= latency['p99'] <= latency['max']
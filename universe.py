@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from typing import Callable, List, Optional, Tuple
+
+# Instantané local de l'univers de tickers
+UNIVERSE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.risk_return_wallet', 'universe.json')
+UNIVERSE_TTL = 7 * 24 * 3600  # une semaine
+
+# Liste statique utilisée tant qu'aucun instantané n'est disponible
+STATIC_TICKERS = [
+    ('AAPL', 'Apple'), ('MSFT', 'Microsoft'), ('GOOGL', 'Alphabet'),
+    ('AMZN', 'Amazon'), ('TSLA', 'Tesla'), ('META', 'Meta Platforms'),
+    ('NVDA', 'Nvidia'), ('JPM', 'JPMorgan Chase'), ('V', 'Visa'),
+    ('UNH', 'UnitedHealth'), ('HD', 'Home Depot'), ('PG', 'Procter & Gamble'),
+    ('MA', 'Mastercard'), ('DIS', 'Disney'), ('BAC', 'Bank of America'),
+    ('XOM', 'Exxon Mobil'), ('PFE', 'Pfizer'), ('KO', 'Coca-Cola'),
+    ('PEP', 'PepsiCo'), ('CSCO', 'Cisco'), ('ORCL', 'Oracle'),
+    ('T', 'AT&T'), ('INTC', 'Intel'), ('CMCSA', 'Comcast'),
+    ('NFLX', 'Netflix'), ('ADBE', 'Adobe'), ('CRM', 'Salesforce'),
+    ('ABT', 'Abbott'), ('MCD', "McDonald's"), ('NKE', 'Nike'),
+    ('WMT', 'Walmart'), ('CVX', 'Chevron'), ('MRK', 'Merck'),
+    ('TMO', 'Thermo Fisher'), ('COST', 'Costco'), ('DHR', 'Danaher'),
+    ('LLY', 'Eli Lilly'), ('AVGO', 'Broadcom'), ('TXN', 'Texas Instruments'),
+    ('QCOM', 'Qualcomm'), ('LIN', 'Linde'), ('HON', 'Honeywell'),
+    ('NEE', 'NextEra Energy'), ('PM', 'Philip Morris'), ('IBM', 'IBM'),
+    ('SBUX', 'Starbucks'), ('MDT', 'Medtronic'), ('AMGN', 'Amgen'),
+    ('LOW', "Lowe's"), ('AMAT', 'Applied Materials'), ('GE', 'General Electric'),
+    ('CAT', 'Caterpillar'), ('GS', 'Goldman Sachs'), ('AXP', 'American Express'),
+    ('BLK', 'BlackRock'), ('SPY', 'S&P500 ETF'), ('QQQ', 'Nasdaq100 ETF'),
+    ('EEM', 'Emerging Markets ETF'), ('IWM', 'Russell 2000 ETF'),
+    ('DIA', 'Dow Jones ETF'), ('AIR.PA', 'Airbus'), ('MC.PA', 'LVMH'),
+    ("OR.PA", "L'Oréal"), ('BNP.PA', 'BNP Paribas'), ('SAN.PA', 'Sanofi'),
+    ('SU.PA', 'Schneider Electric'), ('DG.PA', 'Vinci'), ('VIE.PA', 'Veolia'),
+    ('ADS.DE', 'Adidas'), ('ALV.DE', 'Allianz'), ('BAS.DE', 'BASF'),
+    ('BAYN.DE', 'Bayer'), ('BMW.DE', 'BMW'), ('DAI.DE', 'Mercedes-Benz'),
+    ('DBK.DE', 'Deutsche Bank'), ('DPW.DE', 'Deutsche Post'),
+    ('DTE.DE', 'Deutsche Telekom'), ('FME.DE', 'Fresenius'),
+    ('FRE.DE', 'Fresenius SE'), ('HEI.DE', 'HeidelbergCement'),
+    ('HEN3.DE', 'Henkel'), ('IFX.DE', 'Infineon'), ('LHA.DE', 'Lufthansa'),
+    ('LIN.DE', 'Linde'), ('MRK.DE', 'Merck KGaA'), ('MUV2.DE', 'Munich Re'),
+    ('RWE.DE', 'RWE'), ('SAP.DE', 'SAP'), ('SIE.DE', 'Siemens'),
+    ('VOW3.DE', 'Volkswagen'), ('BARC.L', 'Barclays'), ('BP.L', 'BP'),
+    ('GSK.L', 'GSK'), ('HSBA.L', 'HSBC'), ('RIO.L', 'Rio Tinto'),
+    ('SHEL.L', 'Shell'), ('ULVR.L', 'Unilever'), ('VOD.L', 'Vodafone'),
+    ('AZN.L', 'AstraZeneca'), ('LLOY.L', 'Lloyds')
+]
+
+
+def _read_table(url: str, index: int):
+    # Imports différés: pandas et requests ne sont chargés qu'au premier téléchargement
+    import pandas as pd
+    import requests
+    return pd.read_html(StringIO(requests.get(url, timeout=10).text))[index]
+
+
+# --- Fonctions utilitaires pour récupérer les tickers dynamiquement ---
+def get_sp500_tickers_with_names():
+    table = _read_table('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 0)
+    tickers = table['Symbol'].tolist()
+    names = table['Security'].tolist()
+    return [(t, n) for t, n in zip(tickers, names)]
+
+def get_cac40_tickers_with_names():
+    table = _read_table('https://en.wikipedia.org/wiki/CAC_40', 3)
+    tickers = table['Ticker'].tolist()
+    names = table['Company'].tolist()
+    tickers = [t + '.PA' if not t.endswith('.PA') else t for t in tickers]
+    return [(t, n) for t, n in zip(tickers, names)]
+
+def get_nasdaq100_tickers_with_names():
+    table = _read_table('https://en.wikipedia.org/wiki/NASDAQ-100', 4)
+    tickers = table['Ticker'].tolist()
+    names = table['Company'].tolist()
+    return [(t, n) for t, n in zip(tickers, names)]
+
+def get_dax40_tickers_with_names():
+    table = _read_table('https://en.wikipedia.org/wiki/DAX', 3)
+    tickers = table['Ticker symbol'].tolist()
+    names = table['Company'].tolist()
+    tickers = [t + '.DE' if not t.endswith('.DE') else t for t in tickers]
+    return [(t, n) for t, n in zip(tickers, names)]
+
+def get_ftse100_tickers_with_names():
+    table = _read_table('https://en.wikipedia.org/wiki/FTSE_100_Index', 3)
+    tickers = table['EPIC'].tolist()
+    names = table['Company'].tolist()
+    tickers = [t + '.L' if not t.endswith('.L') else t for t in tickers]
+    return [(t, n) for t, n in zip(tickers, names)]
+
+
+INDEX_FETCHERS = [
+    get_sp500_tickers_with_names, get_cac40_tickers_with_names,
+    get_nasdaq100_tickers_with_names, get_dax40_tickers_with_names,
+    get_ftse100_tickers_with_names,
+]
+
+
+def fetch_universe() -> List[Tuple[str, str]]:
+    """
+    Télécharge les cinq indices en parallèle.
+
+    Returns:
+        Liste de tuples (ticker, nom), sans doublons, dans l'ordre des indices
+    """
+    with ThreadPoolExecutor(max_workers=len(INDEX_FETCHERS)) as executor:
+        tables = list(executor.map(lambda fetch: fetch(), INDEX_FETCHERS))
+    seen = set()
+    tickers = []
+    for table in tables:
+        for ticker, name in table:
+            if ticker not in seen:
+                seen.add(ticker)
+                tickers.append((str(ticker), str(name)))
+    return tickers
+
+
+def load_snapshot(path: str = UNIVERSE_CACHE_PATH) -> Tuple[Optional[List[Tuple[str, str]]], float]:
+    """
+    Lit l'instantané local de l'univers.
+
+    Args:
+        path: Chemin de l'instantané
+
+    Returns:
+        Tuple contenant (tickers ou None, âge de l'instantané en secondes)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return [tuple(item) for item in snapshot['tickers']], time.time() - snapshot['fetched_at']
+    except (OSError, ValueError, KeyError):
+        return None, float('inf')
+
+
+def save_snapshot(tickers: List[Tuple[str, str]], path: str = UNIVERSE_CACHE_PATH) -> None:
+    """
+    Enregistre l'instantané local de l'univers.
+
+    Args:
+        tickers: Liste de tuples (ticker, nom)
+        path: Chemin de l'instantané
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'fetched_at': time.time(), 'tickers': tickers}, f)
+    os.replace(tmp, path)
+
+
+def load_universe(on_refresh: Optional[Callable[[List[Tuple[str, str]]], None]] = None,
+                  path: str = UNIVERSE_CACHE_PATH,
+                  ttl: float = UNIVERSE_TTL) -> List[Tuple[str, str]]:
+    """
+    Renvoie immédiatement l'univers disponible (instantané ou liste statique).
+
+    Si l'instantané est absent ou plus vieux que `ttl`, un rafraîchissement est lancé
+    dans un thread d'arrière-plan ; `on_refresh` est alors appelé depuis ce thread
+    avec la nouvelle liste (l'appelant doit repasser sur son propre thread si besoin).
+
+    Args:
+        on_refresh: Fonction appelée avec la liste rafraîchie
+        path: Chemin de l'instantané
+        ttl: Durée de validité de l'instantané en secondes
+
+    Returns:
+        Liste de tuples (ticker, nom)
+    """
+    tickers, age = load_snapshot(path)
+    if tickers is None or age > ttl:
+        def refresh():
+            try:
+                fresh = fetch_universe()
+            except Exception:
+                return
+            save_snapshot(fresh, path)
+            if on_refresh is not None:
+                on_refresh(fresh)
+        threading.Thread(target=refresh, name='universe-refresh', daemon=True).start()
+    return tickers if tickers else list(STATIC_TICKERS)